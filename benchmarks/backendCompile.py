@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# Compares the text and ast backends from a typechecked AST to a loaded
+# code object, on a synthetic program of many functions.
+#
+#   text: TargetGen writes Python source, which CPython then has to
+#         tokenize, parse and compile again every time it runs the .py
+#   ast:  PyASTGen builds the Python AST and compiles it directly, then
+#         later runs only read the .pyc and unmarshal it
+#
+# Run from the repository root: python benchmarks/backendCompile.py
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonParser import typthonParser
+from typthonTypeChecker import TypeChecker
+from typthonTargetGen import TargetGen
+from typthonPyASTGen import PyASTGen, source_hash, read_pyc, write_pyc
+
+FUNCTION = """
+def f{i}(a : int, b : int, xs : [int]) -> int : {{
+    total : int = 0
+    i : int = 0
+    while i < b : {{
+        if (a + i) % 3 == 0 and not (i > 7 or a < 0) : {{
+            total = total + xs[i % 3] * 2 - -a
+        }} elif i == 5 : {{
+            total = total - 1
+        }} else : {{
+            xs.append(7)
+        }}
+        i = i + 1
+    }}
+    return total
+}}
+r{i} : int = f{i}({i}, 10, [1, 2, 3])
+"""
+
+
+def best(fn, n):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def text_compile(root, path):
+    lines = TargetGen(path, root, {}).generate()
+    source = "".join(f"{line}\n" for line in lines)
+    with open(path[:-4] + ".py", "w") as f:
+        f.write(source)
+    return compile(source, path[:-4] + ".py", "exec")
+
+
+def text_load(path):
+    with open(path[:-4] + ".py") as f:
+        return compile(f.read(), path[:-4] + ".py", "exec")
+
+
+def ast_compile(root, path, key):
+    code = compile(PyASTGen(path, root).generate(), path, "exec")
+    write_pyc(code, path[:-4] + ".pyc", key)
+    return code
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Backend compile and load benchmark")
+    argparser.add_argument("--functions", type=int, default=200, help="Functions in the program")
+    argparser.add_argument("-n", type=int, default=10, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    data = "".join(FUNCTION.format(i=i) for i in range(args.functions))
+    root = typthonParser().parse(data)
+    TypeChecker().typecheck(root)
+    key = source_hash(data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "program.typ")
+
+        # Both backends must build the same program.
+        text_globals, ast_globals = {}, {}
+        exec(text_compile(root, path), text_globals)
+        exec(ast_compile(root, path, key), ast_globals)
+        assert text_globals["r0"] == ast_globals["r0"]
+
+        results = [
+            ("text compile", best(lambda: text_compile(root, path), args.n)),
+            ("ast compile", best(lambda: ast_compile(root, path, key), args.n)),
+            ("text load", best(lambda: text_load(path), args.n)),
+            ("pyc load", best(lambda: read_pyc(path[:-4] + ".pyc", key), args.n)),
+        ]
+
+    print(f"{args.functions} functions, {len(data.splitlines())} lines")
+    for label, seconds in results:
+        print(f"{label:<14}{seconds * 1000:10.2f} ms")
+    text_total = results[0][1] + results[2][1]
+    ast_total = results[1][1] + results[3][1]
+    print(f"{'text total':<14}{text_total * 1000:10.2f} ms")
+    print(f"{'ast total':<14}{ast_total * 1000:10.2f} ms  ({text_total / ast_total:.2f}x)")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# Times building the control-flow graph, the dominator tree and the
+# dominance frontiers of generated programs of growing size. The time per
+# block should stay flat as the number of blocks grows. As with timeit, the
+# garbage collector is off while timing: its full collections walk the whole
+# AST and IR kept alive here and would dominate the larger sizes.
+#
+# Run from the repository root: python benchmarks/cfgScaling.py
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonCFG import CFG
+from typthonIRGen import IRGen
+from typthonParser import typthonParser
+from typthonTypeChecker import TypeChecker
+
+# About 14 basic blocks, with loops nested three deep.
+CHUNK = """
+while i < 10 : {{
+    if x % 3 == 0 : {{
+        x = x + {n}
+    }} elif x % 3 == 1 : {{
+        while x > 100 : {{
+            x = x - 7
+            if x % 5 == 0 and x > 50 : {{
+                break
+            }}
+        }}
+    }} else : {{
+        x = x - 1
+    }}
+    i = i + 1
+}}
+i = 0
+"""
+
+
+def program(chunks):
+    return "x : int = 0\ni : int = 0\n" + "".join(CHUNK.format(n=n) for n in range(chunks))
+
+
+def build(function):
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    cfg = CFG(function)
+    built = time.perf_counter()
+    cfg.compute_dominators()
+    dominated = time.perf_counter()
+    cfg.compute_frontiers()
+    done = time.perf_counter()
+    gc.enable()
+    return cfg, (built - start, dominated - built, done - dominated)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="CFG and dominator scaling benchmark")
+    argparser.add_argument(
+        "--chunks", type=int, nargs="+", default=[250, 1000, 4000], help="Program sizes"
+    )
+    argparser.add_argument("-n", type=int, default=3, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    parser = typthonParser()
+    print(
+        f"{'blocks':>8}{'edges':>8}{'cfg ms':>10}{'idom ms':>10}{'df ms':>10}"
+        f"{'total ms':>10}{'us/block':>10}"
+    )
+    for chunks in args.chunks:
+        root = parser.parse(program(chunks))
+        TypeChecker().typecheck(root)
+        ir_generator = IRGen()
+        ir_generator.generate(root)
+        module = ir_generator.get_IR_list().module
+
+        best = None
+        for _ in range(args.n):
+            cfg, times = build(module)
+            if best is None or sum(times) < sum(best):
+                best = times
+        blocks = len(cfg.blocks)
+        edges = sum(len(block.successors) for block in cfg.blocks)
+        total = sum(best)
+        print(
+            f"{blocks:>8}{edges:>8}{best[0] * 1000:>10.2f}{best[1] * 1000:>10.2f}"
+            f"{best[2] * 1000:>10.2f}{total * 1000:>10.2f}{total / blocks * 1e6:>10.2f}"
+        )
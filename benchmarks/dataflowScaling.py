@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+# Times the bitset dataflow analyses on generated programs of growing size:
+# the time per block and the worklist visits per block should stay flat.
+# The garbage collector is off while timing, as in benchmarks/cfgScaling.py.
+#
+# Run from the repository root: python benchmarks/dataflowScaling.py
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonCFG import CFG
+from typthonDataflow import AvailableExpressions, Liveness, ReachingDefinitions
+from typthonIRGen import IRGen
+from typthonParser import typthonParser
+from typthonTypeChecker import TypeChecker
+
+ANALYSES = {
+    "liveness": Liveness,
+    "reaching": ReachingDefinitions,
+    "available": AvailableExpressions,
+}
+
+# Each chunk reads and writes a few variables of its own on top of the
+# shared ones, so the number of facts grows with the program.
+CHUNK = """
+v{n} : int = a + {n}
+i = 0
+while i < 10 : {{
+    if a % 3 == 0 : {{
+        a = a + v{n}
+        b = b - 1
+    }} elif b > 100 and a < 50 : {{
+        v{n} = a * b
+        while v{n} > 10 : {{
+            v{n} = v{n} - 7
+        }}
+        b = v{n}
+    }} else : {{
+        a = a - 1
+    }}
+    i = i + 1
+}}
+"""
+
+
+def program(chunks):
+    return "a : int = 0\nb : int = 0\ni : int = 0\n" + "".join(
+        CHUNK.format(n=n) for n in range(chunks)
+    )
+
+
+def analyze(cfg, analysis):
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    problem = analysis(cfg).solve()
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed, problem
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Dataflow analysis scaling benchmark")
+    argparser.add_argument(
+        "--chunks", type=int, nargs="+", default=[100, 400, 1600], help="Program sizes"
+    )
+    argparser.add_argument("-n", type=int, default=3, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    parser = typthonParser()
+    print(f"{'analysis':<12}{'blocks':>8}{'facts':>8}{'visits/block':>14}{'ms':>10}{'us/block':>10}")
+    for chunks in args.chunks:
+        root = parser.parse(program(chunks))
+        TypeChecker().typecheck(root)
+        ir_generator = IRGen()
+        ir_generator.generate(root)
+        cfg = CFG(ir_generator.get_IR_list().module)
+        cfg.compute_dominators()
+        blocks = len(cfg.order)
+
+        for name, analysis in ANALYSES.items():
+            best = None
+            for _ in range(args.n):
+                elapsed, problem = analyze(cfg, analysis)
+                best = elapsed if best is None else min(best, elapsed)
+            print(
+                f"{name:<12}{blocks:>8}{len(problem.universe):>8}"
+                f"{problem.iterations / blocks:>14.2f}{best * 1000:>10.2f}"
+                f"{best / blocks * 1e6:>10.2f}"
+            )
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+# Compares the run time of generated programs with top-level code left at
+# module scope (global variables) and hoisted into main() (fast locals).
+#
+# Run from the repository root: python benchmarks/hoistMain.py
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonCompiler import compile_source
+
+PROGRAMS = {
+    "arithmetic": """
+i : int = 0
+total : int = 0
+while i < {n} : {{
+    total = total + i * 3 % 7 - 1
+    i = i + 1
+}}
+""",
+    "arrays": """
+xs : [int] = [1, 2, 3, 4, 5, 6, 7, 8]
+i : int = 0
+total : int = 0
+while i < {n} : {{
+    total = total + xs[i % 8] * xs[(i + 3) % 8]
+    i = i + 1
+}}
+""",
+    "dicts": """
+counts : dict<int, int> = {{}}
+counts.set(0, 0)
+counts.set(1, 0)
+i : int = 0
+while i < {n} : {{
+    counts.set(i % 2, counts.get(i % 2) + 1)
+    i = i + 1
+}}
+""",
+    "calls": """
+def step(x : int) -> int : {{
+    return x + 1
+}}
+i : int = 0
+while i < {n} : {{
+    i = step(i)
+}}
+""",
+}
+
+
+def run(code, n):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        exec(code, {})
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Top-level hoisting runtime benchmark")
+    argparser.add_argument("--iterations", type=int, default=200000, help="Loop iterations")
+    argparser.add_argument("-n", type=int, default=5, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    print(f"{'program':<12}{'module ms':>12}{'main ms':>12}{'speedup':>10}")
+    for name, template in PROGRAMS.items():
+        text = template.format(n=args.iterations)
+        before = compile_source(text, optimize=False, code=True)
+        after = compile_source(text, optimize=False, code=True, hoist_main=True)
+        assert before.ok and after.ok, before.diagnostics + after.diagnostics
+        module_time = run(before.code, args.n)
+        main_time = run(after.code, args.n)
+        print(
+            f"{name:<12}{module_time * 1000:>12.2f}{main_time * 1000:>12.2f}"
+            f"{module_time / main_time:>9.2f}x"
+        )
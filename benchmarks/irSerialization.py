@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Compares getting the IR of generated programs of growing size by running
+# the front end (parsing, typechecking and IR generation) with loading it
+# back from the text and binary formats of typthonIRFormat, and the sizes
+# of both. The garbage collector is off while timing, as in
+# benchmarks/cfgScaling.py.
+#
+# Run from the repository root: python benchmarks/irSerialization.py
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonIRFormat import dump_ir, load_ir, parse_ir
+from typthonIRGen import IRGen
+from typthonParser import typthonParser
+from typthonTypeChecker import TypeChecker
+
+CHUNK = """
+def f{n}(xs : [int], d : dict<str, int>) -> int : {{
+    i : int = 0
+    total : int = 0
+    while i < 10 and total < 1000 : {{
+        if xs[i % 4] % 2 == 0 : {{
+            total = total + xs[i % 4] * {n}
+        }} else : {{
+            total = total - d.get("k{n}")
+        }}
+        i = i + 1
+    }}
+    return total
+}}
+counts.set("k{n}", {n})
+r = f{n}([1, 2, 3, 4], counts)
+"""
+
+
+def program(chunks):
+    return (
+        "counts : dict<str, int> = {}\nr : int = 0\n"
+        + "".join(CHUNK.format(n=n) for n in range(chunks))
+    )
+
+
+def best(function, n):
+    times = []
+    for _ in range(n):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+        gc.enable()
+    return min(times), result
+
+
+def front_end(parser, text):
+    root = parser.parse(text)
+    TypeChecker().typecheck(root)
+    ir_generator = IRGen()
+    ir_generator.generate(root)
+    return ir_generator.get_IR_list()
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="IR serialization benchmark")
+    argparser.add_argument(
+        "--chunks", type=int, nargs="+", default=[100, 400, 1600], help="Program sizes"
+    )
+    argparser.add_argument("-n", type=int, default=3, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    parser = typthonParser()
+    print(
+        f"{'instrs':>8}{'front end ms':>14}{'text out ms':>13}{'text in ms':>12}"
+        f"{'bin out ms':>12}{'bin in ms':>11}{'text KB':>9}{'bin KB':>8}"
+    )
+    for chunks in args.chunks:
+        text = program(chunks)
+        front_time, ir = best(lambda: front_end(parser, text), args.n)
+        instructions = sum(len(function.instructions) for function in ir.functions.values())
+
+        dump_text_time, dumped_text = best(lambda: str(ir), args.n)
+        load_text_time, loaded = best(lambda: parse_ir(dumped_text), args.n)
+        assert str(loaded) == dumped_text
+        dump_binary_time, dumped = best(lambda: dump_ir(ir), args.n)
+        load_binary_time, loaded = best(lambda: load_ir(dumped), args.n)
+        assert str(loaded) == dumped_text
+        print(
+            f"{instructions:>8}{front_time * 1000:>14.2f}{dump_text_time * 1000:>13.2f}"
+            f"{load_text_time * 1000:>12.2f}{dump_binary_time * 1000:>12.2f}"
+            f"{load_binary_time * 1000:>11.2f}{len(dumped_text) / 1024:>9.1f}"
+            f"{len(dumped) / 1024:>8.1f}"
+        )
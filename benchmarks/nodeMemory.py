@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# Measures the memory of the AST and the IR of a generated program of about
+# 100k lines: the bytes each node takes (the object and, for classes without
+# __slots__, its __dict__; what it refers to is not counted) and the peak
+# RSS of the process after each phase.
+#
+# Run from the repository root: python benchmarks/nodeMemory.py
+
+import argparse
+import os
+import resource
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonHoist import walk
+from typthonIRGen import IRGen
+from typthonParser import typthonParser
+from typthonTypeChecker import TypeChecker
+
+# 20 lines.
+CHUNK = """def f{n}(xs : [int], d : dict<str, int>) -> int : {{
+    i : int = 0
+    total : int = 0
+    while i < 8 : {{
+        if xs[i % 4] % 2 == 0 and total < 100 : {{
+            total += xs[i % 4] * {n}
+        }} elif d.get("k") > i : {{
+            total -= 1
+        }} else : {{
+            total = total + i
+        }}
+        i += 1
+    }}
+    return total
+}}
+counts.set("k", {n})
+r = f{n}([1, 2, 3, 4], counts)
+x = r * 2 + {n}
+x -= r % 3
+label = "chunk{n}"
+"""
+
+
+def program(lines):
+    chunks = max(1, lines // CHUNK.count("\n"))
+    return (
+        "counts : dict<str, int> = {}\nr : int = 0\nx : int = 0\nlabel : str = \"\"\n"
+        + "".join(CHUNK.format(n=n) for n in range(chunks))
+    )
+
+
+def node_bytes(node):
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def peak_rss_mb():
+    # Kilobytes on Linux, bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def report(title, nodes):
+    counts = {}
+    sizes = {}
+    for node in nodes:
+        name = node.__class__.__name__
+        counts[name] = counts.get(name, 0) + 1
+        sizes[name] = sizes.get(name, 0) + node_bytes(node)
+    total = sum(sizes.values())
+    print(f"{title}: {len(nodes)} nodes, {total / 2**20:.1f} MB, {total / len(nodes):.1f} bytes/node")
+    for name in sorted(counts, key=counts.get, reverse=True):
+        print(f"    {name:<18}{counts[name]:>9}{sizes[name] / counts[name]:>8.0f} bytes")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="AST and IR memory benchmark")
+    argparser.add_argument("--lines", type=int, default=100000, help="Program size in lines")
+    args = argparser.parse_args()
+
+    text = program(args.lines)
+    parser = typthonParser()
+    phases = [("start", peak_rss_mb())]
+    root = parser.parse(text)
+    phases.append(("parse", peak_rss_mb()))
+    TypeChecker().typecheck(root)
+    phases.append(("typecheck", peak_rss_mb()))
+    ir_generator = IRGen()
+    ir_generator.generate(root)
+    program_ir = ir_generator.get_IR_list()
+    phases.append(("irgen", peak_rss_mb()))
+
+    print(f"{text.count(chr(10))} lines")
+    print("peak RSS: " + ", ".join(f"{phase} {rss:.1f} MB" for phase, rss in phases))
+    report("AST", list(walk(root)))
+    report("IR", [
+        instruction
+        for function in program_ir.functions.values()
+        for instruction in function.instructions
+    ])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# Compares cold and warm parse latency.
+#
+#   generate: no tables anywhere, LALR tables are built from the grammar
+#   load:     tables are loaded read-only from a pre-generated cache directory
+#   rebuild:  the old behaviour, lexer and tables rebuilt before every parse
+#   warm:     the tables built once per process are reused
+#
+# Run from the repository root: python benchmarks/parserStartup.py
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import typthonParser as parser_module
+from typthonParser import typthonParser
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "statements.typ")
+
+
+def cold(tabdir, data):
+    parser_module._built.clear()
+    start = time.perf_counter()
+    typthonParser(tabdir=tabdir).parse(data)
+    return time.perf_counter() - start
+
+
+def rebuild(tabdir, data):
+    p = typthonParser(tabdir=tabdir)
+    start = time.perf_counter()
+    p.build()
+    p.parse(data)
+    return time.perf_counter() - start
+
+
+def warm(tabdir, data):
+    p = typthonParser(tabdir=tabdir)
+    start = time.perf_counter()
+    p.parse(data)
+    return time.perf_counter() - start
+
+
+def report(label, samples):
+    samples.sort()
+    print(f"{label:<10} median {samples[len(samples) // 2] * 1000:9.3f} ms   "
+          f"min {samples[0] * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Parser startup benchmark")
+    argparser.add_argument("FILE", nargs="?", default=SAMPLE, help="Input file")
+    argparser.add_argument("-n", type=int, default=20, help="Repetitions")
+    args = argparser.parse_args()
+
+    with open(args.FILE) as f:
+        data = f.read()
+
+    with tempfile.TemporaryDirectory() as tabdir:
+        generate = []
+        for _ in range(max(1, args.n // 4)):
+            with tempfile.TemporaryDirectory() as fresh:
+                generate.append(cold(fresh, data))
+        typthonParser(tabdir=tabdir)
+        load = [cold(tabdir, data) for _ in range(args.n)]
+        rebuilt = [rebuild(tabdir, data) for _ in range(args.n)]
+        warmed = [warm(tabdir, data) for _ in range(args.n)]
+
+    report("generate", generate)
+    report("load", load)
+    report("rebuild", rebuilt)
+    report("warm", warmed)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Compares compile latency of the cold CLI against a warm compile server.
+#
+#   cold cli:   a new `typthonCompiler.py FILE` process per compile
+#   client:     a new `typthonClient.py FILE` process per compile
+#   in-process: one request over the socket, without interpreter startup
+#
+# Run from the repository root: python benchmarks/serverLatency.py
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from typthonServer import request
+
+SAMPLE = os.path.join(ROOT, "tests", "optimizationTestIntermediate.typ")
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def timed(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<12} p50 {percentile(samples, 50) * 1000:8.2f} ms   "
+          f"p99 {percentile(samples, 99) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Compile server latency benchmark")
+    argparser.add_argument("FILE", nargs="?", default=SAMPLE, help="Input file")
+    argparser.add_argument("-n", type=int, default=50, help="Repetitions")
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, os.path.basename(args.FILE))
+        shutil.copy(args.FILE, path)
+        socket_path = os.path.join(tmp, "typthon.sock")
+        with open(path) as f:
+            data = f.read()
+
+        compiler = os.path.join(ROOT, "typthonCompiler.py")
+        client = os.path.join(ROOT, "typthonClient.py")
+        server = subprocess.Popen(
+            [sys.executable, compiler, "--serve", "--socket", socket_path],
+            stdout=subprocess.PIPE,
+        )
+        try:
+            server.stdout.readline()
+
+            cold = timed(lambda: subprocess.run([sys.executable, compiler, path], check=True), args.n)
+            thin = timed(
+                lambda: subprocess.run(
+                    [sys.executable, client, "--socket", socket_path, path], check=True
+                ),
+                args.n,
+            )
+            warm = timed(lambda: request(data, path, {}, socket_path), args.n)
+        finally:
+            server.terminate()
+            server.wait()
+
+    report("cold cli", cold)
+    report("client", thin)
+    report("in-process", warm)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Times putting generated programs of growing size into SSA form and taking
+# them back out. The time per instruction should stay close to flat as the
+# programs grow. The garbage collector is off while timing, as in
+# benchmarks/cfgScaling.py.
+#
+# Run from the repository root: python benchmarks/ssaScaling.py
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonCFG import CFG
+from typthonIRGen import IRGen
+from typthonParser import typthonParser
+from typthonSSA import SSAConstructor, SSADestructor
+from typthonTypeChecker import TypeChecker
+
+# Several variables written on different paths, so joins need phis.
+CHUNK = """
+i = 0
+while i < 10 : {{
+    if a % 3 == 0 : {{
+        a = a + {n}
+        b = b - 1
+    }} elif b > 100 and a < 50 : {{
+        c = a * b
+        while c > 10 : {{
+            c = c - 7
+        }}
+        b = c
+    }} else : {{
+        a = a - 1
+    }}
+    i = i + 1
+}}
+"""
+
+
+def program(chunks):
+    return (
+        "a : int = 0\nb : int = 0\nc : int = 0\ni : int = 0\n"
+        + "".join(CHUNK.format(n=n) for n in range(chunks))
+    )
+
+
+def round_trip(module):
+    """
+    Puts module into SSA form and back, returning the construction and
+    destruction times and the number of phis inserted.
+    """
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    constructor = SSAConstructor(CFG(module))
+    cfg = constructor.run()
+    built = time.perf_counter()
+    SSADestructor(cfg).run()
+    done = time.perf_counter()
+    gc.enable()
+    return built - start, done - built, constructor.phis
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="SSA construction scaling benchmark")
+    argparser.add_argument(
+        "--chunks", type=int, nargs="+", default=[250, 1000, 4000], help="Program sizes"
+    )
+    argparser.add_argument("-n", type=int, default=3, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    parser = typthonParser()
+    print(
+        f"{'instrs':>8}{'blocks':>8}{'phis':>8}{'to ssa ms':>11}{'from ssa ms':>13}"
+        f"{'us/instr':>10}"
+    )
+    for chunks in args.chunks:
+        root = parser.parse(program(chunks))
+        TypeChecker().typecheck(root)
+
+        best = None
+        for _ in range(args.n):
+            # Both passes rewrite the IR in place, so every run starts from
+            # freshly generated instructions.
+            ir_generator = IRGen()
+            ir_generator.generate(root)
+            module = ir_generator.get_IR_list().module
+            instructions = len(module.instructions)
+            blocks = len(CFG(module).blocks)
+            times = round_trip(module)
+            if best is None or times[0] + times[1] < best[0] + best[1]:
+                best = times
+        to_ssa, from_ssa, phis = best
+        print(
+            f"{instructions:>8}{blocks:>8}{phis:>8}{to_ssa * 1000:>11.2f}"
+            f"{from_ssa * 1000:>13.2f}{(to_ssa + from_ssa) / instructions * 1e6:>10.2f}"
+        )
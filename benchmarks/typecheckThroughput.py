@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+# Measures typechecking throughput, in AST nodes per second, on generated
+# programs heavy in types: nested array and dict types in declarations,
+# parameters and return types, and the comparisons of them the checker makes
+# at almost every node. Parsing is not timed. The garbage collector is off
+# while timing, as in benchmarks/cfgScaling.py.
+#
+# Run from the repository root: python benchmarks/typecheckThroughput.py
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonHoist import walk
+from typthonParser import typthonParser
+from typthonTypeChecker import TypeChecker
+
+PROGRAMS = {
+    # Scalars: int and bool operators, conditions and assignments.
+    "scalar": """
+def s{n}(a : int, b : int, c : bool) -> int : {{
+    x : int = a * b + {n} - a % 7
+    if c and x > b or not c : {{
+        x = x - b * 2
+    }} elif x == a : {{
+        x = -x
+    }}
+    while x > 100 and c : {{
+        x = x / 2
+    }}
+    return x
+}}
+r = s{n}(r, {n}, r < {n})
+""",
+    # Nested array types: [[int]], [[[str]]], indexing, slicing and builtins.
+    "arrays": """
+def a{n}(grid : [[int]], names : [[[str]]], i : int) -> [[int]] : {{
+    row : [int] = grid[i % 2]
+    rows : [[int]] = [row, grid[1], [i, {n}, i * 2]]
+    words : [[str]] = names[0]
+    first : [str] = words[0]
+    picked : [[str]] = [first, ["a{n}", "b"], first[0:1]]
+    rows.append([row[0] + {n}])
+    more : [[[str]]] = [picked, names[1], [first]]
+    return rows[0:2]
+}}
+grid = a{n}(grid, names, {n})
+""",
+    # Dict types with nested values: dict<str, [str]>, dict<int, dict<str, [int]>>.
+    "dicts": """
+def d{n}(index : dict<str, [str]>, nested : dict<int, dict<str, [int]>>, k : str) -> [str] : {{
+    inner : dict<str, [int]> = nested.get({n})
+    values : [int] = inner.get(k)
+    inner.set(k, [values[0] + {n}, values[1]])
+    nested.set({n}, inner)
+    other : dict<str, [int]> = {{}}
+    other.set("x{n}", values)
+    index.set(k, [k, "v{n}"])
+    return index.get(k)
+}}
+found = d{n}(index, nested, "k")
+""",
+}
+
+PRELUDE = """r : int = 0
+grid : [[int]] = [[1, 2], [3, 4]]
+names : [[[str]]] = [[["a", "b"], ["c"]], [["d"]]]
+index : dict<str, [str]> = {}
+nested : dict<int, dict<str, [int]>> = {}
+found : [str] = ["x"]
+"""
+
+
+def program(template, chunks):
+    return PRELUDE + "".join(template.format(n=n) for n in range(chunks))
+
+
+def best(function, n):
+    times = []
+    for _ in range(n):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+        gc.enable()
+    return min(times)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Typechecking throughput benchmark")
+    argparser.add_argument("--chunks", type=int, default=2000, help="Functions per program")
+    argparser.add_argument("-n", type=int, default=5, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    parser = typthonParser()
+    print(f"{'program':<10}{'lines':>8}{'nodes':>9}{'typecheck ms':>14}{'knodes/s':>10}")
+    for name, template in PROGRAMS.items():
+        text = program(template, args.chunks)
+        root = parser.parse(text)
+        nodes = sum(1 for _ in walk(root))
+        elapsed = best(lambda: TypeChecker().typecheck(root), args.n)
+        print(
+            f"{name:<10}{text.count(chr(10)):>8}{nodes:>9}{elapsed * 1000:>14.2f}"
+            f"{nodes / elapsed / 1000:>10.1f}"
+        )
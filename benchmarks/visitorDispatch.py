@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+# Compares the shared dispatch tables of typthonAST with the dispatch they
+# replaced, building "prefix" + class name and calling getattr at every
+# node, on the five passes that walk the AST: TypeChecker.typecheck,
+# IRGen.generate, TargetGen.translate, Optimizer.parse (through
+# build_call_graph) and NodeVisitor.visit (printing to /dev/null). The old
+# dispatch is rebuilt by subclasses overriding the dispatch method. The
+# garbage collector is off while timing, as in benchmarks/cfgScaling.py.
+#
+# Run from the repository root: python benchmarks/visitorDispatch.py
+
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonAST import NodeVisitor
+from typthonHoist import walk
+from typthonIRGen import IRGen
+from typthonOptimizer import Optimizer
+from typthonParser import typthonParser
+from typthonTargetGen import TargetGen
+from typthonTypeChecker import TypeChecker
+
+# 20 lines.
+CHUNK = """def f{n}(xs : [int], d : dict<str, int>) -> int : {{
+    i : int = 0
+    total : int = 0
+    while i < 8 : {{
+        if xs[i % 4] % 2 == 0 and total < 100 : {{
+            total += xs[i % 4] * {n}
+        }} elif d.get("k") > i : {{
+            total -= 1
+        }} else : {{
+            total = total + i
+        }}
+        i += 1
+    }}
+    return total
+}}
+counts.set("k", {n})
+r = f{n}([1, 2, 3, 4], counts)
+x = r * 2 + {n}
+x -= r % 3
+label = "chunk{n}"
+"""
+
+
+def program(lines):
+    chunks = max(1, lines // CHUNK.count("\n"))
+    return (
+        "counts : dict<str, int> = {}\nr : int = 0\nx : int = 0\nlabel : str = \"\"\n"
+        + "".join(CHUNK.format(n=n) for n in range(chunks))
+    )
+
+
+class GetattrTypeChecker(TypeChecker):
+    def typecheck(self, node, st=None):
+        method = "check_" + node.__class__.__name__
+        return getattr(self, method)(node, st)
+
+
+class GetattrIRGen(IRGen):
+    def generate(self, node, dest=None, statement=False):
+        method = "gen_" + node.__class__.__name__
+        return getattr(self, method)(node, dest, statement)
+
+
+class GetattrTargetGen(TargetGen):
+    def translate(self, node, statement=False):
+        method = "translate_" + node.__class__.__name__
+        return getattr(self, method)(node, statement)
+
+
+class GetattrOptimizer(Optimizer):
+    def parse(self, node):
+        method = "parse_" + node.__class__.__name__
+        return getattr(self, method)(node)
+
+
+class GetattrNodeVisitor(NodeVisitor):
+    def visit(self, node, offset=0):
+        method = "visit_" + node.__class__.__name__
+        return getattr(self, method, self.generic_visit)(node, offset)
+
+
+def passes(root):
+    """
+    (name, tables version, getattr version) of each pass, as functions
+    running it over root.
+    """
+    def visit(visitor_class):
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            visitor_class().visit(root)
+
+    return [
+        ("typecheck", lambda: TypeChecker().typecheck(root),
+         lambda: GetattrTypeChecker().typecheck(root)),
+        ("irgen", lambda: IRGen().generate(root), lambda: GetattrIRGen().generate(root)),
+        ("targetgen", lambda: TargetGen("bench.typ", root, None).generate(),
+         lambda: GetattrTargetGen("bench.typ", root, None).generate()),
+        ("optimizer parse", lambda: Optimizer(root).build_call_graph(),
+         lambda: GetattrOptimizer(root).build_call_graph()),
+        ("nodevisitor", lambda: visit(NodeVisitor), lambda: visit(GetattrNodeVisitor)),
+    ]
+
+
+def best(function, n):
+    times = []
+    for _ in range(n):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+        gc.enable()
+    return min(times)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="AST visitor dispatch benchmark")
+    argparser.add_argument("--lines", type=int, default=100000, help="Program size in lines")
+    argparser.add_argument("-n", type=int, default=3, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    root = typthonParser().parse(program(args.lines))
+    TypeChecker().typecheck(root)
+    print(f"{sum(1 for _ in walk(root))} nodes")
+    print(f"{'pass':<18}{'getattr ms':>12}{'tables ms':>12}{'speedup':>9}")
+    for name, tables, getattr_dispatch in passes(root):
+        old = best(getattr_dispatch, args.n)
+        new = best(tables, args.n)
+        print(f"{name:<18}{old * 1000:>12.1f}{new * 1000:>12.1f}{old / new:>8.2f}x")
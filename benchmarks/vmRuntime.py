@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# Compares running programs on the IR virtual machine with running the
+# Python the compiler generates for them, on loop and recursion workloads.
+# The Python column is exec() of the already compiled code object and the
+# VM column VM.run() of the already compiled VM code; compiling for the VM
+# is timed on its own.
+#
+# Run from the repository root: python benchmarks/vmRuntime.py
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from typthonCompiler import compile_source
+from typthonIRGen import IRGen
+from typthonParser import typthonParser
+from typthonTypeChecker import TypeChecker
+from typthonVM import VM
+
+PROGRAMS = {
+    "loop": """
+i : int = 0
+total : int = 0
+while i < {n} : {{
+    if i % 3 == 0 : {{
+        total = total + i * 3 % 7
+    }} else : {{
+        total = total - 1
+    }}
+    i = i + 1
+}}
+""",
+    "arrays": """
+xs : [int] = [1, 2, 3, 4, 5, 6, 7, 8]
+i : int = 0
+total : int = 0
+while i < {n} : {{
+    total = total + xs[i % 8] * xs[(i + 3) % 8]
+    i = i + 1
+}}
+""",
+    "dicts": """
+counts : dict<int, int> = {{}}
+counts.set(0, 0)
+counts.set(1, 0)
+i : int = 0
+while i < {n} : {{
+    counts.set(i % 2, counts.get(i % 2) + 1)
+    i = i + 1
+}}
+""",
+    "calls": """
+def step(x : int) -> int : {{
+    return x + 1
+}}
+i : int = 0
+while i < {n} : {{
+    i = step(i)
+}}
+""",
+    "recursion": """
+def fib(n : int) -> int : {{
+    if n < 2 : {{
+        return n
+    }}
+    return fib(n - 1) + fib(n - 2)
+}}
+f : int = fib({depth})
+""",
+}
+
+
+def best(function, n):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="IR virtual machine runtime benchmark")
+    argparser.add_argument("--iterations", type=int, default=200000, help="Loop iterations")
+    argparser.add_argument("--depth", type=int, default=22, help="Argument of the recursive fib")
+    argparser.add_argument("-n", type=int, default=5, help="Repetitions, best is reported")
+    args = argparser.parse_args()
+
+    parser = typthonParser()
+    print(f"{'program':<12}{'python ms':>12}{'vm ms':>12}{'vm/python':>11}{'vm compile ms':>15}")
+    for name, template in PROGRAMS.items():
+        text = template.format(n=args.iterations, depth=args.depth)
+        result = compile_source(text, optimize=False, code=True)
+        assert result.ok, result.diagnostics
+
+        root = parser.parse(text)
+        TypeChecker().typecheck(root)
+        ir_generator = IRGen()
+        ir_generator.generate(root)
+        program = ir_generator.get_IR_list()
+        vm = VM(program)
+        # Both must end with the same variables.
+        values = vm.run()
+        scope = {}
+        exec(result.code, scope)
+        assert values == {name: scope[name] for name in values}, name
+
+        python_time = best(lambda: exec(result.code, {}), args.n)
+        vm_time = best(vm.run, args.n)
+        compile_time = best(lambda: VM(program), args.n)
+        print(
+            f"{name:<12}{python_time * 1000:>12.2f}{vm_time * 1000:>12.2f}"
+            f"{vm_time / python_time:>10.2f}x{compile_time * 1000:>15.3f}"
+        )
@@ -6,6 +6,10 @@ python ./typthonCompiler.py tests/testIRGen2.typ > tests/out/testIRGen2.out
 python ./typthonCompiler.py tests/testIRGen.typ > tests/out/testIRGen.out
 python ./typthonCompiler.py tests/testIRGen.typ > tests/out/testIRGen.out
 
+#Batch mode over two workers with a file that does not exist: it is reported on its own and the others still compile.
+#Timings are cut from the summary line.
+python ./typthonCompiler.py -j 2 tests/expressions.typ tests/missing.typ tests/statements.typ 2>&1 | sed 's/ in [0-9.]*s with .*//' > tests/out/batchMissingFile.out
+
 #These tests are to show the optimization working.
 python ./typthonCompiler.py -o tests/optimizationTestBasic.typ > tests/out/optimizationTestBasic.out
 python ./typthonCompiler.py -o tests/optimizationTestIntermediate.typ > tests/out/optimizationTestIntermediate.out
@@ -14,6 +18,71 @@ python ./typthonCompiler.py -o tests/optimizationTestAdvanced.typ > tests/out/op
 #Note that because neither function is called, the compiler optimizes both functions out of the source.
 python ./typthonCompiler.py -o tests/optimizationTestNest.typ > tests/out/optimizationTestNest.out
 
+#Only functions reachable from top-level code are kept: unused() calls used() but is never called itself.
+python ./typthonCompiler.py -o --inline-budget 0 tests/optimizationTestReachability.typ > tests/out/optimizationTestReachability.out
+
+#-O1 runs only the cheap passes, dead functions, folding and dead code, so twice() is not inlined. -ftail-calls adds
+#the tail call pass on top of the level.
+python ./typthonCompiler.py -O1 -ftail-calls tests/optimizationTestLevels.typ > tests/out/optimizationTestLevels.out
+
+#Functions returning calls to themselves become while True loops that reassign their parameters, through a temporary
+#where they read each other (gcd, swap). fib() makes calls that are not tail calls and stays recursive. The arguments
+#of order() call push(), so all of them are computed into temporaries in source order before any parameter changes.
+python ./typthonCompiler.py -o tests/optimizationTestTailCalls.typ > tests/out/optimizationTestTailCalls.out
+
+#Calls to small functions are inlined, as an expression or as statements on renamed _inl variables. Functions left
+#with no calls are removed. addg() reads the global g, so its call in shadow(), which declares its own g, is left alone.
+#Top-level calls are only inlined as expressions, so no _inl variables become globals; expanded() shows the statements.
+#viaBase() calls the global base(), so it is not inlined into outer(), which defines a base() of its own.
+python ./typthonCompiler.py -o tests/optimizationTestInlining.typ > tests/out/optimizationTestInlining.out
+
+#Constant expressions are folded, and variables declared once and never reassigned are replaced by their value.
+python ./typthonCompiler.py -o tests/optimizationTestFolding.typ > tests/out/optimizationTestFolding.out
+
+#Loop-invariant expressions are computed once into _licm variables in front of the loop. Indexing and d.get are only
+#hoisted from the condition, and not at all from loops that mutate a list or dict (grow) or may not index (empty).
+#unary() hoists the unary not b and -n.
+python ./typthonCompiler.py -o --inline-budget 0 tests/optimizationTestLICM.typ > tests/out/optimizationTestLICM.out
+
+#Expressions and d.get lookups computed more than once in a run of statements are computed once into _cse variables.
+#Assigning a variable they read, d.set and calls end their reuse; lookup() keeps xs[0] + d.get(k) as written.
+#negate() reuses the unary -n and not b.
+python ./typthonCompiler.py -o --inline-budget 0 tests/optimizationTestCSE.typ > tests/out/optimizationTestCSE.out
+
+#Branches on constant conditions are pruned and local stores nothing reads are removed; xs.append is kept.
+python ./typthonCompiler.py -o tests/optimizationTestDeadCode.typ > tests/out/optimizationTestDeadCode.out
+
+#The three-address IR printed by -i: nested expressions become temporaries, and/or short-circuit through branches and
+#nested functions are qualified by their parent. --backend ir lowers the same IR back into Python.
+python ./typthonCompiler.py -i tests/threeAddressCode.typ > tests/out/threeAddressCodeIR.out
+python ./typthonCompiler.py --backend ir tests/threeAddressCode.typ > tests/out/threeAddressCode.out
+
+#Basic blocks of the IR with their edges, immediate dominators and dominance frontiers. walk() starts with a loop, so
+#an empty entry block goes in front of it; the block after pick()'s if/else is unreachable.
+python ./typthonCFG.py tests/controlFlowGraph.typ > tests/out/controlFlowGraph.out
+
+#The IR in SSA form: every write makes a new version and phis merge them where paths join, e.g. the loop head of fib().
+#--backend ir --ssa takes the same IR back out of SSA form before lowering it to Python.
+python ./typthonCompiler.py -i --ssa tests/staticSingleAssignment.typ > tests/out/staticSingleAssignmentIR.out
+python ./typthonCompiler.py --backend ir --ssa tests/staticSingleAssignment.typ > tests/out/staticSingleAssignment.out
+
+#Live names, reaching definitions and available expressions on entry to each block. In mix(), b = b - 1 on one path
+#means no expression reading b is available after the if/else.
+python ./typthonDataflow.py tests/dataflowAnalysis.typ > tests/out/dataflowAnalysis.out
+
+#The program run on the IR virtual machine, printing its variables. depth(5000) recurses deeper than the Python
+#recursion limit: the VM keeps its own call stack. bump() reads counts and seen from tally() and step from the module.
+python ./typthonVM.py tests/virtualMachine.typ > tests/out/virtualMachine.out
+
+#--emit-ir saves the IR as text (.ir) or marshalled (.irc). Loading either back skips lexing, parsing and typechecking:
+#-i prints the loaded text IR unchanged, the compiler lowers it to Python and the VM runs the binary one. The strings
+#look like instructions and the variables are named after IR keywords, and label.sign is the nested sign().
+python ./typthonCompiler.py -i --emit-ir text tests/irSerialization.typ > tests/out/irSerializationIR.out
+python ./typthonCompiler.py -i tests/irSerialization.ir > tests/out/irSerializationLoaded.out
+python ./typthonCompiler.py tests/irSerialization.ir > tests/out/irSerialization.out
+python ./typthonCompiler.py -i --emit-ir binary tests/irSerialization.typ > /dev/null
+python ./typthonVM.py tests/irSerialization.irc > tests/out/irSerializationVM.out
+
 #These tests are to show the type extension working, and it failing type checking. Last 4 tests are meant to fail.
 python ./typthonCompiler.py tests/typeExtensionBasic.typ > tests/out/typeExtensionBasic.out
 python ./typthonCompiler.py tests/typeExtensionIntermediate.typ > tests/out/typeExtensionIntermediate.out
@@ -29,6 +98,10 @@ python ./typthonCompiler.py tests/ifElseExtensionElif.typ > tests/out/ifElseExte
 python ./typthonCompiler.py tests/failTests/ifElseExtensionNoReturn.typ &> tests/failTestsOut/ifElseExtensionNoReturn.out
 python ./typthonCompiler.py tests/failTests/ifElseExtensionNoElifReturn.typ &> tests/failTestsOut/ifElseExtensionNoElifReturn.out
 
+#Top-level code hoisted into a generated main(), with variables shared with functions left global. So is scale(),
+#defined inside a top-level if, as scaled() calls it.
+python ./typthonCompiler.py --hoist-main tests/hoistMain.typ > tests/out/hoistMain.out
+
 # #These tests are meant to fail, they are to show the typechecker working.
 
 # These two tests deal with type mismatches of binary operations.
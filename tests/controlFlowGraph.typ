@@ -0,0 +1,21 @@
+def walk(n : int) -> int : {
+    while n > 0 : {
+        if n % 2 == 0 : {
+            n = n - 2
+        } else : {
+            while n > 5 : {
+                n = n - 5
+            }
+            n = n - 1
+        }
+    }
+    return n
+}
+def pick(x : int) -> int : {
+    if x > 0 : {
+        return 1
+    } else : {
+        return 2
+    }
+}
+r : int = walk(10) + pick(3)
@@ -0,0 +1,24 @@
+def scan(xs : [int], n : int) -> int : {
+    i : int = 0
+    best : int = 0
+    while i < n : {
+        v : int = xs[i] * 2
+        if v > best : {
+            best = v
+        }
+        i = i + 1
+    }
+    return best
+}
+def mix(a : int, b : int) -> int : {
+    c : int = a + b
+    d : int = a * b
+    if a > b : {
+        c = c * 2
+    } else : {
+        b = b - 1
+    }
+    return a * b + c + d
+}
+s : int = scan([3, 9, 4], 3)
+m : int = mix(s, 2)
@@ -3,7 +3,7 @@ stringVar = "abc"
 boolVar = True
 intttyBOI = 1 + 1
 secondVar = integerVar
-randomVar = notTrue
+randomVar = not True
 x = 1
 y = -x
 y = 2
@@ -18,5 +18,5 @@ array.remove(5)
 array.pop(0)
 def f():
     x = True
-    return notx
+    return not x
 f()
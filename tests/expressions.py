@@ -19,7 +19,7 @@ bools = x > y
 bools = x <= y
 bools = x >= y
 bools = bools
-bools = bools or True and x < y
+bools = (bools or True) and x < y
 arr = [1,2,3,4]
 x = arr[0]
 slice = arr[0:2]
@@ -0,0 +1,22 @@
+def bump(n):
+    history.append(1)
+    return counter + n
+def main(x):
+    counter = x
+    return counter
+def scaled(n):
+    return scale(n) + 1
+def main_(bump=bump,main=main,scaled=scaled):
+    global counter, history, scale
+    counter = 0
+    history = [0]
+    i = 0
+    while i < 3:
+        counter = bump(i)
+        i = i + 1
+    result = main(counter)
+    if result > 0 :
+        def scale(n):
+            return n * 10
+    s = scaled(result)
+main_()
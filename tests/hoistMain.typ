@@ -0,0 +1,30 @@
+counter : int = 0
+history : [int] = [0]
+
+def bump(n : int) -> int : {
+    history.append(1)
+    return counter + n
+}
+
+def main(x : int) -> int : {
+    counter : int = x
+    return counter
+}
+
+i : int = 0
+while i < 3 : {
+    counter = bump(i)
+    i = i + 1
+}
+result : int = main(counter)
+
+if result > 0 : {
+    def scale(n : int) -> int : {
+        return n * 10
+    }
+}
+
+def scaled(n : int) -> int : {
+    return scale(n) + 1
+}
+s : int = scaled(result)
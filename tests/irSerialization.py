@@ -0,0 +1,41 @@
+def sign(x):
+    return x
+def label(n):
+    def sign(x):
+        _t1 = -(x)
+        return _t1
+    _pc = 0
+    while True:
+        if _pc == 0:
+            _t1 = n < 0
+            _pc = 1 if _t1 else 2
+        elif _pc == 1:
+            _t2 = sign(n)
+            _t1 = _t2 > 3
+            _pc = 2
+        elif _pc == 2:
+            _pc = 3 if _t1 else 4
+        elif _pc == 3:
+            return "minus, 'one'"
+        elif _pc == 4:
+            _t3 = sign(n)
+            _t4 = _t3 > -1
+            _t5 = not _t4
+            _pc = 5 if _t5 else 6
+        elif _pc == 5:
+            return 'call f(x)'
+        elif _pc == 6:
+            _pc = 7
+        elif _pc == 7:
+            return "it's"
+goto = -5
+call = [goto,2,-3]
+_t1 = goto % 3
+call.append(_t1)
+words = {}
+_t2 = call.pop(0)
+words['a b'] = _t2
+first = label(goto)
+part = call[1:3]
+half = goto / 2
+end = sign(goto)
@@ -0,0 +1,23 @@
+def sign(x : int) -> int : {
+    return x
+}
+def label(n : int) -> str : {
+    def sign(x : int) -> int : {
+        return -x
+    }
+    if n < 0 and sign(n) > 3 : {
+        return "minus, 'one'"
+    } elif not (sign(n) > -1) : {
+        return "call f(x)"
+    }
+    return "it's"
+}
+goto : int = -5
+call : [int] = [goto, 2, -3]
+call.append(goto % 3)
+words : dict<str, int> = {}
+words.set("a b", call.pop(0))
+first : str = label(goto)
+part : [int] = call[1:3]
+half : int = goto / 2
+end : int = sign(goto)
@@ -1,6 +1,4 @@
-def funkyFunction(x,y):
-    return x + y
 def funkyFunction2(z):
-    y = funkyFunction(z,1)
+    y = z + 1
     return y
 funk = funkyFunction2(15)
@@ -1,3 +1,3 @@
 x = 5
 y = 6
-z = x + y
+z = 11
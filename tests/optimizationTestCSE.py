@@ -0,0 +1,47 @@
+def f(x,y,z):
+    _cse2 = x * y
+    _cse1 = _cse2 + z
+    a = _cse1
+    b = _cse2 - z
+    c = _cse1
+    return a + b + c
+def g(d,k):
+    _cse3 = d[k]
+    s = _cse3 + _cse3
+    d[k] = 1
+    _cse4 = d[k]
+    t = _cse4 * 2
+    return s + t + _cse4
+def h(x,y):
+    n = x + y
+    x = x + 1
+    _cse5 = x + y
+    m = _cse5
+    if _cse5 > n :
+        return x + y > m
+    return False
+def lookup(d,xs,k):
+    a = xs[0] + d[k]
+    _cse6 = d[k]
+    b = _cse6 * _cse6
+    return a + b
+def negate(n,b):
+    _cse7 = -n
+    a = _cse7 + 1
+    c = _cse7 + 2
+    _cse8 = not b
+    if _cse8 and _cse8 :
+        return a + c
+    return a - c
+d = {}
+d[1] = 5
+e = {}
+e[3] = 6
+r1 = f(2,3,4)
+r2 = g(d,1)
+r3 = h(1,2)
+r4 = lookup(e,[7],3)
+r5 = negate(4,False)
+i = 0
+while i < 3:
+    i = i + 1
@@ -0,0 +1,47 @@
+def f(x : int, y : int, z : int) -> int : {
+    a : int = x * y + z
+    b : int = x * y - z
+    c : int = x * y + z
+    return a + b + c
+}
+def g(d : dict<int, int>, k : int) -> int : {
+    s : int = d.get(k) + d.get(k)
+    d.set(k, 1)
+    t : int = d.get(k) * 2
+    return s + t + d.get(k)
+}
+def h(x : int, y : int) -> bool : {
+    n : int = x + y
+    x = x + 1
+    m : int = x + y
+    if x + y > n: {
+        return x + y > m
+    }
+    return False
+}
+def lookup(d : dict<int, int>, xs : [int], k : int) -> int : {
+    a : int = xs[0] + d.get(k)
+    b : int = d.get(k) * d.get(k)
+    return a + b
+}
+def negate(n : int, b : bool) -> int : {
+    a : int = -n + 1
+    c : int = -n + 2
+    if not b and not b : {
+        return a + c
+    }
+    return a - c
+}
+d : dict<int, int> = {}
+d.set(1, 5)
+e : dict<int, int> = {}
+e.set(3, 6)
+r1 : int = f(2, 3, 4)
+r2 : int = g(d, 1)
+r3 : bool = h(1, 2)
+r4 : int = lookup(e, [7], 3)
+r5 : int = negate(4, False)
+i : int = 0
+while i < 3: {
+    i = i + 1
+}
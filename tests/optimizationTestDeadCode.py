@@ -0,0 +1,13 @@
+mode = 2
+xs = [1,2]
+def pick(a):
+    keep = a
+    trap = 10 % a
+    xs.append(a)
+    keep = keep + 1
+    if a > 0 :
+        keep = keep * 2
+    return keep
+r = pick(5)
+e = 2
+r = r + 1
@@ -0,0 +1,46 @@
+mode : int = 2
+xs : [int] = [1, 2]
+
+def pick(a : int) -> int : {
+    unused : int = a * 2
+    spin : int = 0
+    spin = spin + 1
+    keep : int = a
+    trap : int = 10 % a
+    xs.append(a)
+    if mode == 1 : {
+        return 1
+    } elif mode == 2 : {
+        keep = keep + 1
+    } elif a > 3 : {
+        return 3
+    } else : {
+        return 4
+    }
+    while False : {
+        keep = 0
+    }
+    if mode > 5 : {
+        return 9
+    } elif a > 0 : {
+        keep = keep * 2
+    }
+    return keep
+}
+
+def empty(a : int) -> int : {
+    if a > 0 : {
+        t : int = a + 1
+    }
+    return a
+}
+
+r : int = pick(5)
+e : int = empty(2)
+if False : {
+    r = 0
+} elif True : {
+    r = r + 1
+} else : {
+    r = 2
+}
@@ -0,0 +1,12 @@
+x = 14
+y = -6
+neg = 1
+flag = False
+s = "a\tb"
+same = True
+z = 0
+z = z + 14
+d = 7 / 2
+w = False
+v = True
+r = 140
@@ -0,0 +1,19 @@
+x : int = 3 * 4 + 2
+y : int = x - 20
+neg : int = -y % 5
+flag : bool = not (x > 10 and True)
+s : str = "a\tb"
+same : bool = s == "a\tb"
+z : int = 0
+z = z + x
+d : int = 7 / 2
+def f(a : int) -> int : {
+    k : int = 10
+    if k > 5 : {
+        return a * k
+    }
+    return a + x
+}
+w : bool = False and f(1) > 2
+v : bool = f(2) > 2 or False
+r : int = f(x)
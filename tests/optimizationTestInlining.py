@@ -0,0 +1,42 @@
+g = 10
+def sq(x):
+    return x * x
+def addg(x):
+    return x + g
+def poly(a,b):
+    t = a * 2
+    u = t + b
+    return u * u
+def shadow(x):
+    g = 1
+    return addg(x) + g
+ys = [4,5]
+a = 9
+b = sq(a + 1)
+c = a + g
+d = ys[0]
+e = poly(a,b)
+f = 4 + poly(2,3)
+h = shadow(1)
+k = 0
+k = poly(sq(k + 1),2)
+def base():
+    return 101
+def viaBase():
+    return base()
+def outer():
+    def base():
+        return 200
+    return viaBase()
+m = outer()
+def expanded(p,q):
+    _inl1_t = p * 2
+    _inl2_u = _inl1_t + q
+    n = _inl2_u * _inl2_u
+    _inl1_x = n + 1
+    _inl3_a = _inl1_x * _inl1_x
+    _inl4_t = _inl3_a * 2
+    _inl5_u = _inl4_t + 2
+    n = _inl5_u * _inl5_u
+    return n
+n = expanded(a,b)
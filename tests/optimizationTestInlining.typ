@@ -0,0 +1,51 @@
+g : int = 10
+def sq(x : int) -> int : {
+    return x * x
+}
+def addg(x : int) -> int : {
+    return x + g
+}
+def first(xs : [int]) -> int : {
+    return xs[0]
+}
+def poly(a : int, b : int) -> int : {
+    t : int = a * 2
+    u : int = t + b
+    return u * u
+}
+def combo(a : int, b : int) -> int : {
+    return sq(a) + poly(a, b)
+}
+def shadow(x : int) -> int : {
+    g : int = 1
+    return addg(x) + g
+}
+ys : [int] = [4, 5]
+a : int = sq(3)
+b : int = sq(a + 1)
+c : int = addg(a)
+d : int = first(ys)
+e : int = poly(a, b)
+f : int = combo(2, 3)
+h : int = shadow(1)
+k : int = 0
+k = poly(sq(k + 1), 2)
+def base() -> int : {
+    return 101
+}
+def viaBase() -> int : {
+    return base()
+}
+def outer() -> int : {
+    def base() -> int : {
+        return 200
+    }
+    return viaBase()
+}
+m : int = outer()
+def expanded(p : int, q : int) -> int : {
+    n : int = poly(p, q)
+    n = poly(sq(n + 1), 2)
+    return n
+}
+n : int = expanded(a, b)
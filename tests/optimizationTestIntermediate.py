@@ -4,5 +4,5 @@ def funkyFunction2(z):
     else:
         return z
 x = 5
-y = funkyFunction2(x)
-z = x + y
+y = funkyFunction2(5)
+z = 5 + y
@@ -0,0 +1,68 @@
+def squares(n):
+    i = 0
+    total = 0
+    _licm1 = n * n
+    _licm2 = n + 1
+    while i < _licm1:
+        total = total + i * _licm2
+        i = i + 1
+    return total
+def prefix(arr,k):
+    i = 0
+    _licm3 = arr[0:k] == arr[0:k]
+    while _licm3 and i < k:
+        i = i + 1
+    return i
+def first(xs,n):
+    i = 0
+    _licm4 = xs[0]
+    _licm5 = n / 2
+    while i < _licm4:
+        if i > _licm5 :
+            break
+        i = i + 1
+    return i
+def grow(d,n):
+    while d[0] < n:
+        d[0] = d[0] + 1
+    return d[0]
+def counts(d,k,n):
+    i = 0
+    total = 0
+    _licm6 = k + 1
+    while i < n:
+        j = 0
+        _licm7 = _licm6 * (i + 1)
+        while j < n:
+            total = total + d[k] + _licm7
+            j = j + 1
+        i = i + 1
+    return total
+def empty(xs,n):
+    i = 0
+    while i < n:
+        i = i + xs[0]
+    return i
+def unary(b,n):
+    i = 0
+    t = 0
+    _licm8 = not b
+    _licm9 = -n
+    while i < 3:
+        i = i + 1
+        if _licm8 :
+            t = t + 1
+        t = t + _licm9
+    return t
+d = {}
+d[2] = 3
+d[0] = 1
+r1 = squares(4)
+r2 = prefix([1,2,3],2)
+r3 = first([10],6)
+r4 = grow(d,5)
+r5 = counts(d,2,3)
+ys = [1]
+ys.pop(0)
+r6 = empty(ys,0)
+r7 = unary(False,4)
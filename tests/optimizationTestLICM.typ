@@ -0,0 +1,76 @@
+def squares(n : int) -> int : {
+    i : int = 0
+    total : int = 0
+    while i < n * n : {
+        total = total + i * (n + 1)
+        i = i + 1
+    }
+    return total
+}
+def prefix(arr : [int], k : int) -> int : {
+    i : int = 0
+    while arr[0 : k] == arr[0 : k] and i < k : {
+        i = i + 1
+    }
+    return i
+}
+def first(xs : [int], n : int) -> int : {
+    i : int = 0
+    while i < xs[0] : {
+        if i > n / 2 : {
+            break
+        }
+        i = i + 1
+    }
+    return i
+}
+def grow(d : dict<int, int>, n : int) -> int : {
+    while d.get(0) < n : {
+        d.set(0, d.get(0) + 1)
+    }
+    return d.get(0)
+}
+def counts(d : dict<int, int>, k : int, n : int) -> int : {
+    i : int = 0
+    total : int = 0
+    while i < n : {
+        j : int = 0
+        while j < n : {
+            total = total + d.get(k) + (k + 1) * (i + 1)
+            j = j + 1
+        }
+        i = i + 1
+    }
+    return total
+}
+def empty(xs : [int], n : int) -> int : {
+    i : int = 0
+    while i < n : {
+        i = i + xs[0]
+    }
+    return i
+}
+def unary(b : bool, n : int) -> int : {
+    i : int = 0
+    t : int = 0
+    while i < 3 : {
+        i = i + 1
+        if not b : {
+            t = t + 1
+        }
+        t = t + -n
+    }
+    return t
+}
+d : dict<int, int> = {}
+d.set(2, 3)
+d.set(0, 1)
+r1 : int = squares(4)
+r2 : int = prefix([1, 2, 3], 2)
+r3 : int = first([10], 6)
+r4 : int = grow(d, 5)
+r5 : int = counts(d, 2, 3)
+ys : [int] = [1]
+ys.pop(0)
+r6 : int = empty(ys, 0)
+r7 : int = unary(False, 4)
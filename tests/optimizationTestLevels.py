@@ -0,0 +1,12 @@
+def twice(x):
+    return x * 2
+def total(n,acc):
+    while True:
+        if n == 0 :
+            return acc
+        _tail1 = n - 1
+        _tail2 = acc + twice(n)
+        n = _tail1
+        acc = _tail2
+base = 7
+t = total(7,0)
@@ -0,0 +1,14 @@
+def twice(x : int) -> int : {
+    return x * 2
+}
+def total(n : int, acc : int) -> int : {
+    if n == 0 : {
+        return acc
+    }
+    return total(n - 1, acc + twice(n))
+}
+def unused() -> int : {
+    return 0
+}
+base : int = 3 + 4
+t : int = total(base, 0)
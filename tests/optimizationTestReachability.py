@@ -0,0 +1,5 @@
+def helper():
+    return 1
+def used():
+    return helper()
+x = used()
@@ -0,0 +1,16 @@
+def helper() -> int : {
+    return 1
+}
+def used() -> int : {
+    return helper()
+}
+def unused() -> int : {
+    return used()
+}
+def outer(a : int) -> int : {
+    def inner(b : int) -> int : {
+        return b
+    }
+    return a
+}
+x : int = used()
@@ -0,0 +1,56 @@
+def count(n,acc):
+    while True:
+        if n == 0 :
+            return acc
+        acc = acc + n
+        n = n - 1
+def gcd(a,b):
+    while True:
+        if b == 0 :
+            return a
+        else:
+            _tail4 = b
+            _tail5 = a % b
+            a = _tail4
+            b = _tail5
+def sign(x,steps):
+    while True:
+        if x > 0 :
+            x = x - 1
+            steps = steps + 1
+        else:
+            if x < 0 :
+                x = x + 1
+                steps = steps + 1
+            else:
+                return steps
+def fib(n):
+    if n < 2 :
+        return n
+    return fib(n - 1) + fib(n - 2)
+def swap(a,b,n):
+    while True:
+        if n == 0 :
+            return a * 10 + b
+        n = n - 1
+        _tail3 = a
+        a = b
+        b = _tail3
+r1 = count(100000,0)
+r2 = gcd(1071,462)
+r3 = sign(-5,0)
+r4 = fib(15)
+r5 = swap(1,2,3)
+def push(xs,v):
+    xs.append(v)
+    return v
+def order(a,b,xs):
+    while True:
+        if a > 20 :
+            return a + b
+        _tail1 = a + 1 + push(xs,1)
+        _tail2 = a + push(xs,2)
+        a = _tail1
+        b = _tail2
+calls = [9]
+r6 = order(0,0,calls)
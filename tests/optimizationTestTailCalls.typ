@@ -0,0 +1,51 @@
+def count(n : int, acc : int) -> int : {
+    if n == 0 : {
+        return acc
+    }
+    return count(n - 1, acc + n)
+}
+def gcd(a : int, b : int) -> int : {
+    if b == 0 : {
+        return a
+    } else : {
+        return gcd(b, a % b)
+    }
+}
+def sign(x : int, steps : int) -> int : {
+    if x > 0 : {
+        return sign(x - 1, steps + 1)
+    } elif x < 0 : {
+        return sign(x + 1, steps + 1)
+    } else : {
+        return steps
+    }
+}
+def fib(n : int) -> int : {
+    if n < 2 : {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+def swap(a : int, b : int, n : int) -> int : {
+    if n == 0 : {
+        return a * 10 + b
+    }
+    return swap(b, a, n - 1)
+}
+r1 : int = count(100000, 0)
+r2 : int = gcd(1071, 462)
+r3 : int = sign(-5, 0)
+r4 : int = fib(15)
+r5 : int = swap(1, 2, 3)
+def push(xs : [int], v : int) -> int : {
+    xs.append(v)
+    return v
+}
+def order(a : int, b : int, xs : [int]) -> int : {
+    if a > 20 : {
+        return a + b
+    }
+    return order(a + 1 + push(xs, 1), a + push(xs, 2), xs)
+}
+calls : [int] = [9]
+r6 : int = order(0, 0, calls)
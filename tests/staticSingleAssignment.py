@@ -0,0 +1,41 @@
+def fib(n):
+    _pc = 0
+    while True:
+        if _pc == 0:
+            a = 0
+            b = 1
+            _pc = 1
+        elif _pc == 1:
+            _t1 = n > 0
+            _pc = 2 if _t1 else 3
+        elif _pc == 2:
+            t = a + b
+            a = b
+            b = t
+            n = n - 1
+            _pc = 1
+        elif _pc == 3:
+            return a
+def clamp(x,lo,hi):
+    _pc = 0
+    while True:
+        if _pc == 0:
+            _t1 = x < lo
+            _pc = 1 if _t1 else 2
+        elif _pc == 1:
+            x = lo
+            _pc = 5
+        elif _pc == 2:
+            _t2 = x > hi
+            _pc = 3 if _t2 else 4
+        elif _pc == 3:
+            x = hi
+            _pc = 4
+        elif _pc == 4:
+            _pc = 5
+        elif _pc == 5:
+            return x
+f = fib(20)
+_t1 = clamp(f,0,1000)
+_t2 = clamp(-5,0,10)
+c = _t1 + _t2
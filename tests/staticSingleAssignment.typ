@@ -0,0 +1,21 @@
+def fib(n : int) -> int : {
+    a : int = 0
+    b : int = 1
+    while n > 0 : {
+        t : int = a + b
+        a = b
+        b = t
+        n = n - 1
+    }
+    return a
+}
+def clamp(x : int, lo : int, hi : int) -> int : {
+    if x < lo : {
+        x = lo
+    } elif x > hi : {
+        x = hi
+    }
+    return x
+}
+f : int = fib(20)
+c : int = clamp(f, 0, 1000) + clamp(-5, 0, 10)
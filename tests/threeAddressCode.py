@@ -0,0 +1,73 @@
+def lookup(d,k):
+    _pc = 0
+    while True:
+        if _pc == 0:
+            _t1 = k > 0
+            _pc = 1 if _t1 else 2
+        elif _pc == 1:
+            _t2 = d[k]
+            _t1 = _t2 > 1
+            _pc = 2
+        elif _pc == 2:
+            return _t1
+def total(xs,limit):
+    def scale(x):
+        _t1 = x * limit
+        return _t1
+    _pc = 0
+    while True:
+        if _pc == 0:
+            i = 0
+            sum = 0
+            _pc = 1
+        elif _pc == 1:
+            _t1 = i < 5
+            _pc = 2 if _t1 else 10
+        elif _pc == 2:
+            i = i + 1
+            _t2 = sum > 100
+            _pc = 4 if _t2 else 3
+        elif _pc == 3:
+            _t3 = i < 5
+            _t2 = not _t3
+            _pc = 4
+        elif _pc == 4:
+            _pc = 5 if _t2 else 6
+        elif _pc == 5:
+            _pc = 10
+        elif _pc == 6:
+            _t4 = i - 1
+            _t5 = xs[_t4]
+            _t6 = _t5 % 2
+            _t7 = _t6 == 1
+            _pc = 7 if _t7 else 8
+        elif _pc == 7:
+            _t8 = i - 1
+            _t9 = xs[_t8]
+            _t10 = scale(_t9)
+            sum = sum + _t10
+            _pc = 8
+        elif _pc == 8:
+            _pc = 9
+        elif _pc == 9:
+            _pc = 1
+        elif _pc == 10:
+            return sum
+_pc = 0
+while True:
+    if _pc == 0:
+        counts = {}
+        counts[1] = 3
+        xs = [1,2,3,4,5]
+        xs.append(7)
+        last = xs.pop(5)
+        _t1 = lookup(counts,1)
+        _pc = 2 if _t1 else 1
+    elif _pc == 1:
+        _t1 = lookup(counts,-1)
+        _pc = 2
+    elif _pc == 2:
+        found = _t1
+        _t2 = xs[0:5]
+        t = total(_t2,10)
+        break
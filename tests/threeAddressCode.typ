@@ -0,0 +1,26 @@
+def lookup(d : dict<int, int>, k : int) -> bool : {
+    return k > 0 and d.get(k) > 1
+}
+def total(xs : [int], limit : int) -> int : {
+    def scale(x : int) -> int : {
+        return x * limit
+    }
+    i : int = 0
+    sum : int = 0
+    while i < 5 : {
+        i += 1
+        if sum > 100 or not (i < 5) : {
+            break
+        } elif xs[i - 1] % 2 == 1 : {
+            sum = sum + scale(xs[i - 1])
+        }
+    }
+    return sum
+}
+counts : dict<int, int> = {}
+counts.set(1, 3)
+xs : [int] = [1, 2, 3, 4, 5]
+xs.append(7)
+last : int = xs.pop(5)
+found : bool = lookup(counts, 1) or lookup(counts, -1)
+t : int = total(xs[0:5], 10)
@@ -0,0 +1,38 @@
+step : int = 1
+def fib(n : int) -> int : {
+    if n < 2 : {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+def depth(n : int) -> int : {
+    if n == 0 : {
+        return 0
+    }
+    return depth(n - 1) + 1
+}
+def tally(words : [str]) -> dict<str, int> : {
+    counts : dict<str, int> = {}
+    seen : int = 0
+    def bump(word : str) -> int : {
+        if seen > 0 and word == words[0] : {
+            return counts.get(word) + step
+        }
+        return step
+    }
+    i : int = 0
+    while i < 4 : {
+        counts.set(words[i], bump(words[i]))
+        seen = seen + 1
+        i += 1
+    }
+    return counts
+}
+words : [str] = ["a", "b", "a", "c"]
+words.append("d")
+removed : str = words.pop(4)
+f : int = fib(15)
+deep : int = depth(5000)
+counts : dict<str, int> = tally(words)
+half : int = f / 2
+tail : [str] = words[1:3]
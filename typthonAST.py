@@ -15,18 +15,81 @@ class Node(object):
         children: Method to return list of children. Alternatively, you can
                   look into __iter__ method, which allow nodes to be
                   iterable.
+
+        __slots__: The attributes __init__ sets, in order. Nodes have no
+                   __dict__, so there is no setting other attributes.
     """
 
+    __slots__ = ()
+
     def children(self):
         """
         A sequence of all children that are Nodes
         """
         pass
 
+    def attributes(self):
+        """
+        (name, value) pairs of the attributes of the node, in the order of
+        __slots__, as vars(node).items() gives for an object with a
+        __dict__. Attributes __init__ does not set are left out.
+        """
+        return [
+            (name, getattr(self, name)) for name in self.__slots__ if hasattr(self, name)
+        ]
+
     # Set of attributes for a given node
     attr_names = ()
 
 
+class DispatchTable(dict):
+    """
+    Maps node classes to the handler a pass has for them: the method of
+    visitor_class named prefix + the node class name, or the method named
+    default when there is none. Each handler is looked up once, the first
+    time a node of its class is dispatched, and kept as the plain function,
+    called with the pass as first argument:
+
+        self.handlers[node.__class__](self, node, ...)
+
+    This replaces building the method name and calling getattr at every node.
+    """
+
+    def __init__(self, visitor_class, prefix, default=None):
+        super().__init__()
+        self.visitor_class = visitor_class
+        self.prefix = prefix
+        self.default = default
+
+    def __missing__(self, node_class):
+        name = self.prefix + node_class.__name__
+        handler = getattr(self.visitor_class, name, None)
+        if handler is None:
+            if self.default is None:
+                raise AttributeError(
+                    f"'{self.visitor_class.__name__}' object has no attribute '{name}'"
+                )
+            handler = getattr(self.visitor_class, self.default)
+        self[node_class] = handler
+        return handler
+
+
+# DispatchTable of each (pass class, prefix), shared by all instances.
+DISPATCH_TABLES = {}
+
+
+def dispatch_table(visitor_class, prefix, default=None):
+    """
+    The DispatchTable of visitor_class for handlers named prefix + class
+    name, built on first use and shared by every instance of the class.
+    """
+    key = (visitor_class, prefix)
+    table = DISPATCH_TABLES.get(key)
+    if table is None:
+        table = DISPATCH_TABLES[key] = DispatchTable(visitor_class, prefix, default)
+    return table
+
+
 class NodeVisitor(object):
     """
     A base NodeVisitor class for visiting MiniJava nodes.
@@ -36,12 +99,14 @@ class NodeVisitor(object):
     Refer to visit_Program, for example
     """
 
+    def __init__(self):
+        self.handlers = dispatch_table(self.__class__, "visit_", "generic_visit")
+
     def visit(self, node, offset=0):
         """
         Your compiler can call this method to traverse through your AST
         """
-        method = "visit_" + node.__class__.__name__
-        return getattr(self, method, self.generic_visit)(node, offset)
+        return self.handlers[node.__class__](self, node, offset)
 
     def generic_visit(self, node, offset=0):
         """
@@ -80,6 +145,8 @@ class File(Node):
     The entire file is essentially a list of statements.
     """
 
+    __slots__ = ("statements",)
+
     def __init__(self, statements, coord=None):
         self.statements = statements
 
@@ -97,6 +164,8 @@ class StmtList(Node):
     AST Node for a list of statements.
     """
 
+    __slots__ = ("stmt_lst", "coord")
+
     def __init__(self, stmt_lst, coord=None):
         self.stmt_lst = stmt_lst
         self.coord = coord
@@ -115,6 +184,8 @@ class VarDecl(Node):
     AST Node for a variable declaration.
     """
 
+    __slots__ = ("name", "type", "expr", "coord")
+
     def __init__(self, name, type, expr=None, coord=None):
         self.name = name
         self.type = type
@@ -140,6 +211,8 @@ class FunctionDefn(Node):
     AST Node for function declaration.
     """
 
+    __slots__ = ("name", "ret_type", "params", "body", "coord")
+
     def __init__(self, name, ret_type, params, body, coord=None):
         self.name = name
         self.ret_type = ret_type
@@ -165,6 +238,8 @@ class RetStmt(Node):
     AST Node for return statement.
     """
 
+    __slots__ = ("expr", "coord")
+
     def __init__(self, expr, coord=None):
         self.expr = expr
         self.coord = coord
@@ -186,6 +261,8 @@ class WhileStmt(Node):
     AST Node for a while loop.
     """
 
+    __slots__ = ("cond", "body", "coord")
+
     def __init__(self, cond, body, coord=None):
         self.cond = cond
         self.body = body
@@ -207,6 +284,8 @@ class BreakStmt(Node):
     AST Node for a break statement.
     """
 
+    __slots__ = ("coord",)
+
     def __init__(self, coord=None):
         self.coord = coord
 
@@ -220,11 +299,34 @@ class BreakStmt(Node):
     attr_names = ()
 
 
+class ContinueStmt(Node):
+    """
+    AST Node for a continue statement. The language has no continue; the
+    optimizer emits it for tail calls turned into loops.
+    """
+
+    __slots__ = ("coord",)
+
+    def __init__(self, coord=None):
+        self.coord = coord
+
+    def children(self):
+        nodelist = []
+        return tuple(nodelist)
+
+    def __str__(self):
+        return "Continue"
+
+    attr_names = ()
+
+
 class VarAssign(Node):
     """
     AST Node for re-assigning expr to a variable.
     """
 
+    __slots__ = ("name", "expr", "coord")
+
     def __init__(
         self,
         name,
@@ -254,6 +356,8 @@ class ArrayExprList(Node):
     exprs all must be of the same type.
     """
 
+    __slots__ = ("exprs", "coord")
+
     def __init__(self, exprs, coord=None):
         self.exprs = exprs
         self.coord = coord
@@ -279,6 +383,8 @@ class ParamList(Node):
     AST Node for comma separated parameters in a function declaration.
     """
 
+    __slots__ = ("params", "coord")
+
     def __init__(self, params, coord=None):
         self.params = params
         self.coord = coord
@@ -297,6 +403,8 @@ class Param(Node):
     AST Node for a parameter.
     """
 
+    __slots__ = ("name", "type", "coord")
+
     def __init__(self, name, type, coord=None):
         self.name = name
         self.type = type
@@ -316,6 +424,8 @@ class FunctionCall(Node):
     AST Node for a function call.
     """
 
+    __slots__ = ("name", "arguments", "coord")
+
     def __init__(self, name, arguments, coord=None):
         self.name = name
         self.arguments = arguments
@@ -338,6 +448,8 @@ class Arguments(Node):
     AST Node for comma separated expressions passed to a function call.
     """
 
+    __slots__ = ("exprs", "coord")
+
     def __init__(self, exprs, coord=None):
         self.exprs = exprs
         self.coord = coord
@@ -362,6 +474,8 @@ class Constant(Node):
     AST Node for a constant
     """
 
+    __slots__ = ("type", "value", "coord")
+
     def __init__(self, type, value, coord=None):
         self.type = type
         self.value = value
@@ -383,6 +497,8 @@ class ID(Node):
     AST Node for a ID
     """
 
+    __slots__ = ("name", "coord")
+
     def __init__(self, name, coord=None):
         self.name = name
         self.coord = coord
@@ -402,6 +518,8 @@ class Type(Node):
     AST Node for a type.
     """
 
+    __slots__ = ("name", "coord")
+
     def __init__(self, name, coord=None):
         self.name = name
         self.coord = coord
@@ -413,6 +531,9 @@ class Type(Node):
     def __str__(self):
         return str(self.name)
 
+    def __reduce__(self):
+        return (get_type, (self.name,))
+
     attr_names = ("name",)
 
 
@@ -421,6 +542,8 @@ class Array_Type(Node):
     AST Node for an array's type.
     """
 
+    __slots__ = ("innerType", "coord", "name")
+
     def __init__(self, innerType, coord=None):
         self.innerType = innerType
         self.coord = coord
@@ -434,6 +557,9 @@ class Array_Type(Node):
     def __str__(self):
         return f"[{self.innerType}]"
 
+    def __reduce__(self):
+        return (get_array_type, (self.innerType,))
+
     attr_names = ("name",)
 
 
@@ -442,6 +568,8 @@ class FunctionalType(Node):
     AST Node for storing the input and output types of a function
     """
 
+    __slots__ = ("input_type_arr", "returnType", "coord", "name")
+
     # (int, str) -> int
 
     def __init__(self, input_type_arr, returnType, coord=None):
@@ -468,6 +596,8 @@ class BinOp(Node):
     AST Node for binary operations on expressions.
     """
 
+    __slots__ = ("op", "left", "right", "coord")
+
     def __init__(self, op, left, right, coord=None):
         self.op = op
         self.left = left
@@ -493,9 +623,12 @@ class UnaryOp(Node):
     AST Node for unary operations on expressions.
     """
 
+    __slots__ = ("op", "expr", "coord")
+
     def __init__(self, op, expr, coord=None):
         self.op = op
         self.expr = expr
+        self.coord = coord
 
     def children(self):
         nodelist = []
@@ -518,6 +651,8 @@ class IfStmt(Node):
     false_body is optional, as if statements do not need an else statement.
     """
 
+    __slots__ = ("cond", "true_body", "false_body", "coord")
+
     def __init__(self, cond, true_body, false_body, coord=None):
         self.cond = cond
         self.true_body = true_body
@@ -542,6 +677,8 @@ class ElifStmt(Node):
     AST Node for elif statements.
     """
 
+    __slots__ = ("cond", "true_body", "false_body", "coord")
+
     def __init__(self, cond, true_body, false_body, coord=None):
         self.cond = cond
         self.true_body = true_body
@@ -568,6 +705,8 @@ class ArrayBuiltinCall(Node):
     builtinFunction is one of .pop, .append, or .remove.
     """
 
+    __slots__ = ("arrayID", "builtinFunction", "argumentExpression", "coord")
+
     def __init__(self, arrayID, builtinFunction, argumentExpression, coord=None):
         self.arrayID = arrayID
         self.builtinFunction = builtinFunction
@@ -594,6 +733,8 @@ class ArraySlice(Node):
     AST Node for array slicing.
     """
 
+    __slots__ = ("name", "expr1", "expr2", "coord")
+
     def __init__(self, name, expr1, expr2, coord=None):
         self.name = name
         self.expr1 = expr1
@@ -619,6 +760,8 @@ class ArrayIndex(Node):
     AST Node for array slicing.
     """
 
+    __slots__ = ("name", "expr", "coord")
+
     def __init__(self, name, expr, coord=None):
         self.name = name
         self.expr = expr
@@ -641,6 +784,8 @@ class Dict_Type(Node):
     AST Node for dict types
     """
 
+    __slots__ = ("key_type", "val_type", "coord", "name")
+
     def __init__(self, key_type, val_type, coord=None):
         self.key_type = key_type
         self.val_type = val_type
@@ -655,9 +800,60 @@ class Dict_Type(Node):
         nodelist.append(("val_type", self.val_type))
         return tuple(nodelist)
 
+    def __reduce__(self):
+        return (get_dict_type, (self.key_type, self.val_type))
+
     attr_names = ("name",)
 
 
+# Canonical type objects, keyed by class and name or canonical inner types.
+# Types are never changed once built, so each distinct type is built once and
+# shared, and two types are equal exactly when they are the same object.
+# Copying or unpickling a type gives back the canonical one (see __reduce__).
+TYPES = {}
+
+
+def get_type(name):
+    """
+    The canonical Type with the given name, such as "int" or "NullType".
+    """
+    key = (Type, name)
+    type = TYPES.get(key)
+    if type is None:
+        type = TYPES[key] = Type(name)
+    return type
+
+
+def get_array_type(inner_type):
+    """
+    The canonical Array_Type of the canonical inner_type.
+    """
+    key = (Array_Type, inner_type)
+    type = TYPES.get(key)
+    if type is None:
+        type = TYPES[key] = Array_Type(inner_type)
+    return type
+
+
+def get_dict_type(key_type, val_type):
+    """
+    The canonical Dict_Type of the canonical key_type and val_type.
+    """
+    key = (Dict_Type, key_type, val_type)
+    type = TYPES.get(key)
+    if type is None:
+        type = TYPES[key] = Dict_Type(key_type, val_type)
+    return type
+
+
+INT_TYPE = get_type("int")
+STR_TYPE = get_type("str")
+BOOL_TYPE = get_type("bool")
+NULL_TYPE = get_type("NullType")
+# The type of the empty dict {}.
+EMPTY_DICT_TYPE = get_dict_type(NULL_TYPE, NULL_TYPE)
+
+
 class DictBuiltinCall(Node):
     """
     AST Node for dict operations.
@@ -665,6 +861,8 @@ class DictBuiltinCall(Node):
     builtinFunction is one of .set or .get
     """
 
+    __slots__ = ("dictID", "builtinFunction", "argumentExpression", "coord")
+
     def __init__(self, dictID, builtinFunction, argumentExpression, coord=None):
         self.dictID = dictID
         self.builtinFunction = builtinFunction
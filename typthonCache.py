@@ -0,0 +1,197 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+
+# Environment variable naming the default cache directory, and the default
+# size bound of the cache in bytes.
+CACHE_DIR_ENV = "TYPTHON_CACHE_DIR"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Kinds of cached entries. A "file" entry is the whole target output of a
+# source file, a "function" entry is the typechecked signature and target
+# output of one top-level function definition.
+KINDS = ("file", "function")
+
+# String literals are removed before counting braces, see split_top_level.
+STRING_LITERAL = re.compile(r'"(.*?)"')
+
+
+def compiler_fingerprint():
+    """
+    Hash of the compiler's own sources, so that any change to the compiler
+    invalidates everything it cached.
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for filename in sorted(os.listdir(directory)):
+        if filename.startswith("typthon") and filename.endswith(".py"):
+            with open(os.path.join(directory, filename), "rb") as f:
+                digest.update(filename.encode())
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+COMPILER_FINGERPRINT = compiler_fingerprint()
+
+
+def split_top_level(data):
+    """
+    Splits source text into chunks of whole lines at the top level of the
+    file. Returns a list of (kind, lineno, text) where kind is "def" for a
+    top-level function definition and "code" for the statements between
+    them, and lineno is the line the chunk starts on.
+    """
+    chunks = []
+    current = []
+    current_kind = "code"
+    current_line = 1
+    depth = 0
+    opened = False
+
+    def flush(next_line):
+        nonlocal current, current_line
+        text = "".join(current)
+        if text.strip():
+            chunks.append((current_kind, current_line, text))
+        current = []
+        current_line = next_line
+
+    for lineno, line in enumerate(data.splitlines(keepends=True), 1):
+        if depth == 0 and line.lstrip().startswith("def "):
+            flush(lineno)
+            current_kind = "def"
+            opened = False
+        current.append(line)
+
+        stripped = STRING_LITERAL.sub("", line)
+        depth += stripped.count("{") - stripped.count("}")
+        opened = opened or "{" in stripped
+
+        if current_kind == "def" and opened and depth == 0:
+            flush(lineno + 1)
+            current_kind = "code"
+
+    flush(None)
+    return chunks
+
+
+class CompileCache(object):
+    """
+    On-disk cache of compiler output, keyed by content hashes.
+
+    Entries are pickled into one file each under directory/<kind>/. Reading
+    an entry refreshes its modification time, and trim() evicts the least
+    recently used entries once the cache grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = self.empty_stats()
+        for kind in KINDS:
+            os.makedirs(os.path.join(directory, kind), exist_ok=True)
+
+    @staticmethod
+    def empty_stats():
+        stats = {"stores": 0, "evictions": 0}
+        for kind in KINDS:
+            stats[kind + "_hits"] = 0
+            stats[kind + "_misses"] = 0
+        return stats
+
+    def key(self, *parts):
+        """
+        Hash of the compiler fingerprint and the given parts.
+        """
+        digest = hashlib.sha256(COMPILER_FINGERPRINT.encode())
+        for part in parts:
+            digest.update(b"\0")
+            digest.update(str(part).encode())
+        return digest.hexdigest()
+
+    def path(self, kind, key):
+        return os.path.join(self.directory, kind, key)
+
+    def get(self, kind, key):
+        """
+        Returns the cached value, or None on a miss.
+        """
+        path = self.path(kind, key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.stats[kind + "_misses"] += 1
+            return None
+        self.stats[kind + "_hits"] += 1
+        return value
+
+    def put(self, kind, key, value):
+        path = self.path(kind, key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.stats["stores"] += 1
+
+    def entries(self):
+        """
+        List of (mtime, size, path) for every entry in the cache.
+        """
+        entries = []
+        for kind in KINDS:
+            with os.scandir(os.path.join(self.directory, kind)) as it:
+                for entry in it:
+                    if entry.name.endswith(".tmp"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def trim(self):
+        """
+        Evicts least recently used entries until the cache fits in max_bytes.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats["evictions"] += 1
+
+    def take_stats(self):
+        """
+        Returns the counters collected so far and resets them.
+        """
+        stats = self.stats
+        self.stats = self.empty_stats()
+        return stats
+
+    def add_stats(self, stats):
+        for name, count in stats.items():
+            self.stats[name] += count
+
+    def report(self):
+        entries = self.entries()
+        size = sum(size for _, size, _ in entries)
+        s = self.stats
+        return (
+            f"Cache: file {s['file_hits']} hits / {s['file_misses']} misses, "
+            f"function {s['function_hits']} hits / {s['function_misses']} misses, "
+            f"{s['stores']} stores, {s['evictions']} evictions\n"
+            f"Cache: {len(entries)} entries, {size} of {self.max_bytes} bytes in {self.directory}"
+        )
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Thin client for a compile server started with `typthonCompiler.py --serve`.
+# It takes the same flags as typthonCompiler.py and writes the same output,
+# but leaves the compiling to the already warm server process.
+
+import argparse
+import sys
+
+from typthonServer import request, default_socket_path
+
+
+if __name__ == "__main__":
+
+    argparser = argparse.ArgumentParser(
+        description="Compile Typthon source code on a running compile server"
+    )
+    argparser.add_argument("FILE", nargs="+", help="Input files")
+    argparser.add_argument(
+        "-p",
+        "--parse-only",
+        action="store_true",
+        help="Stop after scanning and parsing the input",
+    )
+    argparser.add_argument(
+        "-t", "--typecheck-only", action="store_true", help="Stop after typechecking"
+    )
+    argparser.add_argument(
+        "-i", "--ir-only", action="store_true", help="Stop Aftering creating the IR"
+    )
+    argparser.add_argument(
+        "-o", "--optimize", action="store_true", help="Enables IR optimization, as -O2"
+    )
+    argparser.add_argument(
+        "-O",
+        dest="opt_level",
+        type=int,
+        choices=range(4),
+        metavar="LEVEL",
+        help="Optimization level, 0 to 3",
+    )
+    argparser.add_argument(
+        "-f",
+        dest="pass_flags",
+        action="append",
+        metavar="[no-]PASS",
+        help="Run (-fPASS) or skip (-fno-PASS) an optimization pass",
+    )
+    argparser.add_argument(
+        "--inline-budget",
+        type=int,
+        metavar="N",
+        help="Inline functions of at most N AST nodes",
+    )
+    argparser.add_argument(
+        "--hoist-main",
+        action="store_true",
+        help="Emit top-level statements inside a generated main()",
+    )
+    argparser.add_argument(
+        "--ssa",
+        action="store_true",
+        help="With -i, print the IR in SSA form",
+    )
+    argparser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        metavar="PATH",
+        help="Unix domain socket of the compile server",
+    )
+
+    args = argparser.parse_args()
+    flags = {
+        "parse_only": args.parse_only,
+        "typecheck_only": args.typecheck_only,
+        "ir_only": args.ir_only,
+        "optimize": args.optimize,
+        "opt_level": args.opt_level,
+        "pass_flags": args.pass_flags,
+        "inline_budget": args.inline_budget,
+        "hoist_main": args.hoist_main,
+        "ssa": args.ssa,
+    }
+
+    failed = False
+    for path in args.FILE:
+        with open(path, "r") as f:
+            data = f.read()
+
+        response = request(data, path, flags, args.socket)
+        sys.stdout.write(response["stdout"])
+        if not response["ok"]:
+            print(f"{path}: error: {response['error']}", file=sys.stderr)
+            failed = True
+        elif response["target"] is not None:
+            with open(f"{path[:-4]}.py", "w") as f:
+                f.write(response["target"])
+
+    if failed:
+        sys.exit(1)
@@ -1,18 +1,652 @@
 #!/usr/bin/env python3
 
 import argparse
+import copy
+import io
+import marshal
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+from itertools import repeat
+
 from typthonParser import typthonParser
-from typthonSymbolTable import SymbolTable
+from typthonSymbolTable import SymbolTable, ParseError
 from typthonTypeChecker import TypeChecker
 from typthonIRGen import IRGen
+from typthonCFG import CFG
+from typthonSSA import SSAConstructor, SSADestructor, format_ssa
+from typthonIRFormat import BINARY_EXTENSION, TEXT_EXTENSION, is_ir_file, read_ir, write_ir
 from typthonTargetGen import TargetGen
-from typthonOptimizer import Optimizer
+from typthonPyASTGen import PyASTGen, source_hash, read_pyc, write_pyc
+from typthonOptimizer import (
+    DEFAULT_INLINE_BUDGET, LEVEL_INLINE_BUDGETS, LEVEL_PASSES, PASSES, Optimizer, select_passes
+)
+from typthonStats import CompileStats, count_nodes, count_instructions
+from typthonCache import (
+    CompileCache,
+    CACHE_DIR_ENV,
+    COMPILER_FINGERPRINT,
+    DEFAULT_MAX_BYTES,
+    split_top_level,
+)
+from typthonServer import (
+    CompileServer,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_QUEUE_TIMEOUT,
+    default_socket_path,
+)
 
 import typthonAST as ast
 
+# Parser and cache kept warm by each batch worker process.
+worker_parser = None
+worker_cache = None
 
-if __name__ == "__main__":
+# Flags a compile server request may set, per-thread parsers of the server,
+# and the lock serializing requests whose output goes through stdout.
+SERVER_FLAGS = (
+    "parse_only", "typecheck_only", "ir_only", "optimize", "opt_level", "pass_flags",
+    "inline_budget", "hoist_main", "ssa",
+)
+server_threads = threading.local()
+server_stdout_lock = threading.Lock()
+
+
+def compile_file(path, args, parser=None, cache=None):
+    """
+    Runs the compiler on a single file, stopping after the stage requested
+    by the flags in args.
+    """
+    # Prints additional output if the flag is set
+    if args.verbose:
+        print("* Reading file " + path + "...")
+
+    if is_ir_file(path):
+        compile_ir_file(path, args)
+        return
+
+    f = open(path, "r")
+    data = f.read()
+    f.close()
+
+    if args.backend == "ast":
+        compile_pyc(path, data, args, parser, cache)
+        return
+
+    target_lst = compile_text(path, data, args, parser, cache)
+    if target_lst is not None:
+        target_generator = TargetGen(path, None, None)
+        target_generator.target_lst = target_lst
+        target_generator.write_lines()
+
+
+def compile_ir_file(path, args):
+    """
+    Lowers the IR saved in the file at path by --emit-ir into Python next to
+    it, or prints it with -i. Lexing, parsing and typechecking were done
+    when the IR was written, and so was optimizing.
+    """
+    if args.parse_only or args.typecheck_only or args.ssa or args.backend == "ast":
+        raise ValueError("IR input only supports -i and lowering to Python")
+    program = read_ir(path)
+    if args.ir_only:
+        print(program)
+        return
+
+    if args.verbose:
+        print("* Lowering IR...")
+    target_generator = TargetGen(path, program, None)
+    target_generator.name = os.path.splitext(path)[0]
+    target_generator.generate()
+    target_generator.write_lines()
+
+
+def compile_pyc(path, data, args, parser=None, cache=None):
+    """
+    Compiles the file at path with the ast backend into a .pyc next to it,
+    unless the .pyc already holds the output for this source and flags.
+    """
+    pyc = f"{path[:-4]}.pyc"
+    key = source_hash(data, (COMPILER_FINGERPRINT, output_flags(args)))
+    # Stopping early or saving the IR needs the pipeline to run anyway.
+    must_run = args.parse_only or args.typecheck_only or args.ir_only or args.emit_ir
+    if not must_run and read_pyc(pyc, key) is not None:
+        if args.verbose:
+            print("* " + pyc + " is up to date, skipping...")
+        return
+
+    code = compile_text(path, data, args, parser, cache)
+    if code is not None:
+        write_pyc(code, pyc, key)
+
+
+def compile_text(path, data, args, parser=None, cache=None):
+    """
+    Compiles the source text data of the file at path. Returns the target
+    lines, or a code object with the ast backend, or None when the flags stop
+    the compiler before target generation.
+    """
+    # Build and runs the parser to get AST
+    if parser is None:
+        parser = typthonParser()
+    if args.parse_only:
+        if args.verbose:
+            print("* Scanning and Parsing...")
+        parser.test(data)
+        return None
+
+    stats = CompileStats(path, args.time_passes, args.stats)
+    if cache is not None and not (args.typecheck_only or args.ir_only or args.emit_ir):
+        target_lst = compile_cached(path, data, args, parser, cache, stats)
+    else:
+        target_lst = compile_data(path, data, args, parser, stats)
+
+    if stats.enabled:
+        print(stats.report())
+        if args.stats_json:
+            stats.write_json(args.stats_json)
+    return target_lst
+
+
+def compile_data(path, data, args, parser, stats=None, errors=None):
+    """
+    Runs every stage on the source text data. Returns the target lines, or
+    a code object with the ast backend, or None when the flags stop the
+    compiler before target generation.
+    Lexical errors are collected in errors when a list is given.
+    """
+    if stats is None:
+        stats = CompileStats(path)
+
+    if args.verbose:
+        print("* Scanning and Parsing...")
+
+    if stats.enabled:
+        # Scan up front so lexing and parsing are timed separately.
+        with stats.phase("lex"):
+            tokens = parser.tokenize(data, errors=errors)
+        with stats.phase("parse"):
+            root = parser.parse_tokens(tokens)
+    else:
+        root = parser.parse(data, errors=errors)
+    if stats.memory:
+        stats.count("ast_nodes", count_nodes(root))
+
+    if args.verbose:
+        print("* Typechecking...")
+
+    with stats.phase("typecheck"):
+        typechecker = TypeChecker()
+        typechecker.typecheck(root)
+
+    if args.typecheck_only:
+        return None
+
+    level = optimization_level(args)
+    if level or args.pass_flags:
+        with stats.phase("optimize"):
+            optimizer = Optimizer(root, args.inline_budget, level, args.pass_flags or ())
+            optimizer.optimize()
+            root = optimizer.get_optimized_ir()
+        removed = optimizer.removed_functions
+        pass_manager = optimizer.pass_manager
+        if args.verbose:
+            print(
+                f"* Optimized at -O{level} in {pass_manager.iterations} rounds: "
+                f"{', '.join(dict.fromkeys(pass_manager.passes)) or 'no passes'}"
+            )
+            print(
+                f"* Removed {len(removed)} unreachable functions in "
+                f"{optimizer.elapsed * 1000:.3f} ms: {', '.join(removed) or 'none'}"
+            )
+            print(f"* Turned {optimizer.tail_calls} tail calls into loops")
+            print(f"* Inlined {optimizer.inlined} calls")
+        if stats.enabled:
+            stats.count("optimizer_iterations", pass_manager.iterations)
+            stats.count("pass_ms", {
+                name: round(seconds * 1000, 3) for name, seconds in pass_manager.timings.items()
+            })
+            stats.count("functions_removed", removed)
+            stats.count("dead_function_ms", round(optimizer.elapsed * 1000, 3))
+            stats.count("tail_calls_eliminated", optimizer.tail_calls)
+            stats.count("calls_inlined", optimizer.inlined)
+            stats.count("constants_folded", optimizer.folded)
+            stats.count("constants_propagated", optimizer.propagated)
+            stats.count("invariants_hoisted", optimizer.hoisted)
+            stats.count("subexpressions_eliminated", optimizer.subexpressions)
+            stats.count("branches_pruned", optimizer.branches_pruned)
+            stats.count("stores_removed", optimizer.stores_removed)
+
+    # The IR is only built when something reads it.
+    if args.ir_only or args.backend == "ir" or args.emit_ir or stats.memory:
+        if args.verbose:
+            print("* Generating IR...")
+
+        with stats.phase("irgen"):
+            ir_generator = IRGen()
+            ir_generator.generate(root)
+            program = ir_generator.get_IR_list()
+        if stats.memory:
+            stats.count("ir_instructions", count_instructions(program))
+
+        if args.ssa:
+            with stats.phase("ssa"):
+                constructors = [
+                    SSAConstructor(CFG(function)) for function in program.functions.values()
+                ]
+                cfgs = [constructor.run() for constructor in constructors]
+            if stats.enabled:
+                stats.count("phis", sum(constructor.phis for constructor in constructors))
+            if args.ir_only:
+                print("\n\n".join(format_ssa(cfg) for cfg in cfgs))
+                return None
+            with stats.phase("out-of-ssa"):
+                destructors = [SSADestructor(cfg) for cfg in cfgs]
+                for destructor in destructors:
+                    destructor.run()
+            if stats.enabled:
+                stats.count("phi_copies", sum(destructor.copies for destructor in destructors))
+
+        if args.emit_ir:
+            extension = BINARY_EXTENSION if args.emit_ir == "binary" else TEXT_EXTENSION
+            with stats.phase("write-ir"):
+                write_ir(program, os.path.splitext(path)[0] + extension)
+
+        if args.ir_only:
+            ir_generator.print_ir()
+            return None
+
+    if args.backend == "ast":
+        with stats.phase("emit"):
+            module = PyASTGen(path, root, args.hoist_main).generate()
+        with stats.phase("bytecode"):
+            return compile(module, path, "exec")
+
+    if args.backend == "ir":
+        if args.hoist_main:
+            raise ValueError("--hoist-main needs the text or ast backend")
+        root = program
+
+    with stats.phase("emit"):
+        target_generator = TargetGen(path, root, None, args.hoist_main)
+        return target_generator.generate()
+
+
+class Diagnostic(object):
+    """
+    An error found while compiling. line is None when it is not known.
+    """
+
+    def __init__(self, message, line=None):
+        self.message = message
+        self.line = line
+
+    def __str__(self):
+        if self.line is None:
+            return f"error: {self.message}"
+        return f"line {self.line}: error: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.message!r}, {self.line!r})"
+
+
+class CompileResult(object):
+    """
+    Result of compile_source.
+
+    source: the generated Python source, or None if compilation failed or
+            the ast backend was used
+    code: the compiled code object, if one was requested or the ast
+          backend was used
+    diagnostics: list of Diagnostic
+    """
+
+    def __init__(self, source=None, code=None, diagnostics=None):
+        self.source = source
+        self.code = code
+        self.diagnostics = diagnostics or []
+
+    @property
+    def ok(self):
+        return not self.diagnostics and (self.source is not None or self.code is not None)
+
+
+def compile_source(text, optimize=True, code=False, name="<typthon>", **flags):
+    """
+    Compiles Typthon source text in memory and returns a CompileResult.
+
+    Nothing is read from or written to disk and nothing is printed; errors
+    are returned as diagnostics instead of being raised. With code=True the
+    generated source is also compiled into a code object ready for exec().
+    flags are any other compiler options, named as on the command line
+    (e.g. time_passes=True); backend="ast" compiles straight to a code
+    object without generating source. optimize=True optimizes at -O2;
+    opt_level=N picks another level and pass_flags=["no-inline"] passes.
+    """
+    args = copy.copy(library_args)
+    args.optimize = optimize
+    for flag, value in flags.items():
+        if not hasattr(args, flag):
+            raise TypeError(f"compile_source() got an unknown flag {flag!r}")
+        setattr(args, flag, value)
+
+    lexer_errors = []
+    diagnostics = []
+    target_lst = None
+    try:
+        target_lst = compile_data(name, text, args, typthonParser(), errors=lexer_errors)
+    except ParseError as e:
+        diagnostics.append(Diagnostic(e.args[0], e.args[1] if len(e.args) > 1 else None))
+    except Exception as e:
+        diagnostics.append(Diagnostic(f"{e.__class__.__name__}: {e}"))
+    diagnostics[:0] = [Diagnostic(message, line) for message, line in lexer_errors]
+
+    if target_lst is None or diagnostics:
+        return CompileResult(None, None, diagnostics)
+    if args.backend == "ast":
+        return CompileResult(None, target_lst, diagnostics)
+
+    source = "".join(f"{line}\n" for line in target_lst)
+    result = CompileResult(source, None, diagnostics)
+    if code:
+        result.code = compile(source, name, "exec")
+    return result
+
+
+def optimization_level(args):
+    """
+    The optimization level args ask for: -O, or 2 for -o.
+    """
+    if args.opt_level is not None:
+        return args.opt_level
+    return 2 if args.optimize else 0
+
+
+def output_flags(args):
+    """
+    The flags that change the generated target, part of every cache key.
+    """
+    optimizing = optimization_level(args) or args.pass_flags
+    return (
+        ("opt_level", optimization_level(args)),
+        ("pass_flags", tuple(args.pass_flags or ()) if optimizing else ()),
+        ("inline_budget", args.inline_budget if optimizing else None),
+        ("backend", args.backend),
+        ("hoist_main", bool(args.hoist_main)),
+        ("ssa", bool(args.ssa)),
+    )
+
+
+def compile_cached(path, data, args, parser, cache, stats=None):
+    """
+    Returns the target lines for data from the cache, compiling and storing
+    them on a miss. Code objects of the ast backend are cached marshalled.
+    """
+    if stats is None:
+        stats = CompileStats(path)
+
+    with stats.phase("cache"):
+        key = cache.key(data, output_flags(args))
+        target_lst = cache.get("file", key)
+    if target_lst is not None:
+        if args.verbose:
+            print("* Cache hit, skipping to target output...")
+        if args.backend == "ast":
+            return marshal.loads(target_lst)
+        return target_lst
+
+    target_lst = None
+    optimizing = optimization_level(args) or args.pass_flags
+    if not (optimizing or args.hoist_main) and args.backend == "text":
+        try:
+            with stats.phase("incremental"):
+                target_lst = compile_incremental(path, data, args, parser, cache)
+        except Exception:
+            # Rerun the whole pipeline so errors are reported exactly as
+            # without the cache.
+            target_lst = None
+    if target_lst is None:
+        target_lst = compile_data(path, data, args, parser, stats)
+
+    if args.backend == "ast":
+        cache.put("file", key, marshal.dumps(target_lst))
+    else:
+        cache.put("file", key, target_lst)
+    return target_lst
+
+
+def compile_incremental(path, data, args, parser, cache):
+    """
+    Compiles each top-level function definition on its own, reusing the
+    cached output of any definition whose text and visible declarations are
+    unchanged. Only used without -o and --hoist-main, which need the whole
+    program.
+    """
+    if args.verbose:
+        print("* Compiling top-level definitions incrementally...")
+
+    chunks = split_top_level(data)
+    if not chunks:
+        # Leave empty programs to the whole pipeline, which rejects them.
+        return None
+
+    typechecker = TypeChecker()
+    st = SymbolTable()
+    target_lst = []
+    for kind, lineno, text in chunks:
+        key = None
+        if kind == "def":
+            key = cache.key(text, st.fingerprint(), output_flags(args))
+            entry = cache.get("function", key)
+            if entry is not None:
+                name, input_types, output_type, lines = entry
+                st.declare_function(name, input_types, output_type, lineno)
+                target_lst.extend(lines)
+                continue
+
+        root = parser.parse(text, lineno)
+        typechecker.typecheck(root.statements, st)
+        lines = TargetGen(path, root, {}).generate()
+        target_lst.extend(lines)
+
+        stmts = root.statements.stmt_lst
+        if key is not None and len(stmts) == 1 and isinstance(stmts[0], ast.FunctionDefn):
+            name = stmts[0].name
+            input_types, output_type = st.lookup_function(name, lineno)
+            cache.put("function", key, (name, input_types, output_type, lines))
+
+    return target_lst
+
+
+def open_cache(args):
+    """
+    The compile cache selected by --cache-dir or $TYPTHON_CACHE_DIR, if any.
+    """
+    directory = args.cache_dir or os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    return CompileCache(directory, args.cache_size)
+
+
+def format_error(e):
+    """
+    One line description of a compile error for batch reports.
+    """
+    if isinstance(e, ParseError):
+        if len(e.args) > 1:
+            return f"line {e.args[1]}: {e.args[0]}"
+        return str(e.args[0])
+    return f"{e.__class__.__name__}: {e}"
+
+
+def init_worker(args):
+    """
+    Builds the parser once for every file this worker will compile.
+    """
+    global worker_parser, worker_cache
+    worker_parser = typthonParser()
+    worker_cache = open_cache(args)
+
+
+def compile_job(path, args):
+    """
+    Compiles one file of a batch. Output is captured so that it can be
+    reported in input order, and errors are returned rather than raised.
+    """
+    output = io.StringIO()
+    error = None
+    lines = 0
+    try:
+        # A missing or unreadable file fails here, as its own error.
+        with open(path, "rb") as f:
+            lines = sum(1 for _ in f)
+        with redirect_stdout(output):
+            compile_file(path, args, worker_parser, worker_cache)
+    except Exception as e:
+        error = format_error(e)
 
+    cache_stats = worker_cache.take_stats() if worker_cache is not None else None
+    return path, lines, output.getvalue(), error, cache_stats
+
+
+def collect_files(inputs):
+    """
+    Expands directories into the .typ files below them, in sorted order.
+    Files named directly are kept in the order given.
+    """
+    paths = []
+    for name in inputs:
+        if os.path.isdir(name):
+            for dirpath, dirnames, filenames in os.walk(name):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith(".typ"):
+                        paths.append(os.path.join(dirpath, filename))
+        else:
+            paths.append(name)
+    return paths
+
+
+def compile_batch(paths, args):
+    """
+    Compiles many files over a pool of worker processes and reports errors
+    per file in input order, followed by a throughput summary.
+    Returns the number of files that failed.
+    """
+    jobs = args.jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    # Build the tables before forking so workers inherit them warm rather
+    # than each generating their own.
+    init_worker(args)
+    if jobs == 1 or len(paths) == 1:
+        results = list(map(compile_job, paths, repeat(args)))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_worker, initargs=(args,)
+        ) as pool:
+            results = list(pool.map(compile_job, paths, repeat(args)))
+
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    total_lines = 0
+    for path, lines, output, error, cache_stats in results:
+        total_lines += lines
+        sys.stdout.write(output)
+        if error is not None:
+            failed += 1
+            print(f"{path}: error: {error}", file=sys.stderr)
+        if cache_stats is not None:
+            worker_cache.add_stats(cache_stats)
+
+    print(
+        f"Compiled {len(paths) - failed}/{len(paths)} files ({total_lines} lines) "
+        f"in {elapsed:.3f}s with {jobs} jobs: "
+        f"{len(paths) / elapsed:.1f} files/sec, {total_lines / elapsed:.1f} lines/sec"
+    )
+    finish_cache(worker_cache, args)
+    return failed
+
+
+def serve_request(source, name, flags, defaults, cache):
+    """
+    Handles one compile server request on the calling thread.
+    """
+    args = copy.copy(defaults)
+    args.verbose = False
+    args.time_passes = False
+    args.stats = False
+    # Responses carry source text.
+    args.backend = "text"
+    for flag in SERVER_FLAGS:
+        if flag in flags:
+            setattr(args, flag, flags[flag])
+
+    parser = getattr(server_threads, "parser", None)
+    if parser is None:
+        parser = server_threads.parser = typthonParser().clone()
+
+    output = io.StringIO()
+    target = None
+    error = None
+    try:
+        if args.parse_only or args.ir_only:
+            # These stages print their result, so they must not overlap.
+            with server_stdout_lock, redirect_stdout(output):
+                target_lst = compile_text(name, source, args, parser, cache)
+        else:
+            target_lst = compile_text(name, source, args, parser, cache)
+        if target_lst is not None:
+            target = "".join(f"{line}\n" for line in target_lst)
+    except Exception as e:
+        error = format_error(e)
+
+    return {"ok": error is None, "target": target, "stdout": output.getvalue(), "error": error}
+
+
+def serve(args):
+    """
+    Runs the compile server until interrupted.
+    """
+    cache = open_cache(args)
+    # Build the tables before the first request arrives.
+    typthonParser()
+
+    server = CompileServer(
+        args.socket,
+        partial(serve_request, defaults=args, cache=cache),
+        args.max_concurrency,
+        args.queue_timeout,
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Serving on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        finish_cache(cache, args)
+
+
+def finish_cache(cache, args):
+    """
+    Evicts old entries once a run is over and prints --cache-stats.
+    """
+    if cache is None:
+        return
+    cache.trim()
+    if args.cache_stats:
+        print(cache.report())
+
+
+def build_argparser():
     # Python module "argparse" allows you to easily add commandline flags
     # to your program, which can help with adding debugging options, such
     # as '--verbose' and '--print-ast' as described below.
@@ -22,7 +656,9 @@ if __name__ == "__main__":
     argparser = argparse.ArgumentParser(
         description="Take in the Typthon source code and compile it"
     )
-    argparser.add_argument("FILE", help="Input file")
+    argparser.add_argument(
+        "FILE", nargs="*", help="Input files, or directories of .typ files"
+    )
     argparser.add_argument(
         "-p",
         "--parse-only",
@@ -33,62 +669,161 @@ if __name__ == "__main__":
         "-t", "--typecheck-only", action="store_true", help="Stop after typechecking"
     )
     argparser.add_argument(
-        "-i", "--ir-only", action="store_true", help="Stop Aftering creating the IR"
+        "-i", "--ir-only", action="store_true", help="Print the three-address IR and stop"
     )
     argparser.add_argument(
         "-v", "--verbose", action="store_true", help="Provides additional output"
     )
     argparser.add_argument(
-        "-o", "--optimize", action="store_true", help="Enables IR optimization"
+        "-o", "--optimize", action="store_true", help="Enables IR optimization, as -O2"
+    )
+    argparser.add_argument(
+        "-O",
+        dest="opt_level",
+        type=int,
+        choices=range(4),
+        metavar="LEVEL",
+        help="Optimization level: 0 for none, 1 for the cheap passes ("
+        f"{', '.join(LEVEL_PASSES[1])}), 2 for all passes, 3 for more rounds "
+        "and a larger inline budget",
+    )
+    argparser.add_argument(
+        "-f",
+        dest="pass_flags",
+        action="append",
+        metavar="[no-]PASS",
+        help="Run (-fPASS) or skip (-fno-PASS) an optimization pass whatever the "
+        f"level. Passes: {', '.join(PASSES)}",
+    )
+    argparser.add_argument(
+        "--inline-budget",
+        type=int,
+        metavar="N",
+        help="Inline functions of at most N AST nodes (0 disables inlining, "
+        f"default: {DEFAULT_INLINE_BUDGET}, {LEVEL_INLINE_BUDGETS[3]} at -O3)",
+    )
+    argparser.add_argument(
+        "--hoist-main",
+        action="store_true",
+        help="Emit top-level statements inside a generated main() so their "
+        "variables are locals",
+    )
+    argparser.add_argument(
+        "--ssa",
+        action="store_true",
+        help="Put the IR into SSA form and take it back out before lowering it; "
+        "-i prints the SSA form",
+    )
+    argparser.add_argument(
+        "--emit-ir",
+        choices=("text", "binary"),
+        help=f"Also save the IR next to the input, as text ({TEXT_EXTENSION}) or "
+        f"marshalled ({BINARY_EXTENSION}). IR files given as input skip straight to "
+        "-i or lowering to Python",
+    )
+    argparser.add_argument(
+        "--backend",
+        choices=("text", "ast", "ir"),
+        default="text",
+        help="Write Python source (text), build Python AST objects and "
+        "compile them straight into a .pyc (ast), or write Python source "
+        "lowered from the three-address IR (ir)",
+    )
+    argparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Compile in batch mode over N worker processes (default: one per CPU)",
+    )
+    argparser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help=f"Cache compiler output in DIR (default: ${CACHE_DIR_ENV}, if set)",
+    )
+    argparser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        metavar="BYTES",
+        help="Evict least recently used cache entries beyond this size",
+    )
+    argparser.add_argument(
+        "--cache-stats", action="store_true", help="Report cache hits and usage"
     )
 
-    args = argparser.parse_args()
-
-    # Prints additional output if the flag is set
-    if args.verbose:
-        print("* Reading file " + args.FILE + "...")
-
-    f = open(args.FILE, "r")
-    data = f.read()
-    f.close()
-
-    if args.verbose:
-        print("* Scanning and Parsing...")
-
-    # Build and runs the parser to get AST
-    parser = typthonParser()
-    if args.parse_only:
-        parser.test(data)
-        quit()
-    root = parser.parse(data)
-
-    # If user asks to quit after parsing, do so.
-
-    if args.verbose:
-        print("* Typechecking...")
-
-    typechecker = TypeChecker()
-    typechecker.typecheck(root)
-
-    if args.typecheck_only:
-        quit()
+    argparser.add_argument(
+        "--time-passes",
+        action="store_true",
+        help="Report wall and CPU time of each compiler phase",
+    )
+    argparser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Report peak memory per phase, AST node and IR instruction counts",
+    )
+    argparser.add_argument(
+        "--stats-json",
+        metavar="PATH",
+        help="Also append --time-passes/--stats as a line of JSON to PATH ('-' for stdout)",
+    )
+    argparser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a compile server, see typthonClient.py",
+    )
+    argparser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        metavar="PATH",
+        help="Unix domain socket of the compile server",
+    )
+    argparser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        metavar="N",
+        help="Compile at most N server requests at once",
+    )
+    argparser.add_argument(
+        "--queue-timeout",
+        type=float,
+        default=DEFAULT_QUEUE_TIMEOUT,
+        metavar="SECONDS",
+        help="Refuse server requests that wait longer than this for a slot",
+    )
+    return argparser
 
-    if args.verbose:
-        print("* Generating IR...")
 
-    ir_generator = IRGen()
-    ir_generator.generate(root)
-    ir_root = ir_generator.get_IR_list()
-    ir_functions = ir_generator.get_function_IR_list()
+# Options used by compile_source, as if given no command line flags.
+library_args = build_argparser().parse_args([])
 
-    if args.ir_only:
-        ir_generator.print_ir()
-        quit()
 
-    if args.optimize:
-        optimizer = Optimizer(root)
-        optimizer.optimize()
-        root = optimizer.get_optimized_ir()
+if __name__ == "__main__":
+    argparser = build_argparser()
+    args = argparser.parse_args()
+    if args.cache_stats and not (args.cache_dir or os.environ.get(CACHE_DIR_ENV)):
+        argparser.error("--cache-stats needs --cache-dir or $" + CACHE_DIR_ENV)
+    if args.backend == "ir" and args.hoist_main:
+        argparser.error("--hoist-main needs the text or ast backend")
+    try:
+        select_passes(optimization_level(args), args.pass_flags or ())
+    except ValueError as e:
+        argparser.error(str(e))
 
-    target_generator = TargetGen(args.FILE, root, ir_functions)
-    target_generator.create_target()
+    if args.serve:
+        serve(args)
+    elif not args.FILE:
+        argparser.error("FILE is required unless --serve is given")
+    # A single file compiles in-process exactly as before, letting errors
+    # propagate. Anything else is a batch.
+    elif len(args.FILE) == 1 and args.jobs is None and not os.path.isdir(args.FILE[0]):
+        cache = open_cache(args)
+        compile_file(args.FILE[0], args, cache=cache)
+        finish_cache(cache, args)
+    else:
+        paths = collect_files(args.FILE)
+        if not paths:
+            argparser.error("no .typ files found")
+        if compile_batch(paths, args):
+            sys.exit(1)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+
+import argparse
+from heapq import heappop, heappush
+
+import typthonIRGen as IR
+
+
+def members(bits):
+    """
+    The indices of the set bits of bits, lowest first.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class DataflowProblem(object):
+    """
+    A dataflow analysis over the blocks of a CFG, solved with a worklist.
+
+    Sets of facts are ints used as bitsets, bit i standing for universe[i].
+    Subclasses fill in universe and the gen and kill sets of each block,
+    indexed by block index, and pick the direction and the meet: forward
+    problems flow from predecessors to successors and backward ones the
+    other way, union problems hold facts true on some path and intersection
+    ones facts true on every path. boundary is the set at the entry of a
+    forward problem or the exits of a backward one.
+
+    After solve(), before[i] and after[i] are the facts on entry to and exit
+    from block i in execution order, whatever the direction.
+    """
+
+    forward = True
+    union = True
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.universe = []
+        self.index = {}
+        self.gen = [0] * len(cfg.blocks)
+        self.kill = [0] * len(cfg.blocks)
+        self.boundary = 0
+        self.before = None
+        self.after = None
+        self.iterations = 0
+
+    def fact(self, item):
+        """
+        The bit of item, adding it to the universe if it is new.
+        """
+        bit = self.index.get(item)
+        if bit is None:
+            bit = self.index[item] = len(self.universe)
+            self.universe.append(item)
+        return 1 << bit
+
+    def items(self, bits):
+        return [self.universe[index] for index in members(bits)]
+
+    def solve(self):
+        blocks = self.cfg.order if self.forward else self.cfg.order[::-1]
+        full = (1 << len(self.universe)) - 1
+        start = 0 if self.union else full
+        count = len(self.cfg.blocks)
+        # inputs[i] is the meet over the edges into block i, outputs[i] its
+        # transfer, both in the direction of the problem.
+        inputs = [start] * count
+        outputs = [start] * count
+        gen, kill = self.gen, self.kill
+
+        # Edges from and to unreachable blocks are left out.
+        predecessors = [
+            [p for p in block.predecessors if p.order is not None] for block in self.cfg.blocks
+        ]
+        successors = [block.successors for block in self.cfg.blocks]
+        if self.forward:
+            sources, targets = predecessors, successors
+        else:
+            sources, targets = successors, predecessors
+
+        # The worklist is a heap on the position in blocks, so a block runs
+        # after the blocks feeding it wherever the graph allows. In plain
+        # FIFO order facts flowing down a long program revisit every loop.
+        position = [0] * count
+        for number, block in enumerate(blocks):
+            position[block.index] = number
+        worklist = [(number, block.index) for number, block in enumerate(blocks)]
+        queued = [False] * count
+        for block in blocks:
+            queued[block.index] = True
+        while worklist:
+            index = heappop(worklist)[1]
+            queued[index] = False
+            self.iterations += 1
+
+            edges = sources[index]
+            if not edges:
+                value = self.boundary
+            elif self.union:
+                value = 0
+                for source in edges:
+                    value |= outputs[source.index]
+            else:
+                value = full
+                for source in edges:
+                    value &= outputs[source.index]
+            inputs[index] = value
+
+            value = gen[index] | (value & ~kill[index])
+            if value != outputs[index]:
+                outputs[index] = value
+                for target in targets[index]:
+                    if not queued[target.index]:
+                        queued[target.index] = True
+                        heappush(worklist, (position[target.index], target.index))
+
+        if self.forward:
+            self.before, self.after = inputs, outputs
+        else:
+            self.before, self.after = outputs, inputs
+        return self
+
+
+class Liveness(DataflowProblem):
+    """
+    The names whose current value may still be read: backward, union.
+
+    Calls also read the names in escaping, the ones other functions read
+    from this function's scope, such as globals read by functions.
+    """
+
+    forward = False
+    union = True
+
+    def __init__(self, cfg, escaping=()):
+        super().__init__(cfg)
+        escaping_bits = 0
+        for name in escaping:
+            escaping_bits |= self.fact(name)
+
+        for block in cfg.order:
+            used = killed = 0
+            for instruction in block.instructions:
+                for operand in instruction.uses():
+                    if isinstance(operand, str):
+                        bit = self.fact(operand)
+                        if not killed & bit:
+                            used |= bit
+                if isinstance(instruction, IR.Call):
+                    used |= escaping_bits & ~killed
+                if instruction.dest is not None:
+                    killed |= self.fact(instruction.dest)
+            self.gen[block.index] = used
+            self.kill[block.index] = killed
+
+    def live_in(self, block):
+        return set(self.items(self.before[block.index]))
+
+    def live_out(self, block):
+        return set(self.items(self.after[block.index]))
+
+
+class Definition(object):
+    """
+    The instruction at position in block writing name.
+    """
+
+    def __init__(self, name, block, position):
+        self.name = name
+        self.block = block
+        self.position = position
+
+    def __str__(self):
+        return f"{self.name}@B{self.block.index}:{self.position}"
+
+
+class ReachingDefinitions(DataflowProblem):
+    """
+    The writes that may be the last one to each name: forward, union.
+    """
+
+    forward = True
+    union = True
+
+    def __init__(self, cfg):
+        super().__init__(cfg)
+        definitions = {}
+        last = []
+        for block in cfg.order:
+            block_last = {}
+            for position, instruction in enumerate(block.instructions):
+                if instruction.dest is not None:
+                    bit = self.fact(Definition(instruction.dest, block, position))
+                    definitions[instruction.dest] = definitions.get(instruction.dest, 0) | bit
+                    block_last[instruction.dest] = bit
+            last.append((block, block_last))
+
+        for block, block_last in last:
+            gen = killed = 0
+            for name, bit in block_last.items():
+                gen |= bit
+                killed |= definitions[name]
+            self.gen[block.index] = gen
+            self.kill[block.index] = killed & ~gen
+
+    def reaching(self, block):
+        return self.items(self.before[block.index])
+
+
+def expression_key(instruction):
+    """
+    The expression a Binary or Unary computes, None for other instructions.
+    """
+    if isinstance(instruction, IR.Binary):
+        return (instruction.op, instruction.left, instruction.right)
+    if isinstance(instruction, IR.Unary):
+        return (instruction.op, instruction.operand)
+    return None
+
+
+def format_expression(key):
+    if len(key) == 3:
+        return f"{key[1]} {key[0]} {key[2]}"
+    return f"{key[0]} {key[1]}"
+
+
+class AvailableExpressions(DataflowProblem):
+    """
+    The expressions computed on every path and not invalidated since by a
+    write to one of their operands: forward, intersection.
+    """
+
+    forward = True
+    union = False
+
+    def __init__(self, cfg):
+        super().__init__(cfg)
+        for block in cfg.order:
+            for instruction in block.instructions:
+                key = expression_key(instruction)
+                if key is not None:
+                    self.fact(key)
+        # The expressions reading each name, killed when it is written.
+        readers = {}
+        for key, index in self.index.items():
+            for operand in key[1:]:
+                if isinstance(operand, str):
+                    readers[operand] = readers.get(operand, 0) | (1 << index)
+
+        for block in cfg.order:
+            available = killed = 0
+            for instruction in block.instructions:
+                key = expression_key(instruction)
+                if key is not None:
+                    available |= 1 << self.index[key]
+                if instruction.dest is not None:
+                    bits = readers.get(instruction.dest, 0)
+                    available &= ~bits
+                    killed |= bits
+            self.gen[block.index] = available
+            self.kill[block.index] = killed & ~available
+
+    def available(self, block):
+        return [format_expression(key) for key in self.items(self.before[block.index])]
+
+
+def names(items):
+    return ", ".join(sorted(str(item) for item in items)) or "-"
+
+
+if __name__ == "__main__":
+    from typthonCFG import CFG
+    from typthonIRGen import IRGen
+    from typthonParser import typthonParser
+    from typthonTypeChecker import TypeChecker
+
+    argparser = argparse.ArgumentParser(
+        description="Prints the live names, reaching definitions and available "
+        "expressions on entry to every block of a Typthon program"
+    )
+    argparser.add_argument("FILE", help="Input file with Typthon source code")
+    args = argparser.parse_args()
+
+    f = open(args.FILE, "r")
+    data = f.read()
+    f.close()
+
+    root = typthonParser().parse(data)
+    TypeChecker().typecheck(root)
+    ir_generator = IRGen()
+    ir_generator.generate(root)
+
+    output = []
+    for function in ir_generator.get_function_IR_list().values():
+        cfg = CFG(function)
+        liveness = Liveness(cfg).solve()
+        reaching = ReachingDefinitions(cfg).solve()
+        available = AvailableExpressions(cfg).solve()
+        lines = [f"function {function.qualname}({', '.join(function.params)}):"]
+        for block in cfg.order:
+            lines.append(f"    {block}:")
+            lines.append(f"        live in: {names(liveness.live_in(block))}")
+            lines.append(f"        live out: {names(liveness.live_out(block))}")
+            lines.append(f"        reaching: {names(reaching.reaching(block))}")
+            lines.append(f"        available: {names(available.available(block))}")
+        output.append("\n".join(lines))
+    print("\n\n".join(output))
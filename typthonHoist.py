@@ -0,0 +1,121 @@
+import typthonAST as ast
+
+# Attribute naming the variable that each kind of node reads or writes.
+NAME_ATTRIBUTES = {
+    "ID": "name",
+    "VarDecl": "name",
+    "VarAssign": "name",
+    "ArrayIndex": "name",
+    "ArraySlice": "name",
+    "ArrayBuiltinCall": "arrayID",
+    "DictBuiltinCall": "dictID",
+}
+
+
+def walk(node, into_functions=True):
+    """
+    Every node reachable from node, node included. Nested function
+    definitions are yielded but not entered unless into_functions is set.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if not into_functions and isinstance(node, ast.FunctionDefn):
+            continue
+        for child_name, child in node.children() or ():
+            if isinstance(child, ast.Node):
+                stack.append(child)
+
+
+def variable_names(nodes):
+    """
+    Names of the variables used anywhere below the given nodes.
+    """
+    names = set()
+    for node in nodes:
+        for child in walk(node):
+            attribute = NAME_ATTRIBUTES.get(child.__class__.__name__)
+            if attribute is not None:
+                names.add(getattr(child, attribute))
+    return names
+
+
+def free_variables(function):
+    """
+    Variables the given function, or any function nested in it, may read
+    from the global scope: names it uses but neither takes as a parameter
+    nor assigns, as Python makes every assigned name local.
+    """
+    free = set()
+    for node in walk(function):
+        if not isinstance(node, ast.FunctionDefn):
+            continue
+        used = set()
+        local = {param.name for param in node.params.params or []}
+        for child in walk(node.body, into_functions=False):
+            attribute = NAME_ATTRIBUTES.get(child.__class__.__name__)
+            if attribute is None:
+                continue
+            used.add(getattr(child, attribute))
+            if isinstance(child, (ast.VarDecl, ast.VarAssign)):
+                local.add(child.name)
+        free |= used - local
+    return free
+
+
+def called_functions(nodes):
+    """
+    Names of the functions called anywhere below the given nodes.
+    """
+    names = set()
+    for node in nodes:
+        for child in walk(node):
+            if isinstance(child, ast.FunctionCall):
+                names.add(child.name)
+    return names
+
+
+class MainHoist(object):
+    """
+    Plan for emitting a program with its top-level statements wrapped in a
+    generated main function, so that their variables become fast locals.
+
+    functions: the top-level function definitions, emitted first
+    statements: every other top-level statement, emitted as the body of main
+    name: name of main, chosen not to clash with any name in the program
+    shared: variables also used inside a function, and functions defined
+            in top-level if or while blocks that a function calls, which main
+            must declare global
+    called: functions main calls, bound to locals of main through default
+            arguments
+    """
+
+    def __init__(self, root, name="main"):
+        stmts = root.statements.stmt_lst or []
+        self.functions = [s for s in stmts if isinstance(s, ast.FunctionDefn)]
+        self.statements = [s for s in stmts if not isinstance(s, ast.FunctionDefn)]
+
+        function_names = {function.name for function in self.functions}
+        top_level_names = variable_names(self.statements)
+        function_free_names = set()
+        for function in self.functions:
+            function_free_names |= free_variables(function)
+        # A function defined in a block of main would otherwise be a local
+        # of main, out of reach of the top-level functions calling it.
+        block_functions = {
+            node.name
+            for statement in self.statements
+            for node in walk(statement, into_functions=False)
+            if isinstance(node, ast.FunctionDefn)
+        }
+        self.shared = sorted(
+            (top_level_names & function_free_names)
+            | (block_functions & called_functions(self.functions))
+        )
+        self.called = sorted(called_functions(self.statements) & function_names)
+
+        taken = function_names | top_level_names | variable_names(self.functions)
+        while name in taken:
+            name += "_"
+        self.name = name
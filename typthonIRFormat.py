@@ -0,0 +1,421 @@
+import ast as pyast
+import marshal
+import re
+import sys
+
+import typthonIRGen as IR
+from typthonSymbolTable import ParseError
+
+# The text format is what str(IRProgram) prints and -i shows: each function
+# as "function QUALNAME(PARAMS):", its instructions indented, labels not,
+# and "end", functions separated by blank lines. Constants are Python
+# literals, so a name and a string constant never look alike.
+#
+# The binary format is IR_MAGIC followed by a marshalled tuple
+# (IR_FORMAT_VERSION, constants, functions). A function is a tuple
+# (qualname, name, params, parent qualname, temp count, label count,
+# instructions) and an instruction a tuple of its index in
+# INSTRUCTION_FIELDS and the fields listed there. An operand is a name, or
+# the index of its value in constants; lists of operands are lists. Names
+# are interned, so marshal writes each one once.
+IR_MAGIC = b"TYIR"
+IR_FORMAT_VERSION = 1
+
+# Files written with write_ir: text for TEXT_EXTENSION, binary for
+# BINARY_EXTENSION.
+TEXT_EXTENSION = ".ir"
+BINARY_EXTENSION = ".irc"
+
+# Instruction classes and their constructor arguments, in order. Phi refers
+# to CFG blocks, so the SSA form is not written.
+INSTRUCTION_FIELDS = [
+    (IR.Copy, ("dest", "src")),
+    (IR.Binary, ("dest", "op", "left", "right")),
+    (IR.Unary, ("dest", "op", "operand")),
+    (IR.Call, ("dest", "function", "args")),
+    (IR.Return, ("value",)),
+    (IR.Label, ("name",)),
+    (IR.Jump, ("target",)),
+    (IR.Branch, ("cond", "true_target", "false_target")),
+    (IR.NewList, ("dest", "items")),
+    (IR.NewDict, ("dest",)),
+    (IR.Index, ("dest", "array", "index")),
+    (IR.Slice, ("dest", "array", "start", "stop")),
+    (IR.ArrayCall, ("dest", "array", "method", "arg")),
+    (IR.DictGet, ("dest", "dict", "key")),
+    (IR.DictSet, ("dict", "key", "value")),
+]
+INSTRUCTION_TAGS = {kind: tag for tag, (kind, fields) in enumerate(INSTRUCTION_FIELDS)}
+# Positions of the operand fields of each instruction, by tag.
+OPERAND_POSITIONS = [
+    tuple(position for position, name in enumerate(fields) if name in kind.reads)
+    for kind, fields in INSTRUCTION_FIELDS
+]
+
+BINARY_OPERATORS = {"+", "-", "*", "/", "%", "<", "<=", ">", ">=", "==", "!=", "and", "or"}
+CONSTANT_NAMES = {"True": True, "False": False, "None": None}
+
+TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<number>-?\d+(?:\.\d*)?(?:e[-+]?\d+)?)
+      | (?P<name>[A-Za-z_%][\w.%]*)
+      | (?P<op><=|>=|==|!=|[-+*/%<>=\[\]():,{}])
+    )""",
+    re.VERBOSE,
+)
+FUNCTION_HEADER = re.compile(r"function (\S+)\((.*)\):$")
+DUPLICATE_SUFFIX = re.compile(r"\.\d+$")
+
+
+def parent_qualname(qualname):
+    """
+    The qualified name of the function a function is defined in, None for
+    the module. IRGen names a nested function after its parent and a
+    function defined again under the same name with a number added, see
+    IRGen.gen_FunctionDefn; names never start with a digit.
+    """
+    if qualname == IR.MODULE:
+        return None
+    qualname = DUPLICATE_SUFFIX.sub("", qualname)
+    if "." not in qualname:
+        return IR.MODULE
+    return qualname.rsplit(".", 1)[0]
+
+
+def function_name(qualname):
+    if qualname == IR.MODULE:
+        return qualname
+    return DUPLICATE_SUFFIX.sub("", qualname).rsplit(".", 1)[-1]
+
+
+def restore_counts(function):
+    """
+    Sets the temporary and label counts of a loaded function past the ones
+    it uses, so passes can add new ones.
+    """
+    for instruction in function.instructions:
+        for value in instruction.uses() + [instruction.dest]:
+            if IR.is_temp(value):
+                function.temp_count = max(function.temp_count, int(value[1:]))
+        for label in (
+            getattr(instruction, "name", None),
+            getattr(instruction, "target", None),
+            getattr(instruction, "true_target", None),
+            getattr(instruction, "false_target", None),
+        ):
+            if isinstance(label, str) and label[:1] == "L" and label[1:].isdigit():
+                function.label_count = max(function.label_count, int(label[1:]))
+
+
+class IRTextParser(object):
+    """
+    Reads the text format back into an IRProgram. Errors are ParseErrors
+    carrying the line number in the text.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.line = 0
+        self.tokens = []
+        self.position = 0
+
+    def parse(self):
+        program = IR.IRProgram()
+        program.functions = {}
+        function = None
+        for self.line, line in enumerate(self.text.splitlines(), 1):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if function is None:
+                header = FUNCTION_HEADER.match(stripped)
+                if header is None:
+                    self.error("Expected a function header")
+                function = self.function(program, header.group(1), header.group(2))
+            elif stripped == "end":
+                restore_counts(function)
+                function = None
+            else:
+                function.instructions.append(self.instruction(stripped))
+        if function is not None:
+            self.error("Missing end of function " + function.qualname)
+        if IR.MODULE not in program.functions:
+            self.error("Missing function " + IR.MODULE)
+        program.module = program.functions[IR.MODULE]
+        return program
+
+    def function(self, program, qualname, params):
+        parent = parent_qualname(qualname)
+        if parent is not None and parent not in program.functions:
+            self.error(f"Function {qualname} before the function {parent} it is defined in")
+        if qualname in program.functions:
+            self.error(f"Function {qualname} defined twice")
+        function = IR.IRFunction(
+            function_name(qualname),
+            [param.strip() for param in params.split(",") if param.strip()],
+            program.functions.get(parent),
+            qualname,
+        )
+        program.functions[qualname] = function
+        return function
+
+    def error(self, message):
+        raise ParseError(message, self.line)
+
+    def tokenize(self, text):
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKEN.match(text, position)
+            if match is None:
+                self.error(f"Unexpected character {text[position]!r}")
+            tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            position = match.end()
+        return tokens
+
+    def peek(self, offset=0):
+        position = self.position + offset
+        if position < len(self.tokens):
+            return self.tokens[position][1]
+        return None
+
+    def next(self):
+        if self.position == len(self.tokens):
+            self.error("Unexpected end of instruction")
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    def expect(self, value):
+        kind, token = self.next()
+        if token != value:
+            self.error(f"Expected {value!r}, found {token!r}")
+
+    def name(self):
+        kind, token = self.next()
+        if kind != "name" or token in CONSTANT_NAMES:
+            self.error(f"Expected a name, found {token!r}")
+        return token
+
+    def operand(self):
+        kind, token = self.next()
+        if kind in ("string", "number"):
+            return IR.Const(pyast.literal_eval(token))
+        if kind == "name":
+            if token in CONSTANT_NAMES:
+                return IR.Const(CONSTANT_NAMES[token])
+            return token
+        self.error(f"Expected an operand, found {token!r}")
+
+    def operands(self, close):
+        """
+        Comma separated operands up to the closing token.
+        """
+        values = []
+        while self.peek() != close:
+            if values:
+                self.expect(",")
+            values.append(self.operand())
+        self.expect(close)
+        return values
+
+    def instruction(self, text):
+        self.tokens = self.tokenize(text)
+        self.position = 0
+        instruction = self.statement()
+        if self.position != len(self.tokens):
+            self.error(f"Unexpected {self.peek()!r} at the end of the instruction")
+        return instruction
+
+    def statement(self):
+        # Assignments first: a variable may be called goto or call.
+        if self.peek(1) == "=":
+            dest = self.name()
+            self.next()
+            return self.assignment(dest)
+        first = self.peek()
+        if self.peek(1) == ":" and len(self.tokens) == 2:
+            label = self.name()
+            self.expect(":")
+            return IR.Label(label)
+        if first == "goto":
+            self.next()
+            return IR.Jump(self.name())
+        if first == "if":
+            self.next()
+            cond = self.operand()
+            self.expect("goto")
+            true_target = self.name()
+            self.expect("else")
+            return IR.Branch(cond, true_target, self.name())
+        if first == "return":
+            self.next()
+            return IR.Return(self.operand())
+        if first == "call":
+            return self.call(None)
+        return self.method(None)
+
+    def call(self, dest):
+        self.expect("call")
+        function = self.name()
+        self.expect("(")
+        return IR.Call(dest, function, self.operands(")"))
+
+    def method(self, dest):
+        """
+        A list or dict builtin, written target.method(args).
+        """
+        target, _, method = self.name().rpartition(".")
+        if not target:
+            self.error("Expected an instruction")
+        self.expect("(")
+        args = self.operands(")")
+        if method == "get" and len(args) == 1 and dest is not None:
+            return IR.DictGet(dest, target, args[0])
+        if method == "set" and len(args) == 2 and dest is None:
+            return IR.DictSet(target, args[0], args[1])
+        if method in ("append", "pop", "remove") and len(args) == 1:
+            return IR.ArrayCall(dest, target, method, args[0])
+        self.error(f"Unknown builtin {method}")
+
+    def assignment(self, dest):
+        first = self.peek()
+        second = self.peek(1)
+        if first == "call" and second != "[" and len(self.tokens) > 3:
+            return self.call(dest)
+        if first == "{":
+            self.next()
+            self.expect("}")
+            return IR.NewDict(dest)
+        if first == "[":
+            self.next()
+            return IR.NewList(dest, self.operands("]"))
+        if first in ("not", "-") and len(self.tokens) == 4:
+            self.next()
+            return IR.Unary(dest, first, self.operand())
+        if second == "(":
+            return self.method(dest)
+        if second == "[":
+            array = self.operand()
+            self.next()
+            start = self.operand()
+            if self.peek() == ":":
+                self.next()
+                stop = self.operand()
+                self.expect("]")
+                return IR.Slice(dest, array, start, stop)
+            self.expect("]")
+            return IR.Index(dest, array, start)
+        left = self.operand()
+        if self.peek() is None:
+            return IR.Copy(dest, left)
+        op = self.next()[1]
+        if op not in BINARY_OPERATORS:
+            self.error(f"Unknown operator {op!r}")
+        return IR.Binary(dest, op, left, self.operand())
+
+
+def parse_ir(text):
+    """
+    The IRProgram written in the text format.
+    """
+    return IRTextParser(text).parse()
+
+
+def dump_ir(program):
+    """
+    The IRProgram in the binary format.
+    """
+    constants = {}
+
+    def encode(value):
+        if isinstance(value, IR.Const):
+            if value not in constants:
+                constants[value] = len(constants)
+            return constants[value]
+        if isinstance(value, list):
+            return [encode(item) for item in value]
+        if isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    functions = []
+    for function in program.functions.values():
+        instructions = []
+        for instruction in function.instructions:
+            tag = INSTRUCTION_TAGS.get(instruction.__class__)
+            if tag is None:
+                raise ValueError(f"Cannot write {instruction.__class__.__name__} instructions")
+            fields = INSTRUCTION_FIELDS[tag][1]
+            instructions.append((tag,) + tuple(encode(getattr(instruction, name)) for name in fields))
+        parent = function.parent.qualname if function.parent is not None else None
+        functions.append((
+            function.qualname, function.name, function.params, parent,
+            function.temp_count, function.label_count, instructions,
+        ))
+    values = [constant.value for constant in constants]
+    return IR_MAGIC + marshal.dumps((IR_FORMAT_VERSION, values, functions))
+
+
+def load_ir(data):
+    """
+    The IRProgram written in the binary format. Raises ValueError when data
+    is not IR of this format version.
+    """
+    if data[:len(IR_MAGIC)] != IR_MAGIC:
+        raise ValueError("Not a binary IR file")
+    version, values, functions = marshal.loads(data[len(IR_MAGIC):])
+    if version != IR_FORMAT_VERSION:
+        raise ValueError(f"Binary IR of format {version}, expected {IR_FORMAT_VERSION}")
+    # Constants are never changed in place, so operands can share them.
+    constants = [IR.Const(value) for value in values]
+
+    program = IR.IRProgram()
+    program.functions = {}
+    for qualname, name, params, parent, temp_count, label_count, encoded in functions:
+        function = IR.IRFunction(name, params, program.functions.get(parent), qualname)
+        function.temp_count = temp_count
+        function.label_count = label_count
+        instructions = function.instructions
+        for tag, *fields in encoded:
+            for position in OPERAND_POSITIONS[tag]:
+                value = fields[position]
+                if value.__class__ is int:
+                    fields[position] = constants[value]
+                elif value.__class__ is list:
+                    fields[position] = [
+                        constants[item] if item.__class__ is int else item for item in value
+                    ]
+            instructions.append(INSTRUCTION_FIELDS[tag][0](*fields))
+        program.functions[qualname] = function
+    program.module = program.functions[IR.MODULE]
+    return program
+
+
+def is_ir_file(path):
+    return path.endswith(TEXT_EXTENSION) or path.endswith(BINARY_EXTENSION)
+
+
+def write_ir(program, path):
+    """
+    Writes program to path, in the binary format when path ends with
+    BINARY_EXTENSION and in the text format otherwise.
+    """
+    if path.endswith(BINARY_EXTENSION):
+        with open(path, "wb") as f:
+            f.write(dump_ir(program))
+    else:
+        with open(path, "w") as f:
+            f.write(f"{program}\n")
+
+
+def read_ir(path):
+    """
+    The IRProgram in the file at path, as written by write_ir.
+    """
+    if path.endswith(BINARY_EXTENSION):
+        with open(path, "rb") as f:
+            return load_ir(f.read())
+    with open(path, "r") as f:
+        return parse_ir(f.read())
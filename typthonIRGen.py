@@ -1,283 +1,660 @@
+import ast as pyast
+
 import typthonAST as ast
 
-class ControlFlowBlock(ast.Node):
-    def __init__(self, name, statements):
-        self.name = name
-        self.statements = statements
+# Name of the function holding the top-level statements. It is not a valid
+# identifier, so it never clashes with a Typthon function.
+MODULE = "<module>"
+
+
+class Const(object):
+    """
+    A constant operand: an int, bool, str or None.
+
+    Every other operand is a name, either a Typthon variable or a temporary
+    "%N". Constants of different types are never equal, so True and 1 stay
+    apart.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Const)
+            and type(self.value) is type(other.value)
+            and self.value == other.value
+        )
+
+    def __hash__(self):
+        return hash((type(self.value), self.value))
+
+    def __repr__(self):
+        return repr(self.value)
 
-    def add_statement(self, statement):
-        self.statements.append(statement)
+    __str__ = __repr__
+
+
+def is_temp(operand):
+    """
+    Whether operand is a temporary introduced by IRGen.
+    """
+    return isinstance(operand, str) and operand.startswith("%")
+
+
+class Instruction(object):
+    """
+    A three-address instruction.
+
+    dest is the variable or temporary the instruction writes, or None, and
+    reads names the attributes holding the operands it reads. Attributes
+    holding lists of operands (call arguments, list items) are flattened by
+    uses().
+    """
+
+    __slots__ = ()
+
+    dest = None
+    reads = ()
+    # Whether control never falls through to the next instruction.
+    terminator = False
+
+    def uses(self):
+        """
+        The operands read, in evaluation order.
+        """
+        operands = []
+        for name in self.reads:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                operands.extend(value)
+            else:
+                operands.append(value)
+        return operands
+
+    def map_uses(self, function):
+        """
+        Replaces each operand read by function(operand).
+        """
+        for name in self.reads:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                setattr(self, name, [function(operand) for operand in value])
+            else:
+                setattr(self, name, function(value))
+
+
+def join(operands):
+    return ", ".join(str(operand) for operand in operands)
+
+
+class Copy(Instruction):
+    __slots__ = ("dest", "src")
+    reads = ("src",)
+
+    def __init__(self, dest, src):
+        self.dest = dest
+        self.src = src
 
     def __str__(self):
-        output = f"{self.name}:"
-        for statement in self.statements:
-            output += f"\n    {statement}"
-        return output
-    
-    def children(self):
-        nodelist = []
-        for i, stmt in enumerate(self.statements or []):
-            nodelist.append(("stmt[%d]" % i, stmt))
-        return nodelist
-    attr_names = ("name",)
-
-class FunctionBlock(ast.Node):
-    def __init__(self, name, param, statements):
-        self.name = name
-        self.param = param
-        self.statements = statements
+        return f"{self.dest} = {self.src}"
 
-    def add_statement(self, statement):
-        self.statements.append(statement)
+
+class Binary(Instruction):
+    __slots__ = ("dest", "op", "left", "right")
+    reads = ("left", "right")
+
+    def __init__(self, dest, op, left, right):
+        self.dest = dest
+        self.op = op
+        self.left = left
+        self.right = right
 
     def __str__(self):
-        output = f"{self.name}:\n    BeginFunc"
-        for statement in self.statements:
-            output += f"\n    {statement}"
-        return output + "\n    EndFunc"
-
-    def children(self):
-        nodelist = []
-        for i, stmt in enumerate(self.statements or []):
-            nodelist.append(("stmt[%d]" % i, stmt))
-        return nodelist
-    attr_names = ("name",)
-
-class ElseNode(ast.Node):
-    def __init__(self):
-        pass
+        return f"{self.dest} = {self.left} {self.op} {self.right}"
+
+
+class Unary(Instruction):
+    __slots__ = ("dest", "op", "operand")
+    reads = ("operand",)
+
+    def __init__(self, dest, op, operand):
+        self.dest = dest
+        self.op = op
+        self.operand = operand
+
+    def __str__(self):
+        return f"{self.dest} = {self.op} {self.operand}"
+
+
+class Call(Instruction):
+    """
+    A call of the function with the given qualified name, see IRFunction.
+    """
+
+    __slots__ = ("dest", "function", "args")
+
+    reads = ("args",)
+
+    def __init__(self, dest, function, args):
+        self.dest = dest
+        self.function = function
+        self.args = args
+
     def __str__(self):
-        return ""
-    def children(self):
-        nodelist = []
-        return nodelist
-    attr_names = ()
-
-class GOTONode(ast.Node):
-    def __init__(self, goto):
-        self.goto = goto
-    
-    def children(self):
-        nodelist = []
-        return nodelist
+        if self.dest is None:
+            return f"call {self.function}({join(self.args)})"
+        return f"{self.dest} = call {self.function}({join(self.args)})"
+
+
+class Return(Instruction):
+    __slots__ = ("value",)
+    reads = ("value",)
+    terminator = True
+
+    def __init__(self, value):
+        self.value = value
 
     def __str__(self):
-        return f"GOTO _L{self.goto}"
-    attr_names = ("goto",)
+        return f"return {self.value}"
+
+
+class Label(Instruction):
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
 
-class IfNode(ast.Node):
-    def __init__(self, cond, gotoTrue, gotoFalse):
-        self.cond = cond
-        self.gotoTrue = gotoTrue
-        self.gotoFalse = gotoFalse
-        
-    def children(self):
-        nodelist = []
-        nodelist.append(("cond", self.cond))
-        nodelist.append(("gotoTrue", self.gotoTrue))
-        nodelist.append(("gotoFalse", self.gotoFalse))
-        
     def __str__(self):
-        return f"IF NOT {self.cond} GOTO _L{self.gotoFalse}"
-    
-    attr_names = ("name",)
+        return f"{self.name}:"
 
-class ElifNode(ast.Node):
-    def __init__(self, cond, gotoTrue, gotoFalse):
-        self.cond = cond
-        self.gotoTrue = gotoTrue
-        self.gotoFalse = gotoFalse
-        
-    def children(self):
-        nodelist = []
-        nodelist.append(("cond", self.cond))
-        nodelist.append(("gotoTrue", self.gotoTrue))
-        nodelist.append(("gotoFalse", self.gotoFalse))
-        return nodelist
+
+class Jump(Instruction):
+    __slots__ = ("target",)
+    terminator = True
+
+    def __init__(self, target):
+        self.target = target
 
     def __str__(self):
-        return f"IF NOT {self.cond} GOTO _L{self.gotoFalse}"
+        return f"goto {self.target}"
+
+
+class Branch(Instruction):
+    """
+    Jumps to true_target when cond is true and to false_target otherwise.
+    """
+
+    __slots__ = ("cond", "true_target", "false_target")
 
-    attr_names = ("name",)
-    
-class WhileNode(ast.Node):
-    def __init__(self, cond, name, gotoFalse):
+    reads = ("cond",)
+    terminator = True
+
+    def __init__(self, cond, true_target, false_target):
         self.cond = cond
-        self.name = name
-        self.gotoFalse = gotoFalse
-        self.statements = []
-
-    def add_statement(self, statement):
-        self.statements.append(statement)
-        
-    def children(self):
-        nodelist = []
-        nodelist.append(("cond", self.cond))
-        nodelist.append(("name", self.gotoTrue))
-        nodelist.append(("gotoFalse", self.gotoFalse))
-        return nodelist
+        self.true_target = true_target
+        self.false_target = false_target
 
     def __str__(self):
-        output = f"_L{self.name}:\n"
-        output += f"    IF NOT {self.cond} GOTO _L{self.gotoFalse}"
-        for statement in self.statements:
-            output += f"\n    {statement}"
-        return output + f"\n    GOTO _L{self.name}"
+        return f"if {self.cond} goto {self.true_target} else {self.false_target}"
 
 
-class IRGen(object):
+class Phi(Instruction):
+    """
+    An SSA join: dest takes args[i] when control arrives from blocks[i], a
+    predecessor in the function's CFG. variable is the name dest is a
+    version of.
+    """
+
+    __slots__ = ("dest", "variable", "blocks", "args")
+
+    reads = ("args",)
+
+    def __init__(self, dest, variable, blocks, args):
+        self.dest = dest
+        self.variable = variable
+        self.blocks = blocks
+        self.args = args
+
+    def __str__(self):
+        sources = ", ".join(f"B{block.index}: {arg}" for block, arg in zip(self.blocks, self.args))
+        return f"{self.dest} = phi({sources})"
+
+
+class NewList(Instruction):
+    __slots__ = ("dest", "items")
+    reads = ("items",)
+
+    def __init__(self, dest, items):
+        self.dest = dest
+        self.items = items
+
+    def __str__(self):
+        return f"{self.dest} = [{join(self.items)}]"
+
+
+class NewDict(Instruction):
+    __slots__ = ("dest",)
+
+    def __init__(self, dest):
+        self.dest = dest
+
+    def __str__(self):
+        return f"{self.dest} = {{}}"
+
+
+class Index(Instruction):
+    __slots__ = ("dest", "array", "index")
+    reads = ("array", "index")
+
+    def __init__(self, dest, array, index):
+        self.dest = dest
+        self.array = array
+        self.index = index
+
+    def __str__(self):
+        return f"{self.dest} = {self.array}[{self.index}]"
+
+
+class Slice(Instruction):
+    __slots__ = ("dest", "array", "start", "stop")
+    reads = ("array", "start", "stop")
+
+    def __init__(self, dest, array, start, stop):
+        self.dest = dest
+        self.array = array
+        self.start = start
+        self.stop = stop
+
+    def __str__(self):
+        return f"{self.dest} = {self.array}[{self.start}:{self.stop}]"
+
+
+class ArrayCall(Instruction):
+    """
+    A list builtin: method is "append", "pop" or "remove".
+    """
+
+    __slots__ = ("dest", "array", "method", "arg")
+
+    reads = ("array", "arg")
+
+    def __init__(self, dest, array, method, arg):
+        self.dest = dest
+        self.array = array
+        self.method = method
+        self.arg = arg
+
+    def __str__(self):
+        if self.dest is None:
+            return f"{self.array}.{self.method}({self.arg})"
+        return f"{self.dest} = {self.array}.{self.method}({self.arg})"
+
+
+class DictGet(Instruction):
+    __slots__ = ("dest", "dict", "key")
+    reads = ("dict", "key")
+
+    def __init__(self, dest, dict, key):
+        self.dest = dest
+        self.dict = dict
+        self.key = key
+
+    def __str__(self):
+        return f"{self.dest} = {self.dict}.get({self.key})"
+
+
+class DictSet(Instruction):
+    __slots__ = ("dict", "key", "value")
+    reads = ("dict", "key", "value")
+
+    def __init__(self, dict, key, value):
+        self.dict = dict
+        self.key = key
+        self.value = value
+
+    def __str__(self):
+        return f"{self.dict}.set({self.key}, {self.value})"
+
+
+class IRFunction(object):
+    """
+    The instructions of one function, or of the top-level statements when
+    name is MODULE.
+
+    parent is the enclosing IRFunction, None for the module. Top-level
+    functions are children of the module, whose variables are the globals.
+    Functions are known by their qualified name: the names of the enclosing
+    functions and their own joined by dots.
+    """
+
+    def __init__(self, name, params, parent=None, qualname=None):
+        self.name = name
+        self.params = params
+        self.parent = parent
+        self.qualname = qualname or name
+        self.instructions = []
+        self.temp_count = 0
+        self.label_count = 0
+
+    def new_temp(self):
+        self.temp_count += 1
+        return f"%{self.temp_count}"
+
+    def new_label(self):
+        self.label_count += 1
+        return f"L{self.label_count}"
+
+    def __str__(self):
+        lines = [f"function {self.qualname}({', '.join(self.params)}):"]
+        for instruction in self.instructions:
+            if isinstance(instruction, Label):
+                lines.append(str(instruction))
+            else:
+                lines.append(f"    {instruction}")
+        lines.append("end")
+        return "\n".join(lines)
+
+
+class IRProgram(object):
+    """
+    The functions of a program by qualified name, the module first and the
+    others in definition order.
+    """
 
     def __init__(self):
+        self.module = IRFunction(MODULE, [])
+        self.functions = {MODULE: self.module}
+
+    def children(self, function):
         """
-        IR_lst: list of IR code
-        register_count: integer to keep track of which register to use
-        label_count: similar to register_count, but with labels
+        The functions defined directly in function.
         """
-        self.cblock = None
-        self.IR_lst = {}
-        self.function_IR_lst = {}
-        self.label_count = 0
+        return [child for child in self.functions.values() if child.parent is function]
+
+    def __str__(self):
+        return "\n\n".join(str(function) for function in self.functions.values())
+
+
+def basic_blocks(instructions):
+    """
+    Splits instructions into basic blocks: a block starts at each label and
+    after each jump, branch or return.
+    """
+    blocks = []
+    block = []
+    for instruction in instructions:
+        if isinstance(instruction, Label) and block:
+            blocks.append(block)
+            block = []
+        block.append(instruction)
+        if instruction.terminator:
+            blocks.append(block)
+            block = []
+    if block:
+        blocks.append(block)
+    return blocks
+
+
+def constant_value(node):
+    """
+    The Python value of a Constant node. Booleans are stored as "True" or
+    "False" and strings keep their quotes.
+    """
+    value = node.value
+    if isinstance(value, str):
+        if value in ("True", "False"):
+            return value == "True"
+        return pyast.literal_eval(value)
+    return value
 
-    def generate(self, node: ast.Node):
+
+class IRGen(object):
+    """
+    Lowers the AST into three-address code.
+
+    Expressions are flattened into instructions on temporaries; the
+    expression assigned to a variable writes it directly. if, elif and
+    while become labels, jumps and branches, and and/or short-circuit
+    through branches when their right operand needs instructions of its
+    own. Nested functions become functions of their own.
+    """
+
+    def __init__(self):
+        self.handlers = ast.dispatch_table(self.__class__, "gen_")
+        self.program = IRProgram()
+        self.function = self.program.module
+        # (head, exit) labels of the enclosing while loops.
+        self.loops = []
+        # Function names visible in each enclosing function, innermost last.
+        self.scopes = [{}]
+
+    def generate(self, node: ast.Node, dest=None, statement=False):
         """
-        Similar to 'typecheck' method from TypeChecker object
+        Similar to 'typecheck' method from TypeChecker object. Expressions
+        return their operand, written to dest when it is given; a call used
+        as a statement has no dest at all.
         """
-        method = "gen_" + node.__class__.__name__
-        return getattr(self, method, self.generic_gen)(node)
+        return self.handlers[node.__class__](self, node, dest, statement)
 
-    def generic_gen(self, node):
-        pass
     ################################
     ## Helper functions
     ################################
 
-    def inc_label(self):
-        """
-        Increase the label count and return its value for use
-        """
-        self.label_count += 1
-        return self.label_count
-    
-    def add_code(self, code):
-        self.cblock.add_statement(code)
+    def emit(self, instruction):
+        self.function.instructions.append(instruction)
 
-    def get_IR_list(self):
-        return self.IR_lst
-    def get_function_IR_list(self):
-        return self.function_IR_lst
-    def print_ir(self):
+    def target(self, dest):
         """
-        Loop through the generated IR code and print them out to stdout
+        dest, or a new temporary when the value has nowhere to go.
         """
-        for ir in self.IR_lst:
-            print(self.IR_lst[ir])
+        return dest if dest is not None else self.function.new_temp()
 
-    def mark_label(self, label):
+    def move(self, dest, operand):
         """
-        Add label mark to IR_lst
+        Writes operand to dest unless it is there already.
         """
-        cblock =ControlFlowBlock(f"_L{label}", [])
-        self.cblock = cblock
-        self.IR_lst[label] = cblock
-    
-    def mark_label_while(self, cond, name, fbranch_label):
-        self.cblock = WhileNode(cond, name, fbranch_label)
-        self.IR_lst[name] = self.cblock
-
-    def mark_label_function(self, node):
+        if dest is not None and dest != operand:
+            self.emit(Copy(dest, operand))
+            return dest
+        return operand
+
+    def resolve(self, name):
         """
-        Add label mark to IR_lst
+        Qualified name of the function a call to name reaches.
         """
-        cblock =FunctionBlock(f"{node.name}",node.params, [])
-        self.cblock = cblock
-        self.IR_lst[node.name]= cblock
-        self.function_IR_lst[node.name]= cblock
-
-    def gen_File(self, node: ast.File):
-        branch_label = self.inc_label()
-        self.mark_label(branch_label)
-        self.generate(node.statements)
-    
-    def gen_VarDecl(self, node: ast.VarDecl):
-        self.add_code(node)
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return name
 
-    def gen_BreakStmt(self, node: ast.BreakStmt):
-        self.add_code(node)
+    def ends_block(self):
+        instructions = self.function.instructions
+        return bool(instructions) and instructions[-1].terminator
 
-    def gen_FunctionDefn(self, node: ast.FunctionDefn):
-        skip_decl = self.inc_label()
-        self.add_code(GOTONode(skip_decl))
-        self.mark_label_function(node)
-        self.generate(node.body)
-        self.mark_label(skip_decl)
+    def get_IR_list(self):
+        return self.program
+
+    def get_function_IR_list(self):
+        return self.program.functions
 
-    def gen_DictBuiltinCall(self, node: ast.DictBuiltinCall):
-        self.add_code(node)
+    def print_ir(self):
+        """
+        Print the generated IR to stdout
+        """
+        print(self.program)
+
+    ################################
+    ## Statements
+    ################################
 
-    def gen_ArrayBuiltinCall(self, node: ast.ArrayBuiltinCall):
-        self.add_code(node)
-    
-    def gen_VarAssign(self, node: ast.VarAssign):
-        self.add_code(node)
+    def gen_File(self, node: ast.File, dest=None, statement=False):
+        self.generate(node.statements)
 
-    def gen_StmtList(self, node: ast.StmtList):
-        if node:
-            for (child_name, child) in node.children():
-                self.generate(child)
+    def gen_StmtList(self, node: ast.StmtList, dest=None, statement=False):
+        for stmt in node.stmt_lst or []:
+            self.generate(stmt, statement=True)
+
+    def gen_VarDecl(self, node: ast.VarDecl, dest=None, statement=False):
+        self.move(node.name, self.generate(node.expr, node.name))
+
+    def gen_VarAssign(self, node: ast.VarAssign, dest=None, statement=False):
+        self.move(node.name, self.generate(node.expr, node.name))
+
+    def gen_FunctionDefn(self, node: ast.FunctionDefn, dest=None, statement=False):
+        parent = self.function
+        qualname = node.name
+        if parent is not self.program.module:
+            qualname = f"{parent.qualname}.{node.name}"
+        # A function defined again under the same name gets a name of its
+        # own; calls reach the definition last seen.
+        unique, count = qualname, 1
+        while unique in self.program.functions:
+            count += 1
+            unique = f"{qualname}.{count}"
+
+        params = [param.name for param in node.params.params or []]
+        function = IRFunction(node.name, params, parent, unique)
+        self.program.functions[unique] = function
+        self.scopes[-1][node.name] = unique
+
+        loops = self.loops
+        self.function, self.loops = function, []
+        self.scopes.append({})
+        self.generate(node.body)
+        if not function.instructions or not isinstance(function.instructions[-1], Return):
+            self.emit(Return(Const(None)))
+        self.scopes.pop()
+        self.function, self.loops = parent, loops
 
-    def gen_FunctionCall(self, node: ast.FunctionCall):
-        self.add_code(node)
+    def gen_RetStmt(self, node: ast.RetStmt, dest=None, statement=False):
+        self.emit(Return(self.generate(node.expr)))
 
-    def gen_IfStmt(self, node: ast.IfStmt):
-        fbranch_label = self.inc_label()
-        tbranch_label = self.inc_label()
+    def gen_IfStmt(self, node: ast.IfStmt, dest=None, statement=False):
+        true_label = self.function.new_label()
+        false_label = self.function.new_label()
+        end_label = self.function.new_label() if node.false_body else false_label
 
-        # Skip to the false_body if the condition is not met
-        self.add_code(IfNode(node.cond, tbranch_label, fbranch_label))
+        self.emit(Branch(self.generate(node.cond), true_label, false_label))
+        self.emit(Label(true_label))
         self.generate(node.true_body)
-        # Make sure the statements from false_body is skipped
-        self.add_code(GOTONode(tbranch_label))
-
-        self.mark_label(fbranch_label)
-        if(node.false_body):
-            if(type(node.false_body) != ast.ElifStmt):
-                self.add_code(ElseNode())
+        if node.false_body:
+            if not self.ends_block():
+                self.emit(Jump(end_label))
+            self.emit(Label(false_label))
             self.generate(node.false_body)
-        self.mark_label(tbranch_label)
+        self.emit(Label(end_label))
 
-    def gen_ElifStmt(self, node: ast.ElifStmt):
-        fbranch_label = self.inc_label()
-        tbranch_label = self.inc_label()
+    gen_ElifStmt = gen_IfStmt
 
-        # Skip to the false_body if the condition is not met
-        self.add_code(ElifNode(node.cond, tbranch_label, fbranch_label))
-        self.generate(node.true_body)
-        # Make sure the statements from false_body is skipped
-        self.add_code(GOTONode(tbranch_label))
+    def gen_WhileStmt(self, node: ast.WhileStmt, dest=None, statement=False):
+        head_label = self.function.new_label()
+        body_label = self.function.new_label()
+        exit_label = self.function.new_label()
 
-        self.mark_label(fbranch_label)
-        if(node.false_body):
-            if(type(node.false_body) != ast.ElifStmt):
-                self.add_code(ElseNode())
-            self.generate(node.false_body)
-        self.mark_label(tbranch_label)
-    
-    def gen_RetStmt(self, node: ast.RetStmt):
-        self.add_code(node)
+        self.emit(Label(head_label))
+        self.emit(Branch(self.generate(node.cond), body_label, exit_label))
+        self.emit(Label(body_label))
+        self.loops.append((head_label, exit_label))
+        self.generate(node.body)
+        self.loops.pop()
+        if not self.ends_block():
+            self.emit(Jump(head_label))
+        self.emit(Label(exit_label))
 
-    def gen_WhileStmt(self, node: ast.WhileStmt):
-        branch_label = self.inc_label()
-        fbranch_label = self.inc_label()
+    def gen_BreakStmt(self, node: ast.BreakStmt, dest=None, statement=False):
+        self.emit(Jump(self.loops[-1][1]))
 
-        # self.add_code(GOTONode(branch_label))
+    def gen_ContinueStmt(self, node: ast.ContinueStmt, dest=None, statement=False):
+        self.emit(Jump(self.loops[-1][0]))
 
-        # self.mark_label_while(node.cond, branch_label, fbranch_label)
-        # self.generate(node.body)
-        # # self.add_code(GOTONode(branch_label))
-        # self.mark_label(fbranch_label)
+    ################################
+    ## Expressions
+    ################################
 
-        # skip_decl = self.inc_label()
-        self.add_code(GOTONode(branch_label))
-        self.mark_label_while(node.cond, branch_label, fbranch_label)
-        self.generate(node.body)
-        self.mark_label(fbranch_label)
\ No newline at end of file
+    def gen_Constant(self, node: ast.Constant, dest=None, statement=False):
+        if isinstance(node.type, ast.Dict_Type):
+            dest = self.target(dest)
+            self.emit(NewDict(dest))
+            return dest
+        return Const(constant_value(node))
+
+    def gen_ID(self, node: ast.ID, dest=None, statement=False):
+        return node.name
+
+    def gen_BinOp(self, node: ast.BinOp, dest=None, statement=False):
+        if node.op in ("and", "or") and not isinstance(node.right, (ast.ID, ast.Constant)):
+            # The right operand only runs when the left one does not
+            # decide the result.
+            result = self.function.new_temp()
+            self.move(result, self.generate(node.left, result))
+            right_label = self.function.new_label()
+            end_label = self.function.new_label()
+            if node.op == "and":
+                self.emit(Branch(result, right_label, end_label))
+            else:
+                self.emit(Branch(result, end_label, right_label))
+            self.emit(Label(right_label))
+            self.move(result, self.generate(node.right, result))
+            self.emit(Label(end_label))
+            return self.move(dest, result)
+
+        left = self.generate(node.left)
+        right = self.generate(node.right)
+        dest = self.target(dest)
+        self.emit(Binary(dest, node.op, left, right))
+        return dest
+
+    def gen_UnaryOp(self, node: ast.UnaryOp, dest=None, statement=False):
+        operand = self.generate(node.expr)
+        if node.op == "-" and isinstance(operand, Const):
+            # Negative literals parse as negated constants.
+            return Const(-operand.value)
+        dest = self.target(dest)
+        self.emit(Unary(dest, node.op, operand))
+        return dest
+
+    def gen_FunctionCall(self, node: ast.FunctionCall, dest=None, statement=False):
+        args = [self.generate(expr) for expr in node.arguments.exprs or []]
+        if not statement:
+            dest = self.target(dest)
+        self.emit(Call(dest, self.resolve(node.name), args))
+        return dest
+
+    def gen_ArrayExprList(self, node: ast.ArrayExprList, dest=None, statement=False):
+        items = [self.generate(expr) for expr in node.exprs or []]
+        dest = self.target(dest)
+        self.emit(NewList(dest, items))
+        return dest
+
+    def gen_ArrayIndex(self, node: ast.ArrayIndex, dest=None, statement=False):
+        index = self.generate(node.expr)
+        dest = self.target(dest)
+        self.emit(Index(dest, node.name, index))
+        return dest
+
+    def gen_ArraySlice(self, node: ast.ArraySlice, dest=None, statement=False):
+        start = self.generate(node.expr1)
+        stop = self.generate(node.expr2)
+        dest = self.target(dest)
+        self.emit(Slice(dest, node.name, start, stop))
+        return dest
+
+    def gen_ArrayBuiltinCall(self, node: ast.ArrayBuiltinCall, dest=None, statement=False):
+        arg = self.generate(node.argumentExpression)
+        if not statement:
+            dest = self.target(dest)
+        self.emit(ArrayCall(dest, node.arrayID, node.builtinFunction[1:], arg))
+        return dest
+
+    def gen_DictBuiltinCall(self, node: ast.DictBuiltinCall, dest=None, statement=False):
+        args = [self.generate(expr) for expr in node.argumentExpression.exprs]
+        if node.builtinFunction == ".set":
+            self.emit(DictSet(node.dictID, args[0], args[1]))
+            return None
+        # A lookup used as a statement still raises on a missing key.
+        dest = self.target(dest)
+        self.emit(DictGet(dest, node.dictID, args[0]))
+        return dest
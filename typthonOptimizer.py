@@ -1,32 +1,158 @@
+import ast as pyast
+import copy
+import time
+
 import typthonAST as ast
 
 
+# Default size, in AST nodes, of the largest function body inlined, and
+# its value at the levels that differ.
+DEFAULT_INLINE_BUDGET = 24
+LEVEL_INLINE_BUDGETS = {3: 2 * DEFAULT_INLINE_BUDGET}
+
+# Optimization passes by name, with the Optimizer method running each.
+PASSES = {
+    "dead-functions": "remove_dead_functions",
+    "tail-calls": "eliminate_tail_calls",
+    "inline": "inline_functions",
+    "fold": "fold_constants",
+    "licm": "hoist_loop_invariants",
+    "cse": "eliminate_common_subexpressions",
+    "dce": "eliminate_dead_code",
+}
+
+# Order passes run in, one round of the pipeline. Dead functions are swept
+# again after inlining, which leaves functions without calls.
+PIPELINE = (
+    "dead-functions", "tail-calls", "inline", "dead-functions",
+    "fold", "licm", "cse", "dce",
+)
+
+# Passes of each optimization level, and how many rounds of the pipeline
+# it runs at most before reaching a fixpoint.
+LEVEL_PASSES = {
+    0: (),
+    1: ("dead-functions", "fold", "dce"),
+    2: tuple(PASSES),
+    3: tuple(PASSES),
+}
+LEVEL_ITERATIONS = {0: 1, 1: 1, 2: 2, 3: 8}
+
+
+def select_passes(level, pass_flags=()):
+    """
+    Names of the passes to run at level, with those named in pass_flags
+    added, or removed where prefixed with "no-".
+    """
+    if level not in LEVEL_PASSES:
+        raise ValueError(f"unknown optimization level {level}, expected 0 to 3")
+    passes = set(LEVEL_PASSES[level])
+    for flag in pass_flags:
+        name = flag[3:] if flag.startswith("no-") else flag
+        if name not in PASSES:
+            raise ValueError(
+                f"unknown optimization pass {name!r}, expected one of: {', '.join(PASSES)}"
+            )
+        if flag.startswith("no-"):
+            passes.discard(name)
+        else:
+            passes.add(name)
+    return passes
+
+
+class PassManager(object):
+    """
+    Runs the passes of an Optimizer in PIPELINE order, repeating the
+    pipeline until a round changes nothing or max_iterations rounds ran. A
+    pass is skipped when nothing changed the program since it last ran, as
+    it would find nothing new.
+
+    timings: seconds spent in each pass, over all rounds
+    iterations: rounds run
+    """
+
+    def __init__(self, optimizer, passes, max_iterations):
+        self.optimizer = optimizer
+        self.passes = [name for name in PIPELINE if name in passes]
+        self.max_iterations = max_iterations
+        self.timings = {}
+        self.iterations = 0
+
+    def run(self):
+        changes = 0
+        last_run = {}
+        while self.passes and self.iterations < self.max_iterations:
+            self.iterations += 1
+            round_changes = changes
+            for name in self.passes:
+                if last_run.get(name) == changes:
+                    continue
+                # Recorded before the pass counts its own changes, which may
+                # enable more of the same.
+                last_run[name] = changes
+                start = time.perf_counter()
+                if getattr(self.optimizer, PASSES[name])():
+                    changes += 1
+                self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+            if changes == round_changes:
+                break
+
+
 class Optimizer(object):
 
-    def __init__(self, root: ast.Node):
+    def __init__(self, root: ast.Node, inline_budget=None, level=2, pass_flags=()):
         """
         IR_lst: list of IR code
         register_count: integer to keep track of which register to use
         label_count: similar to register_count, but with labels
+        inline_budget: size of the largest function body inlined, 0 to
+                       disable inlining, or None for the default of level
+        level: optimization level, 0 to 3, picking the passes to run
+        pass_flags: names of passes to run on top of those of level, or to
+                    leave out when prefixed with "no-"
         """
         self.root = root
+        self.handlers = ast.dispatch_table(self.__class__, "parse_")
         self.cblock = None
         self.IR_lst = []
         self.function_IR_dict = {}
         self.label_count = 0
         self.scope = 0
 
-        self.called_functions = set()
+        if inline_budget is None:
+            inline_budget = LEVEL_INLINE_BUDGETS.get(level, DEFAULT_INLINE_BUDGET)
+        self.inline_budget = inline_budget
+        self.pass_manager = PassManager(
+            self, select_passes(level, pass_flags), LEVEL_ITERATIONS[level]
+        )
+
+        self.removed_functions = []
+        self.elapsed = 0.0
+        self.tail_calls = 0
+        self.inlined = 0
+        self.folded = 0
+        self.propagated = 0
+        self.hoisted = 0
+        self.subexpressions = 0
+        self.branches_pruned = 0
+        self.stores_removed = 0
+
+    def build_call_graph(self):
+        """
+        Call graph: the functions called by each function, by name, with
+        the top-level code of the program under None.
+        """
+        self.calls = {None: set()}
+        self.function_stack = [None]
         self.function_to_stmt_list = {}
         self.stmt_list_stack = []
-        self.parse(root)
+        self.parse(self.root)
 
     def parse(self, node: ast.Node):
         """
         Similar to 'typecheck' method from TypeChecker object
         """
-        method = "parse_" + node.__class__.__name__
-        return getattr(self, method)(node)
+        return self.handlers[node.__class__](self, node)
 
     def generic_gen(self, node):
         pass
@@ -38,17 +164,86 @@ class Optimizer(object):
     ################################
 
     def optimize(self):
-        updated = False
-        for function, (node, stmt_list) in self.function_to_stmt_list.items():
-            if function not in self.called_functions:
-                updated = True
-                stmt_list.stmt_lst.remove(node)
-        if updated:
-            self.function_to_stmt_list = {}
-            self.called_functions = set()
-            self.stmt_list_stack = []
-            self.parse(self.root)
-            self.optimize()
+        self.pass_manager.run()
+
+    # Each pass returns whether it changed the program.
+
+    def eliminate_tail_calls(self):
+        eliminator = TailCallEliminator(self.root)
+        eliminator.eliminate()
+        self.tail_calls += eliminator.eliminated
+        return eliminator.eliminated > 0
+
+    def inline_functions(self):
+        inliner = Inliner(self.root, self.inline_budget)
+        inliner.inline()
+        self.inlined += inliner.inlined
+        return inliner.inlined > 0
+
+    def fold_constants(self):
+        folder = ConstantFolder(self.root)
+        folder.fold()
+        self.folded += folder.folded
+        self.propagated += folder.propagated
+        return folder.folded + folder.propagated > 0
+
+    def hoist_loop_invariants(self):
+        hoister = LoopInvariantHoister(self.root)
+        hoister.hoist()
+        self.hoisted += hoister.hoisted
+        return hoister.hoisted > 0
+
+    def eliminate_common_subexpressions(self):
+        eliminator = CommonSubexpressionEliminator(self.root)
+        eliminator.eliminate()
+        self.subexpressions += eliminator.eliminated
+        return eliminator.eliminated > 0
+
+    def eliminate_dead_code(self):
+        eliminator = DeadCodeEliminator(self.root)
+        eliminator.eliminate()
+        self.branches_pruned += eliminator.branches_pruned
+        self.stores_removed += eliminator.stores_removed
+        return eliminator.branches_pruned + eliminator.stores_removed > 0
+
+    def remove_dead_functions(self):
+        """
+        Removes every function that the top-level code can not reach
+        through the call graph, including mutually recursive ones.
+        """
+        # Other passes change calls, so the graph is built afresh each time.
+        self.build_call_graph()
+        start = time.perf_counter()
+        reachable = self.reachable_functions()
+
+        # Sweep each statement list once, whatever number of dead
+        # functions it holds.
+        dead = {}
+        for function, definitions in self.function_to_stmt_list.items():
+            if function in reachable:
+                continue
+            self.removed_functions.append(function)
+            for node, stmt_list in definitions:
+                dead.setdefault(id(stmt_list), (stmt_list, set()))[1].add(id(node))
+        for stmt_list, nodes in dead.values():
+            stmt_list.stmt_lst = [s for s in stmt_list.stmt_lst if id(s) not in nodes]
+
+        self.elapsed += time.perf_counter() - start
+        return bool(dead)
+
+    def reachable_functions(self):
+        """
+        Names of the functions reachable from the top-level code.
+        """
+        reachable = set()
+        stack = list(self.calls[None])
+        while stack:
+            function = stack.pop()
+            if function in reachable:
+                continue
+            reachable.add(function)
+            stack.extend(self.calls.get(function, ()))
+        return reachable
 
     def inc_label(self):
         """
@@ -102,10 +297,15 @@ class Optimizer(object):
 ##########################################################################
 
     def parse_FunctionDefn(self, node, statement=False):
-        self.function_to_stmt_list[node.name] = (
-            node, self.stmt_list_stack[-1])
+        # Functions are known by name only, so definitions sharing a name
+        # live or die together.
+        self.function_to_stmt_list.setdefault(node.name, []).append(
+            (node, self.stmt_list_stack[-1]))
+        self.calls.setdefault(node.name, set())
+        self.function_stack.append(node.name)
         self.parse(node.params)
         self.parse(node.body)
+        self.function_stack.pop()
 
     def parse_ParamList(self, node, statement=False):
         pass
@@ -156,11 +356,11 @@ class Optimizer(object):
         self.parse(node.argumentExpression)
 
     def parse_FunctionCall(self, node, statement=False):
-        self.called_functions.add(node.name)
+        self.calls[self.function_stack[-1]].add(node.name)
         self.parse(node.arguments)
 
     def parse_Arguments(self, node, statement=False):
-        for expr in node.exprs:
+        for expr in node.exprs or []:
             self.parse(expr)
 
     def parse_IfStmt(self, node, statement=False):
@@ -182,9 +382,1544 @@ class Optimizer(object):
     def parse_BreakStmt(self, node, statement=False):
         pass
 
+    def parse_ContinueStmt(self, node, statement=False):
+        pass
+
     def parse_DictBuiltinCall(self, node, statement=False):
         if node.builtinFunction == ".set":
             self.parse(node.argumentExpression.exprs[0])
             self.parse(node.argumentExpression.exprs[1])
         else:
             self.parse(node.argumentExpression.exprs[0])
+
+
+# Python operators for each foldable Typthon operator. "/" is left alone:
+# it is typed int by the TypeChecker but yields a float at runtime.
+FOLDABLE_OPERATORS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "%": lambda a, b: a % b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+}
+SCALAR_TYPES = ("int", "bool", "str")
+
+
+def constant_value(node):
+    """
+    The Python value of a scalar Constant node, or None for any other node.
+    """
+    if not isinstance(node, ast.Constant) or not isinstance(node.type, ast.Type):
+        return None
+    if node.type.name == "int":
+        return node.value
+    if node.type.name == "bool":
+        return node.value == "True"
+    if node.type.name == "str":
+        return pyast.literal_eval(node.value)
+    return None
+
+
+def make_constant(value, coord):
+    """
+    Constant node holding the int or bool value, written the way the parser
+    writes it. No foldable operator yields a str.
+    """
+    if isinstance(value, bool):
+        return ast.Constant(ast.BOOL_TYPE, str(value), coord)
+    return ast.Constant(ast.INT_TYPE, value, coord)
+
+
+def copy_constant(node, coord):
+    return ast.Constant(node.type, node.value, coord)
+
+
+class ConstantFolder(object):
+    """
+    Folds BinOp and UnaryOp trees whose operands are constants, and
+    propagates the constant value of a variable into its uses.
+
+    A variable is propagated only if it is bound exactly once in the whole
+    program: one VarDecl of a scalar type, made directly in the body of the
+    file or of a function, with no parameter of the same name and no
+    VarAssign to it anywhere. The TypeChecker makes every use come after
+    that declaration, so each use sees the declared value.
+
+    fold_X methods return the node to put in place of the given one.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.handlers = ast.dispatch_table(self.__class__, "fold_", "generic_fold")
+        self.folded = 0
+        self.propagated = 0
+        self.bindings = {}
+        self.constants = {}
+        self.count_bindings(root)
+
+    def fold(self):
+        self.fold_node(self.root)
+        return self.root
+
+    def fold_node(self, node):
+        return self.handlers[node.__class__](self, node)
+
+    def generic_fold(self, node):
+        return node
+
+    def count_bindings(self, node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, (ast.VarDecl, ast.VarAssign, ast.Param)):
+                self.bindings[node.name] = self.bindings.get(node.name, 0) + 1
+            for child_name, child in node.children() or ():
+                if isinstance(child, ast.Node):
+                    stack.append(child)
+
+    def fold_File(self, node):
+        self.fold_body(node.statements)
+        return node
+
+    def fold_body(self, node):
+        """
+        Folds a file or function body, whose declarations may propagate.
+        """
+        for stmt in node.stmt_lst or []:
+            self.fold_node(stmt)
+            if (
+                isinstance(stmt, ast.VarDecl)
+                and self.bindings.get(stmt.name) == 1
+                and constant_value(stmt.expr) is not None
+            ):
+                self.constants[stmt.name] = stmt.expr
+        return node
+
+    def fold_StmtList(self, node):
+        for stmt in node.stmt_lst or []:
+            self.fold_node(stmt)
+        return node
+
+    def fold_FunctionDefn(self, node):
+        self.fold_body(node.body)
+        return node
+
+    def fold_VarDecl(self, node):
+        node.expr = self.fold_node(node.expr)
+        return node
+
+    def fold_VarAssign(self, node):
+        node.expr = self.fold_node(node.expr)
+        return node
+
+    def fold_RetStmt(self, node):
+        node.expr = self.fold_node(node.expr)
+        return node
+
+    def fold_IfStmt(self, node):
+        node.cond = self.fold_node(node.cond)
+        self.fold_node(node.true_body)
+        if node.false_body:
+            self.fold_node(node.false_body)
+        return node
+
+    def fold_ElifStmt(self, node):
+        return self.fold_IfStmt(node)
+
+    def fold_WhileStmt(self, node):
+        node.cond = self.fold_node(node.cond)
+        self.fold_node(node.body)
+        return node
+
+    def fold_ID(self, node):
+        constant = self.constants.get(node.name)
+        if constant is None:
+            return node
+        self.propagated += 1
+        return copy_constant(constant, node.coord)
+
+    def fold_ArrayExprList(self, node):
+        node.exprs = [self.fold_node(expr) for expr in node.exprs or []]
+        return node
+
+    def fold_ArrayIndex(self, node):
+        node.expr = self.fold_node(node.expr)
+        return node
+
+    def fold_ArraySlice(self, node):
+        node.expr1 = self.fold_node(node.expr1)
+        node.expr2 = self.fold_node(node.expr2)
+        return node
+
+    def fold_ArrayBuiltinCall(self, node):
+        node.argumentExpression = self.fold_node(node.argumentExpression)
+        return node
+
+    def fold_FunctionCall(self, node):
+        self.fold_node(node.arguments)
+        return node
+
+    def fold_Arguments(self, node):
+        node.exprs = [self.fold_node(expr) for expr in node.exprs or []]
+        return node
+
+    def fold_DictBuiltinCall(self, node):
+        self.fold_node(node.argumentExpression)
+        return node
+
+    def fold_UnaryOp(self, node):
+        node.expr = self.fold_node(node.expr)
+        value = constant_value(node.expr)
+        if value is None:
+            return node
+        self.folded += 1
+        if node.op == "not":
+            return make_constant(not value, node.expr.coord)
+        return make_constant(-value, node.expr.coord)
+
+    def fold_BinOp(self, node):
+        node.left = self.fold_node(node.left)
+        node.right = self.fold_node(node.right)
+        left = constant_value(node.left)
+        right = constant_value(node.right)
+
+        if node.op in ("and", "or"):
+            return self.fold_boolean(node, left, right)
+        if left is None or right is None or node.op not in FOLDABLE_OPERATORS:
+            return node
+        if node.op == "%" and right == 0:
+            # Leave the ZeroDivisionError to runtime.
+            return node
+        self.folded += 1
+        return make_constant(FOLDABLE_OPERATORS[node.op](left, right), node.coord)
+
+    def fold_boolean(self, node, left, right):
+        """
+        Folds and/or with a constant operand. Both operands are bool, so
+        "x and True" is x; "x and False" keeps x for its side effects.
+        """
+        absorbing = node.op == "or"
+        if left is not None:
+            self.folded += 1
+            # A constant left operand decides whether the right one runs.
+            return node.left if left == absorbing else node.right
+        if right is not None and right != absorbing:
+            self.folded += 1
+            return node.left
+        return node
+
+
+# Nodes whose names are read, and the attribute holding the name.
+READ_ATTRIBUTES = {
+    "ID": "name",
+    "ArrayIndex": "name",
+    "ArraySlice": "name",
+    "ArrayBuiltinCall": "arrayID",
+    "DictBuiltinCall": "dictID",
+}
+
+
+def walk(node, into_functions=True):
+    """
+    Every node reachable from node, node included. Nested function
+    definitions are yielded but not entered unless into_functions is set.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if not into_functions and isinstance(node, ast.FunctionDefn):
+            continue
+        for child_name, child in node.children() or ():
+            if isinstance(child, ast.Node):
+                stack.append(child)
+
+
+def read_names(node):
+    """
+    Count of reads of each variable name below node.
+    """
+    reads = {}
+    for child in walk(node):
+        attribute = READ_ATTRIBUTES.get(child.__class__.__name__)
+        if attribute is not None:
+            name = getattr(child, attribute)
+            reads[name] = reads.get(name, 0) + 1
+    return reads
+
+
+def is_pure(node):
+    """
+    Whether evaluating the expression node can neither have side effects
+    nor raise. Indexing, dict lookups and calls may do either; so may "/"
+    and "%" unless the divisor is a nonzero constant.
+    """
+    if isinstance(node, (ast.Constant, ast.ID)):
+        return True
+    if isinstance(node, ast.UnaryOp):
+        return is_pure(node.expr)
+    if isinstance(node, ast.BinOp):
+        if node.op in ("/", "%") and not constant_value(node.right):
+            return False
+        return is_pure(node.left) and is_pure(node.right)
+    if isinstance(node, ast.ArrayExprList):
+        return all(is_pure(expr) for expr in node.exprs or [])
+    return False
+
+
+class DeadCodeEliminator(object):
+    """
+    Removes code that can never run or whose result is never used:
+
+    - if/elif branches whose condition is a constant, collapsing elif
+      chains, and while loops whose condition is False
+    - statements after a return, break or continue in the same list
+    - stores to a function's local variable that nothing reads, when every
+      store to it is pure. Reads only feeding stores to the variable itself
+      do not count. Top-level variables are the program's result and are
+      always kept.
+
+    Calls, including the dict and array builtins, are expression statements
+    and are never removed.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.branches_pruned = 0
+        self.stores_removed = 0
+
+    def eliminate(self):
+        self.prune(self.root.statements)
+        for node in walk(self.root):
+            if isinstance(node, ast.FunctionDefn):
+                while self.remove_dead_stores(node):
+                    pass
+        if self.stores_removed:
+            # Removed stores may have left empty branches behind.
+            self.prune(self.root.statements)
+        return self.root
+
+    def prune(self, stmt_list):
+        """
+        Prunes the statements of stmt_list in place.
+        """
+        stmts = []
+        for stmt in stmt_list.stmt_lst or []:
+            if isinstance(stmt, (ast.IfStmt, ast.ElifStmt)):
+                stmts.extend(self.prune_if(stmt))
+            elif isinstance(stmt, ast.WhileStmt):
+                if constant_value(stmt.cond) is False:
+                    self.branches_pruned += 1
+                    continue
+                self.prune(stmt.body)
+                stmts.append(stmt)
+            elif isinstance(stmt, ast.FunctionDefn):
+                self.prune(stmt.body)
+                stmts.append(stmt)
+            else:
+                stmts.append(stmt)
+
+            if stmts and isinstance(stmts[-1], (ast.RetStmt, ast.BreakStmt, ast.ContinueStmt)):
+                break
+        stmt_list.stmt_lst = stmts
+
+    def prune_if(self, node):
+        """
+        Statements to put in place of the if statement node.
+        """
+        value = constant_value(node.cond)
+        if value is None:
+            self.prune(node.true_body)
+            node.false_body = self.prune_else(node.false_body)
+            if not node.true_body.stmt_lst and node.false_body is None and is_pure(node.cond):
+                self.branches_pruned += 1
+                return []
+            return [node]
+
+        self.branches_pruned += 1
+        if value:
+            self.prune(node.true_body)
+            return node.true_body.stmt_lst
+        if isinstance(node.false_body, ast.ElifStmt):
+            elif_node = node.false_body
+            return self.prune_if(
+                ast.IfStmt(elif_node.cond, elif_node.true_body, elif_node.false_body, elif_node.coord)
+            )
+        if node.false_body is not None:
+            self.prune(node.false_body)
+            return node.false_body.stmt_lst
+        return []
+
+    def prune_else(self, false_body):
+        """
+        The else branch to keep for false_body, None if there is none left.
+        """
+        if false_body is None:
+            return None
+        if isinstance(false_body, ast.ElifStmt):
+            value = constant_value(false_body.cond)
+            if value is None:
+                self.prune(false_body.true_body)
+                false_body.false_body = self.prune_else(false_body.false_body)
+                return false_body
+            self.branches_pruned += 1
+            if value:
+                return self.prune_else(false_body.true_body)
+            return self.prune_else(false_body.false_body)
+
+        self.prune(false_body)
+        return false_body if false_body.stmt_lst else None
+
+    def remove_dead_stores(self, function):
+        """
+        Removes the dead stores of one function. Returns whether any were
+        removed, as that may leave more of them dead.
+        """
+        local = {param.name for param in function.params.params or []}
+        stores = {}
+        stmt_lists = []
+        for node in walk(function.body, into_functions=False):
+            if isinstance(node, ast.StmtList):
+                stmt_lists.append(node)
+            elif isinstance(node, ast.VarDecl):
+                local.add(node.name)
+        for stmt_list in stmt_lists:
+            for stmt in stmt_list.stmt_lst or []:
+                if isinstance(stmt, (ast.VarDecl, ast.VarAssign)):
+                    stores.setdefault(stmt.name, []).append(stmt)
+
+        reads = read_names(function.body)
+        dead = set()
+        for name, name_stores in stores.items():
+            if name not in local:
+                continue
+            if not all(is_pure(stmt.expr) for stmt in name_stores):
+                continue
+            self_reads = sum(read_names(stmt.expr).get(name, 0) for stmt in name_stores)
+            if reads.get(name, 0) == self_reads:
+                dead.update(id(stmt) for stmt in name_stores)
+        if not dead:
+            return False
+
+        for stmt_list in stmt_lists:
+            stmts = [stmt for stmt in stmt_list.stmt_lst or [] if id(stmt) not in dead]
+            self.stores_removed += len(stmt_list.stmt_lst or []) - len(stmts)
+            stmt_list.stmt_lst = stmts
+        return True
+
+
+# Nodes whose names are written, on top of those in READ_ATTRIBUTES.
+WRITE_ATTRIBUTES = {"VarDecl": "name", "VarAssign": "name"}
+
+
+
+def rename(node, names):
+    """
+    Renames the variables below node as given by the dict names, in place.
+    """
+    for child in walk(node):
+        class_name = child.__class__.__name__
+        attribute = READ_ATTRIBUTES.get(class_name) or WRITE_ATTRIBUTES.get(class_name)
+        if attribute is not None and getattr(child, attribute) in names:
+            setattr(child, attribute, names[getattr(child, attribute)])
+
+
+def substitute(node, exprs, names):
+    """
+    Copy of the expression node with every ID named in the dict exprs
+    replaced by a copy of the matching expression, and every other read of
+    a variable named in the dict names renamed. Both happen in one pass, so
+    nothing substituted is renamed again.
+    """
+    if isinstance(node, ast.ID) and node.name in exprs:
+        return copy.deepcopy(exprs[node.name])
+    node = copy.copy(node)
+    attribute = READ_ATTRIBUTES.get(node.__class__.__name__)
+    if attribute is not None and getattr(node, attribute) in names:
+        setattr(node, attribute, names[getattr(node, attribute)])
+    for attribute, value in node.attributes():
+        if isinstance(value, ast.Node):
+            setattr(node, attribute, substitute(value, exprs, names))
+        elif isinstance(value, list):
+            setattr(node, attribute, [
+                substitute(item, exprs, names) if isinstance(item, ast.Node) else item
+                for item in value
+            ])
+    return node
+
+
+class InlineCandidate(object):
+    """
+    A function that may be inlined, with what the call sites need to know.
+
+    params: parameter names, in order
+    locals: variables the body declares
+    free: other variables the body reads, and the functions it calls, which
+          must mean the same at the call site
+    uses: reads of each parameter, split into plain IDs and name positions
+          such as xs[0] or xs.append(...)
+    expr: the returned expression, when the body is a single return
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.name = function.name
+        self.params = [param.name for param in function.params.params or []]
+        self.param_types = [param.type for param in function.params.params or []]
+        self.locals = set()
+        self.id_uses = {}
+        self.name_uses = {}
+        assigned = set()
+        used = set()
+        for node in walk(function.body):
+            class_name = node.__class__.__name__
+            if isinstance(node, ast.VarDecl):
+                self.locals.add(node.name)
+            elif isinstance(node, ast.VarAssign):
+                assigned.add(node.name)
+            elif isinstance(node, ast.FunctionCall):
+                used.add(node.name)
+            attribute = READ_ATTRIBUTES.get(class_name)
+            if attribute is None:
+                continue
+            name = getattr(node, attribute)
+            used.add(name)
+            uses = self.id_uses if isinstance(node, ast.ID) else self.name_uses
+            uses[name] = uses.get(name, 0) + 1
+        bound = self.locals | set(self.params)
+        self.free = used - bound
+        self.assigned = assigned
+        # Python makes a name the function assigns local, so a function
+        # assigning anything else would change meaning once inlined.
+        self.assigns_free = bool(assigned - bound)
+
+        stmts = function.body.stmt_lst or []
+        self.expr = None
+        if len(stmts) == 1 and isinstance(stmts[0], ast.RetStmt):
+            self.expr = stmts[0].expr
+        self.straight_line = bool(stmts) and isinstance(stmts[-1], ast.RetStmt) and all(
+            isinstance(stmt, (ast.VarDecl, ast.VarAssign, ast.FunctionCall,
+                              ast.ArrayBuiltinCall, ast.DictBuiltinCall))
+            for stmt in stmts[:-1]
+        )
+
+
+class Inliner(object):
+    """
+    Inlines calls to small, non-recursive top-level functions.
+
+    A function is a candidate when its body has at most budget nodes, calls
+    no function of its own name, holds no nested function or loop, and
+    assigns no variable it did not declare. Candidates are processed in
+    source order, so calls inside a candidate are inlined before the
+    candidate itself is measured.
+
+    A call is replaced by the returned expression when the body is a single
+    return and every argument may be evaluated in place of its parameter:
+    a constant or variable anywhere, or a pure expression used at most
+    once. Otherwise, a call that is the whole right-hand side of a
+    declaration or assignment is expanded into statements: the parameters
+    and locals of the callee become fresh _inlN_ variables, bound in order,
+    followed by the store of the returned expression. Top-level calls are
+    not expanded, as the _inlN_ variables would be left behind as globals.
+    No call is inlined where the callee's free variables or the functions
+    it calls are shadowed by the caller.
+
+    inline_X methods return the node to put in place of the given one.
+    """
+
+    def __init__(self, root, budget=DEFAULT_INLINE_BUDGET):
+        self.root = root
+        self.handlers = ast.dispatch_table(self.__class__, "inline_", "generic_inline")
+        self.budget = budget
+        self.candidates = {}
+        self.inlined = 0
+        self.bound = set()
+        self.in_function = False
+        self.taken = set()
+        self.counter = 0
+
+        functions = [node for node in walk(root) if isinstance(node, ast.FunctionDefn)]
+        names = [function.name for function in functions]
+        self.unique = {name for name in names if names.count(name) == 1}
+        for node in walk(root):
+            class_name = node.__class__.__name__
+            attribute = READ_ATTRIBUTES.get(class_name) or WRITE_ATTRIBUTES.get(class_name)
+            if attribute is not None:
+                self.taken.add(getattr(node, attribute))
+            elif isinstance(node, ast.Param):
+                self.taken.add(node.name)
+
+    def inline(self):
+        self.inline_node(self.root)
+        return self.root
+
+    def inline_node(self, node):
+        return self.handlers[node.__class__](self, node)
+
+    def generic_inline(self, node):
+        return node
+
+    def consider(self, function):
+        """
+        Makes function a candidate if it qualifies.
+        """
+        if self.budget <= 0 or function.name not in self.unique:
+            return
+        size = 0
+        for node in walk(function.body):
+            size += 1
+            if isinstance(node, (ast.FunctionDefn, ast.WhileStmt)):
+                return
+            if isinstance(node, ast.FunctionCall) and node.name == function.name:
+                return
+        if size > self.budget:
+            return
+        candidate = InlineCandidate(function)
+        if not candidate.assigns_free:
+            self.candidates[function.name] = candidate
+
+    def fresh(self, name):
+        """
+        A variable name for name that is used nowhere in the program.
+        """
+        while True:
+            self.counter += 1
+            fresh = f"_inl{self.counter}_{name}"
+            if fresh not in self.taken:
+                self.taken.add(fresh)
+                return fresh
+
+    def inline_File(self, node):
+        self.bound = set()
+        self.inline_node(node.statements)
+        for stmt in node.statements.stmt_lst or []:
+            if isinstance(stmt, ast.FunctionDefn):
+                self.consider(stmt)
+        return node
+
+    def inline_FunctionDefn(self, node):
+        # Variables of enclosing functions are visible in nested ones.
+        # So are the functions they define.
+        outer = self.bound
+        in_function = self.in_function
+        self.bound = outer | {param.name for param in node.params.params or []}
+        for child in walk(node.body, into_functions=False):
+            class_name = child.__class__.__name__
+            if class_name in WRITE_ATTRIBUTES or isinstance(child, ast.FunctionDefn):
+                self.bound.add(child.name)
+        self.in_function = True
+        self.inline_node(node.body)
+        self.bound = outer
+        self.in_function = in_function
+        return node
+
+    def inline_StmtList(self, node):
+        stmts = []
+        for stmt in node.stmt_lst or []:
+            if isinstance(stmt, ast.FunctionDefn):
+                # Candidates are only known once their own calls are
+                # inlined, so functions go in source order.
+                self.inline_node(stmt)
+                if node is self.root.statements:
+                    self.consider(stmt)
+                stmts.append(stmt)
+                continue
+            if isinstance(stmt, (ast.VarDecl, ast.VarAssign)) and isinstance(stmt.expr, ast.FunctionCall):
+                self.inline_node(stmt.expr.arguments)
+                expanded = self.expand(stmt)
+                if expanded is not None:
+                    stmts.extend(expanded)
+                    continue
+                stmt.expr = self.replace_call(stmt.expr)
+            else:
+                self.inline_node(stmt)
+            stmts.append(stmt)
+        node.stmt_lst = stmts
+        return node
+
+    def candidate_for(self, call):
+        candidate = self.candidates.get(call.name)
+        if candidate is None or candidate.free & self.bound:
+            return None
+        return candidate
+
+    def expand(self, stmt):
+        """
+        Statements to put in place of stmt, whose right-hand side is a
+        call, or None to leave it alone.
+        """
+        call = stmt.expr
+        candidate = self.candidate_for(call)
+        if candidate is None or not self.in_function:
+            return None
+        if candidate.expr is not None and self.substitutable(candidate, call):
+            return None  # left to inline_FunctionCall
+        if not candidate.straight_line:
+            return None
+
+        # Constants and variables are used as they are in place of
+        # parameters the callee never assigns. Nothing the callee does can
+        # rebind the caller's variable, as it assigns only its own.
+        exprs = {}
+        names = {}
+        stmts = []
+        for name, param_type, arg in zip(candidate.params, candidate.param_types, call.arguments.exprs or []):
+            if name in candidate.assigned or not isinstance(arg, (ast.Constant, ast.ID)):
+                names[name] = self.fresh(name)
+                stmts.append(ast.VarDecl(names[name], param_type, arg, stmt.coord))
+            elif isinstance(arg, ast.ID):
+                names[name] = arg.name
+            else:
+                exprs[name] = arg
+        for name in sorted(candidate.locals):
+            names[name] = self.fresh(name)
+        body = copy.deepcopy(candidate.function.body)
+        rename(body, names)
+        body = substitute(body, exprs, {})
+        for callee_stmt in body.stmt_lst[:-1]:
+            callee_stmt.coord = stmt.coord
+            stmts.append(callee_stmt)
+        stmt.expr = body.stmt_lst[-1].expr
+        stmts.append(stmt)
+        self.inlined += 1
+        return stmts
+
+    def substitutable(self, candidate, call):
+        """
+        Whether every argument of call may stand in for its parameter in the
+        returned expression.
+        """
+        for name, arg in zip(candidate.params, call.arguments.exprs or []):
+            if candidate.name_uses.get(name) and not isinstance(arg, ast.ID):
+                return False
+            if isinstance(arg, (ast.Constant, ast.ID)):
+                continue
+            # A pure argument read once is evaluated once, as before. One
+            # never read is dropped, which purity makes safe.
+            if not is_pure(arg) or candidate.id_uses.get(name, 0) > 1:
+                return False
+        return True
+
+    def inline_FunctionCall(self, node):
+        self.inline_node(node.arguments)
+        return self.replace_call(node)
+
+    def replace_call(self, node):
+        """
+        The returned expression of the callee in place of the call node, if
+        it may be substituted there, or node itself.
+        """
+        candidate = self.candidate_for(node)
+        if candidate is None or candidate.expr is None or not self.substitutable(candidate, node):
+            return node
+
+        args = dict(zip(candidate.params, node.arguments.exprs or []))
+        expr = substitute(
+            candidate.expr,
+            {name: arg for name, arg in args.items() if candidate.id_uses.get(name)},
+            {name: arg.name for name, arg in args.items() if candidate.name_uses.get(name)},
+        )
+        self.inlined += 1
+        return expr
+
+    def inline_Arguments(self, node):
+        node.exprs = [self.inline_node(expr) for expr in node.exprs or []]
+        return node
+
+    def inline_VarDecl(self, node):
+        node.expr = self.inline_node(node.expr)
+        return node
+
+    def inline_VarAssign(self, node):
+        node.expr = self.inline_node(node.expr)
+        return node
+
+    def inline_RetStmt(self, node):
+        node.expr = self.inline_node(node.expr)
+        return node
+
+    def inline_IfStmt(self, node):
+        node.cond = self.inline_node(node.cond)
+        self.inline_node(node.true_body)
+        if node.false_body:
+            self.inline_node(node.false_body)
+        return node
+
+    def inline_ElifStmt(self, node):
+        return self.inline_IfStmt(node)
+
+    def inline_WhileStmt(self, node):
+        node.cond = self.inline_node(node.cond)
+        self.inline_node(node.body)
+        return node
+
+    def inline_UnaryOp(self, node):
+        node.expr = self.inline_node(node.expr)
+        return node
+
+    def inline_BinOp(self, node):
+        node.left = self.inline_node(node.left)
+        node.right = self.inline_node(node.right)
+        return node
+
+    def inline_ArrayExprList(self, node):
+        node.exprs = [self.inline_node(expr) for expr in node.exprs or []]
+        return node
+
+    def inline_ArrayIndex(self, node):
+        node.expr = self.inline_node(node.expr)
+        return node
+
+    def inline_ArraySlice(self, node):
+        node.expr1 = self.inline_node(node.expr1)
+        node.expr2 = self.inline_node(node.expr2)
+        return node
+
+    def inline_ArrayBuiltinCall(self, node):
+        node.argumentExpression = self.inline_node(node.argumentExpression)
+        return node
+
+    def inline_DictBuiltinCall(self, node):
+        self.inline_node(node.argumentExpression)
+        return node
+
+
+# Result type of each operator, as the typechecker allows only int and
+# bool operands.
+BOOLEAN_OPERATORS = {"<", ">", "<=", ">=", "==", "!=", "and", "or", "not"}
+
+# Nodes that may raise when evaluated, beyond "/" and "%".
+RAISING_NODES = (ast.ArrayIndex, ast.ArraySlice, ast.ArrayBuiltinCall,
+                 ast.DictBuiltinCall, ast.FunctionCall)
+
+
+def expression_key(node):
+    """
+    Hashable key equal for expressions that compute the same value from
+    the same variables, or None for expressions that are not candidates
+    for common subexpression elimination: anything impure except d.get(k).
+    """
+    if isinstance(node, ast.ID):
+        return ("ID", node.name)
+    if isinstance(node, ast.Constant):
+        return ("Constant", node.value)
+    if isinstance(node, ast.UnaryOp):
+        expr = expression_key(node.expr)
+        return expr and ("UnaryOp", node.op, expr)
+    if isinstance(node, ast.BinOp):
+        if node.op in ("/", "%") and not constant_value(node.right):
+            return None
+        left = expression_key(node.left)
+        right = expression_key(node.right)
+        return left and right and ("BinOp", node.op, left, right)
+    if isinstance(node, ast.DictBuiltinCall) and node.builtinFunction == ".get":
+        key = expression_key(node.argumentExpression.exprs[0])
+        return key and ("get", node.dictID, key)
+    return None
+
+
+def key_names(key):
+    """
+    Variables read by the expression with the given key.
+    """
+    kind = key[0]
+    if kind == "ID":
+        return {key[1]}
+    if kind == "Constant":
+        return set()
+    if kind == "UnaryOp":
+        return key_names(key[2])
+    if kind == "BinOp":
+        return key_names(key[2]) | key_names(key[3])
+    return {key[1]} | key_names(key[2])
+
+
+def key_reads_dict(key):
+    """
+    Whether the expression with the given key looks up a dict, so its
+    value may change without any variable being assigned.
+    """
+    kind = key[0]
+    if kind == "get":
+        return True
+    if kind == "UnaryOp":
+        return key_reads_dict(key[2])
+    if kind == "BinOp":
+        return key_reads_dict(key[2]) or key_reads_dict(key[3])
+    return False
+
+
+def declared_types(body, types):
+    """
+    types, the declared type of each variable in scope, extended with the
+    variables declared in body.
+    """
+    types = dict(types)
+    for node in walk(body, into_functions=False):
+        if isinstance(node, ast.VarDecl):
+            types[node.name] = node.type
+    return types
+
+
+def replace_key(node, key, name):
+    """
+    Copy of node with every expression of the given key replaced by a read
+    of the variable name.
+    """
+    if expression_key(node) == key:
+        return ast.ID(name, node.coord)
+    node = copy.copy(node)
+    for attribute, value in node.attributes():
+        if isinstance(value, ast.Node):
+            setattr(node, attribute, replace_key(value, key, name))
+        elif isinstance(value, list):
+            setattr(node, attribute, [
+                replace_key(item, key, name) if isinstance(item, ast.Node) else item
+                for item in value
+            ])
+    return node
+
+
+def raises_elsewhere(node, key):
+    """
+    Whether anything below node but outside the expressions of the given
+    key may raise, so evaluating those expressions first could change
+    which exception is raised.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if expression_key(node) == key:
+            continue
+        if isinstance(node, RAISING_NODES):
+            return True
+        if isinstance(node, ast.BinOp) and node.op in ("/", "%") and not constant_value(node.right):
+            return True
+        stack.extend(child for child_name, child in node.children() or ()
+                     if isinstance(child, ast.Node))
+    return False
+
+
+class CommonSubexpressionEliminator(object):
+    """
+    Computes once the expressions that a run of simple statements computes
+    more than once, through a _cseN temporary declared before the first
+    statement computing it.
+
+    Candidates are pure int and bool expressions, and d.get(k) lookups. A
+    candidate stays available until a statement assigns one of the
+    variables it reads; a lookup also until a d.set(k, v) or function call,
+    which may change any dict. Compound statements end the run: an if
+    condition is part of the run before it, and its branches and loop
+    bodies are runs of their own.
+
+    eliminate_X methods process the statement lists below node X, with
+    types holding the declared type of each variable in scope, which gives
+    the type of the temporaries.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.handlers = ast.dispatch_table(self.__class__, "eliminate_", "generic_eliminate")
+        self.eliminated = 0
+        self.counter = 0
+        self.taken = set()
+        for node in walk(root):
+            class_name = node.__class__.__name__
+            attribute = READ_ATTRIBUTES.get(class_name) or WRITE_ATTRIBUTES.get(class_name)
+            if attribute is not None:
+                self.taken.add(getattr(node, attribute))
+            elif isinstance(node, (ast.Param, ast.FunctionDefn)):
+                self.taken.add(node.name)
+
+    def eliminate(self):
+        self.eliminate_node(self.root, {})
+        return self.root
+
+    def eliminate_node(self, node, types):
+        return self.handlers[node.__class__](self, node, types)
+
+    def generic_eliminate(self, node, types):
+        pass
+
+    def eliminate_File(self, node, types):
+        self.eliminate_node(node.statements, declared_types(node.statements, types))
+
+    def eliminate_FunctionDefn(self, node, types):
+        types = dict(types)
+        for param in node.params.params or []:
+            types[param.name] = param.type
+        self.eliminate_node(node.body, declared_types(node.body, types))
+
+    def eliminate_IfStmt(self, node, types):
+        self.eliminate_node(node.true_body, types)
+        if node.false_body:
+            self.eliminate_node(node.false_body, types)
+
+    def eliminate_ElifStmt(self, node, types):
+        self.eliminate_IfStmt(node, types)
+
+    def eliminate_WhileStmt(self, node, types):
+        self.eliminate_node(node.body, types)
+
+    def eliminate_StmtList(self, node, types):
+        stmts = []
+        run = []
+        for stmt in node.stmt_lst or []:
+            if isinstance(stmt, SIMPLE_STATEMENTS):
+                run.append(stmt)
+                continue
+            if isinstance(stmt, ast.IfStmt):
+                run.append(stmt)
+                stmts.extend(self.eliminate_run(run, types))
+            else:
+                stmts.extend(self.eliminate_run(run, types))
+                stmts.append(stmt)
+            run = []
+            self.eliminate_node(stmt, types)
+        stmts.extend(self.eliminate_run(run, types))
+        node.stmt_lst = stmts
+
+    def eliminate_run(self, run, types):
+        """
+        The statements of run with common subexpressions computed once.
+        One expression is replaced at a time, the largest first, so that of
+        x * y + z computed twice only the whole sum gets a temporary.
+        """
+        while True:
+            best = None
+            for key, stmt_indices in self.repeated_expressions(run):
+                size = key_size(key)
+                if best is None or size > best[0]:
+                    best = (size, key, stmt_indices)
+            if best is None:
+                return run
+            size, key, stmt_indices = best
+            first = run[stmt_indices[0]]
+            name = self.fresh()
+            expr = next(
+                child for slot in self.expression_slots(first)
+                for child in walk(slot) if expression_key(child) == key
+            )
+            run = list(run)
+            for index in stmt_indices:
+                attribute = SLOT_ATTRIBUTES[run[index].__class__.__name__]
+                setattr(run[index], attribute, replace_key(getattr(run[index], attribute), key, name))
+            run.insert(stmt_indices[0], ast.VarDecl(name, self.key_type(key, types), copy.deepcopy(expr), first.coord))
+            self.eliminated += 1
+
+    def repeated_expressions(self, run):
+        """
+        (key, statement indices) of every candidate computed more than once
+        in run with no statement in between invalidating it. A lookup only
+        becomes available where nothing else in its statement may raise, so
+        evaluating it before the statement can not change the exception.
+        """
+        available = {}
+        repeated = []
+        for index, stmt in enumerate(run):
+            slots = self.expression_slots(stmt)
+            clobbers = isinstance(stmt, ast.DictBuiltinCall) and stmt.builtinFunction == ".set"
+            clobbers = clobbers or any(
+                isinstance(child, ast.FunctionCall) for slot in slots for child in walk(slot)
+            )
+            if clobbers:
+                self.invalidate(available, repeated, key_reads_dict)
+            keys = []
+            for slot in slots:
+                for child in walk(slot):
+                    key = expression_key(child)
+                    if key is None or key[0] in ("ID", "Constant") or is_literal(key):
+                        continue
+                    if clobbers and key_reads_dict(key):
+                        continue
+                    keys.append(key)
+            for key in keys:
+                if key in available:
+                    available[key].append(index)
+                elif not (key_reads_dict(key) and any(raises_elsewhere(slot, key) for slot in slots)):
+                    available[key] = [index]
+            if isinstance(stmt, (ast.VarDecl, ast.VarAssign)):
+                self.invalidate(available, repeated, lambda key: stmt.name in key_names(key))
+            if clobbers:
+                self.invalidate(available, repeated, key_reads_dict)
+        self.invalidate(available, repeated, lambda key: True)
+        return repeated
+
+    def invalidate(self, available, repeated, predicate):
+        """
+        Ends the availability of every key matching predicate, keeping
+        those computed more than once with the statements computing them.
+        """
+        for key in [key for key in available if predicate(key)]:
+            stmt_indices = available.pop(key)
+            if len(stmt_indices) > 1:
+                repeated.append((key, sorted(set(stmt_indices))))
+
+    def expression_slots(self, stmt):
+        """
+        The expressions stmt evaluates before anything it stores.
+        """
+        attribute = SLOT_ATTRIBUTES.get(stmt.__class__.__name__)
+        if attribute is None or getattr(stmt, attribute) is None:
+            return []
+        return [getattr(stmt, attribute)]
+
+    def key_type(self, key, types):
+        if key[0] == "get":
+            return types[key[1]].val_type
+        return ast.BOOL_TYPE if key[1] in BOOLEAN_OPERATORS else ast.INT_TYPE
+
+    def fresh(self):
+        while True:
+            self.counter += 1
+            name = f"_cse{self.counter}"
+            if name not in self.taken:
+                self.taken.add(name)
+                return name
+
+
+# Statements that evaluate expressions and do nothing else.
+SIMPLE_STATEMENTS = (ast.VarDecl, ast.VarAssign, ast.RetStmt, ast.FunctionCall,
+                     ast.ArrayBuiltinCall, ast.DictBuiltinCall)
+
+# Attribute holding the expression each statement evaluates first.
+SLOT_ATTRIBUTES = {
+    "VarDecl": "expr",
+    "VarAssign": "expr",
+    "RetStmt": "expr",
+    "IfStmt": "cond",
+    "FunctionCall": "arguments",
+    "ArrayBuiltinCall": "argumentExpression",
+    "DictBuiltinCall": "argumentExpression",
+}
+
+
+def key_size(key):
+    """
+    Number of nodes in the expression with the given key.
+    """
+    return 1 + sum(key_size(part) for part in key[1:] if isinstance(part, tuple))
+
+
+def is_literal(key):
+    """
+    Whether the key is of a negative number, written as a unary minus.
+    """
+    return key[0] == "UnaryOp" and key[2][0] == "Constant"
+
+
+class LoopInvariantHoister(object):
+    """
+    Moves expressions whose value does not change while a loop runs out in
+    front of it, into _licmN temporaries declared before the while.
+
+    An expression is invariant when the loop assigns none of the variables
+    it reads. Reads of arrays and dicts are also invariant only if the loop
+    makes no builtin call that mutates one and no function call, as either
+    may change any of them through an alias.
+
+    The loop body may run no times, so only expressions that can not raise
+    are hoisted from it. Indexing and d.get(k) are hoisted only from the
+    part of the condition always evaluated, in front of anything else there
+    that may raise, which keeps the first exception the same. Slices build a
+    new list each time, so they are hoisted only where compared, never
+    where the list could be stored.
+
+    Outer loops are processed first, so an expression invariant in nested
+    loops moves in front of the outermost of them.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.handlers = ast.dispatch_table(self.__class__, "hoist_", "generic_hoist")
+        self.hoisted = 0
+        self.counter = 0
+        self.taken = set()
+        for node in walk(root):
+            class_name = node.__class__.__name__
+            attribute = READ_ATTRIBUTES.get(class_name) or WRITE_ATTRIBUTES.get(class_name)
+            if attribute is not None:
+                self.taken.add(getattr(node, attribute))
+            elif isinstance(node, (ast.Param, ast.FunctionDefn)):
+                self.taken.add(node.name)
+
+    def hoist(self):
+        self.hoist_node(self.root, {})
+        return self.root
+
+    def hoist_node(self, node, types):
+        return self.handlers[node.__class__](self, node, types)
+
+    def generic_hoist(self, node, types):
+        pass
+
+    def hoist_File(self, node, types):
+        self.hoist_node(node.statements, declared_types(node.statements, types))
+
+    def hoist_FunctionDefn(self, node, types):
+        types = dict(types)
+        for param in node.params.params or []:
+            types[param.name] = param.type
+        self.hoist_node(node.body, declared_types(node.body, types))
+
+    def hoist_IfStmt(self, node, types):
+        self.hoist_node(node.true_body, types)
+        if node.false_body:
+            self.hoist_node(node.false_body, types)
+
+    def hoist_ElifStmt(self, node, types):
+        self.hoist_IfStmt(node, types)
+
+    def hoist_StmtList(self, node, types):
+        stmts = []
+        for stmt in node.stmt_lst or []:
+            if isinstance(stmt, ast.WhileStmt):
+                stmts.extend(self.hoist_loop(stmt, types))
+            stmts.append(stmt)
+            self.hoist_node(stmt, types)
+        node.stmt_lst = stmts
+
+    def hoist_WhileStmt(self, node, types):
+        self.hoist_node(node.body, types)
+
+    def hoist_loop(self, loop, types):
+        """
+        Replaces the invariant expressions of loop with temporaries and
+        returns the declarations of those, to go in front of it.
+        """
+        self.types = types
+        self.assigned = set()
+        self.stable = True
+        for node in walk(loop, into_functions=False):
+            if isinstance(node, (ast.VarDecl, ast.VarAssign, ast.FunctionDefn)):
+                self.assigned.add(node.name)
+            elif isinstance(node, (ast.FunctionCall, ast.ArrayBuiltinCall)):
+                self.stable = False
+            elif isinstance(node, ast.DictBuiltinCall) and node.builtinFunction == ".set":
+                self.stable = False
+        self.temporaries = {}
+        self.decls = []
+        self.coord = loop.coord
+
+        # Nothing in the condition has raised yet when it starts.
+        self.blocked = False
+        loop.cond = self.hoist_expr(loop.cond, conditional=False, compared=False)
+        self.blocked = True
+        self.hoist_children(loop.body)
+        return self.decls
+
+    def hoist_children(self, node):
+        """
+        Hoists from every expression below the statement node, other than
+        those of nested functions.
+        """
+        if isinstance(node, ast.FunctionDefn):
+            return
+        if isinstance(node, ast.StmtList):
+            for stmt in node.stmt_lst or []:
+                self.hoist_children(stmt)
+            return
+        for attribute, value in node.attributes():
+            if isinstance(value, (ast.StmtList, ast.IfStmt, ast.ElifStmt)):
+                self.hoist_children(value)
+            elif isinstance(value, ast.Node):
+                setattr(node, attribute, self.hoist_expr(value, conditional=True, compared=False))
+
+    def hoist_expr(self, node, conditional, compared):
+        """
+        node, or a read of the temporary holding it if it is invariant,
+        with its invariant subexpressions hoisted otherwise. conditional is
+        set where node may not be evaluated on the first iteration, and
+        compared where its value is only compared.
+        """
+        if self.hoistable(node, conditional, compared):
+            return ast.ID(self.temporary(node), node.coord)
+        if isinstance(node, ast.BinOp):
+            compared = node.op in ("==", "!=")
+            node.left = self.hoist_expr(node.left, conditional, compared)
+            # The right operand of and/or may not be evaluated.
+            right_conditional = conditional or node.op in ("and", "or")
+            node.right = self.hoist_expr(node.right, right_conditional, compared)
+        elif isinstance(node, ast.ArrayExprList):
+            node.exprs = [self.hoist_expr(expr, conditional, False) for expr in node.exprs or []]
+        elif isinstance(node, ast.Arguments):
+            node.exprs = [self.hoist_expr(expr, conditional, False) for expr in node.exprs or []]
+        elif isinstance(node, ast.DictBuiltinCall):
+            self.hoist_expr(node.argumentExpression, conditional, False)
+        else:
+            for attribute in ("expr", "expr1", "expr2", "argumentExpression", "arguments"):
+                value = getattr(node, attribute, None)
+                if isinstance(value, ast.Node):
+                    setattr(node, attribute, self.hoist_expr(value, conditional, False))
+        if self.may_raise(node):
+            self.blocked = True
+        return node
+
+    def hoistable(self, node, conditional, compared):
+        if not isinstance(node, (ast.BinOp, ast.UnaryOp, ast.ArrayIndex, ast.ArraySlice,
+                                 ast.DictBuiltinCall)):
+            return False
+        if isinstance(node, ast.UnaryOp) and isinstance(node.expr, ast.Constant):
+            return False
+        if isinstance(node, ast.ArraySlice) and not compared:
+            return False
+        if not self.invariant(node):
+            return False
+        if self.raises(node) and (conditional or self.blocked):
+            return False
+        return self.expression_type(node) is not None
+
+    def invariant(self, node):
+        """
+        Whether the value of the expression node is the same on every
+        iteration.
+        """
+        if isinstance(node, ast.Constant):
+            return True
+        if isinstance(node, ast.ID):
+            return node.name not in self.assigned
+        if isinstance(node, ast.UnaryOp):
+            return self.invariant(node.expr)
+        if isinstance(node, ast.BinOp):
+            return self.invariant(node.left) and self.invariant(node.right)
+        if isinstance(node, ast.ArrayIndex):
+            return self.stable and node.name not in self.assigned and self.invariant(node.expr)
+        if isinstance(node, ast.ArraySlice):
+            return (self.stable and node.name not in self.assigned
+                    and self.invariant(node.expr1) and self.invariant(node.expr2))
+        if isinstance(node, ast.DictBuiltinCall) and node.builtinFunction == ".get":
+            return (self.stable and node.dictID not in self.assigned
+                    and self.invariant(node.argumentExpression.exprs[0]))
+        return False
+
+    def raises(self, node):
+        """
+        Whether evaluating the invariant expression node may raise.
+        """
+        return any(self.may_raise(child) for child in walk(node))
+
+    def may_raise(self, node):
+        if isinstance(node, ast.BinOp):
+            return node.op in ("/", "%") and not constant_value(node.right)
+        return isinstance(node, RAISING_NODES) and not isinstance(node, ast.ArraySlice)
+
+    def expression_type(self, node):
+        if isinstance(node, ast.BinOp):
+            return ast.BOOL_TYPE if node.op in BOOLEAN_OPERATORS else ast.INT_TYPE
+        if isinstance(node, ast.UnaryOp):
+            return ast.BOOL_TYPE if node.op in BOOLEAN_OPERATORS else ast.INT_TYPE
+        if isinstance(node, ast.DictBuiltinCall):
+            dict_type = self.types.get(node.dictID)
+            return dict_type.val_type if isinstance(dict_type, ast.Dict_Type) else None
+        array_type = self.types.get(node.name)
+        if not isinstance(array_type, ast.Array_Type):
+            return None
+        return array_type.innerType if isinstance(node, ast.ArrayIndex) else array_type
+
+    def temporary(self, node):
+        """
+        Name of the temporary holding the value of node, declared on first
+        use. Equal expressions share one.
+        """
+        key = structural_key(node)
+        if key not in self.temporaries:
+            name = self.fresh()
+            self.temporaries[key] = name
+            self.decls.append(ast.VarDecl(name, self.expression_type(node), node, self.coord))
+            self.hoisted += 1
+        return self.temporaries[key]
+
+    def fresh(self):
+        while True:
+            self.counter += 1
+            name = f"_licm{self.counter}"
+            if name not in self.taken:
+                self.taken.add(name)
+                return name
+
+
+def structural_key(node):
+    """
+    Hashable key equal for nodes of the same structure, ignoring where in
+    the source they are.
+    """
+    if isinstance(node, ast.Node):
+        return (node.__class__.__name__,) + tuple(
+            (attribute, structural_key(value))
+            for attribute, value in node.attributes() if attribute != "coord"
+        )
+    if isinstance(node, list):
+        return tuple(structural_key(item) for item in node)
+    return node
+
+
+def always_exits(stmts):
+    """
+    Whether running stmts always ends in a return, break or continue.
+    """
+    if not stmts:
+        return False
+    last = stmts[-1]
+    if isinstance(last, (ast.RetStmt, ast.BreakStmt, ast.ContinueStmt)):
+        return True
+    if isinstance(last, (ast.IfStmt, ast.ElifStmt)):
+        if isinstance(last.false_body, (ast.IfStmt, ast.ElifStmt)):
+            false_exits = always_exits([last.false_body])
+        else:
+            false_exits = bool(last.false_body) and always_exits(last.false_body.stmt_lst)
+        return false_exits and always_exits(last.true_body.stmt_lst)
+    return False
+
+
+def drop_trailing_continue(stmts):
+    """
+    Removes from the body of a loop, stmts, the continue statements it
+    would run right before the end of the body anyway.
+    """
+    if not stmts:
+        return
+    last = stmts[-1]
+    if isinstance(last, ast.ContinueStmt):
+        stmts.pop()
+    elif isinstance(last, (ast.IfStmt, ast.ElifStmt)):
+        drop_trailing_continue(last.true_body.stmt_lst)
+        if isinstance(last.false_body, (ast.IfStmt, ast.ElifStmt)):
+            drop_trailing_continue([last.false_body])
+        elif last.false_body:
+            drop_trailing_continue(last.false_body.stmt_lst)
+
+
+class TailCallEliminator(object):
+    """
+    Turns functions that return calls to themselves into loops: the body
+    is wrapped in "while True", and each "return f(args)" becomes an
+    assignment of args to the parameters followed by a continue. A body
+    that can run off its end breaks out of the loop afterwards, returning
+    None as before.
+
+    Tail calls are looked for in the function body and in the branches of
+    its if statements. Calls inside while loops are left alone, as there
+    continue would restart the inner loop. So are functions holding nested
+    functions, which could capture parameters the loop reassigns.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.eliminated = 0
+        self.counter = 0
+        self.taken = set()
+        for node in walk(root):
+            class_name = node.__class__.__name__
+            attribute = READ_ATTRIBUTES.get(class_name) or WRITE_ATTRIBUTES.get(class_name)
+            if attribute is not None:
+                self.taken.add(getattr(node, attribute))
+            elif isinstance(node, (ast.Param, ast.FunctionDefn)):
+                self.taken.add(node.name)
+
+    def eliminate(self):
+        for node in walk(self.root):
+            if isinstance(node, ast.FunctionDefn):
+                self.eliminate_function(node)
+        return self.root
+
+    def eliminate_function(self, function):
+        if any(isinstance(node, ast.FunctionDefn) for node in walk(function.body)):
+            return
+        eliminated = self.eliminated
+        self.rewrite(function.body, function)
+        if self.eliminated == eliminated:
+            return
+        stmts = function.body.stmt_lst
+        if not always_exits(stmts):
+            stmts.append(ast.BreakStmt(function.coord))
+        drop_trailing_continue(stmts)
+        loop = ast.WhileStmt(ast.Constant(ast.BOOL_TYPE, "True", function.coord),
+                             ast.StmtList(stmts, function.coord), function.coord)
+        function.body.stmt_lst = [loop]
+
+    def rewrite(self, stmt_list, function):
+        """
+        Rewrites the tail calls to function in stmt_list, and in the
+        branches of its if statements, in place.
+        """
+        stmts = []
+        for stmt in stmt_list.stmt_lst or []:
+            if isinstance(stmt, (ast.IfStmt, ast.ElifStmt)):
+                self.rewrite_if(stmt, function)
+            elif self.is_tail_call(stmt, function):
+                stmts.extend(self.rebind(stmt.expr, function))
+                stmts.append(ast.ContinueStmt(stmt.coord))
+                self.eliminated += 1
+                continue
+            stmts.append(stmt)
+        stmt_list.stmt_lst = stmts
+
+    def rewrite_if(self, node, function):
+        self.rewrite(node.true_body, function)
+        if isinstance(node.false_body, (ast.IfStmt, ast.ElifStmt)):
+            self.rewrite_if(node.false_body, function)
+        elif node.false_body:
+            self.rewrite(node.false_body, function)
+
+    def is_tail_call(self, stmt, function):
+        return (isinstance(stmt, ast.RetStmt) and isinstance(stmt.expr, ast.FunctionCall)
+                and stmt.expr.name == function.name)
+
+    def rebind(self, call, function):
+        """
+        Statements assigning the arguments of call to the parameters of
+        function, as if all at once.
+        """
+        params = function.params.params or []
+        changed = [
+            (param, arg) for param, arg in zip(params, call.arguments.exprs or [])
+            if not (isinstance(arg, ast.ID) and arg.name == param.name)
+        ]
+        if not all(is_pure(arg) for param, arg in changed):
+            # Arguments with side effects, or that may raise, keep their
+            # source order: all are evaluated into temporaries before any
+            # parameter is assigned.
+            names = [self.fresh() for _ in changed]
+            stmts = [
+                ast.VarDecl(name, param.type, arg, call.coord)
+                for name, (param, arg) in zip(names, changed)
+            ]
+            stmts.extend(
+                ast.VarAssign(param.name, ast.ID(name, call.coord), call.coord)
+                for name, (param, arg) in zip(names, changed)
+            )
+            return stmts
+        # Assign each parameter once no other argument still reads it. To
+        # break a cycle of arguments reading each other's parameters, one
+        # parameter is saved in a temporary for the others to read.
+        stmts = []
+        while changed:
+            for index, (param, arg) in enumerate(changed):
+                others = changed[:index] + changed[index + 1:]
+                if not any(param.name in read_names(other) for _, other in others):
+                    break
+            else:
+                index = 0
+                param = changed[0][0]
+                name = self.fresh()
+                stmts.append(ast.VarDecl(name, param.type, ast.ID(param.name, call.coord), call.coord))
+                for _, other in changed[1:]:
+                    rename(other, {param.name: name})
+            param, arg = changed.pop(index)
+            stmts.append(ast.VarAssign(param.name, arg, call.coord))
+        return stmts
+
+    def fresh(self):
+        while True:
+            self.counter += 1
+            name = f"_tail{self.counter}"
+            if name not in self.taken:
+                self.taken.add(name)
+                return name
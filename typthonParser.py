@@ -1,10 +1,36 @@
 #!/usr/bin/env python3
 
 import argparse
+import copy
+import os
 from ply import yacc
 import typthonLexer as lexer
 import typthonAST as ast
 
+# Name of the pickled LALR tables inside a table directory, and the environment
+# variable that points every parser in the process at a shared table directory.
+TABFILE = "typthon_parsetab.pickle"
+TABDIR_ENV = "TYPTHON_TABDIR"
+
+# Built (lexer, parser) pairs, shared by every typthonParser in the process so
+# the lexer and LALR tables are only constructed once.
+_built = {}
+
+
+class TokenStream(object):
+    """
+    Feeds already scanned tokens to the parser in place of a lexer.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+
+    def input(self, data):
+        pass
+
+    def token(self):
+        return next(self.tokens, None)
+
 
 class typthonParser:
 
@@ -20,14 +46,22 @@ class typthonParser:
         ("right", "UNARY"),
     )
 
-    def __init__(self, **kwargs):
+    tokens = lexer.tokens
+
+    def __init__(self, tabdir=None, **kwargs):
         """
-        Builds the Lexer and Parser
+        Builds the Lexer and Parser, or reuses the ones already built in
+        this process for the same table directory.
+
+        tabdir: directory holding pre-generated LALR tables. Defaults to
+                $TYPTHON_TABDIR, and otherwise to PLY's own behaviour of
+                keeping parsetab.py next to this module.
         """
-        self.tokens = lexer.tokens
-        self.lexer = lexer.typthonLexer()
-        self.lexer.build()
-        self.parser = yacc.yacc(module=self, **kwargs)
+        self.tabdir = tabdir or os.environ.get(TABDIR_ENV)
+        key = (self.tabdir, tuple(sorted(kwargs.items())))
+        if key not in _built:
+            _built[key] = self.build_tables(self.tabdir, **kwargs)
+        self.lexer, self.parser = _built[key]
 
     # =======================#
     #       # Misc #        #
@@ -39,18 +73,81 @@ class typthonParser:
     def p_error(self, p):
         raise SyntaxError(f"Syntax error at token {p}")
 
-    def parse(self, data):
-        self.build()
-        return self.parser.parse(data)
+    def parse(self, data, lineno=1, errors=None):
+        """
+        Parses data into an AST. lineno is the line data starts on, for
+        parsing a fragment of a larger file. Lexical errors are appended to
+        errors when a list is given, and printed otherwise.
+        """
+        lexer = self.new_lexer(lineno, errors)
+        return self.parser.parse(data, lexer=lexer)
+
+    def tokenize(self, data, lineno=1, errors=None):
+        """
+        Scans data into a list of tokens, for timing lexing on its own.
+        """
+        lexer = self.new_lexer(lineno, errors)
+        lexer.input(data)
+        return list(iter(lexer.token, None))
+
+    def parse_tokens(self, tokens):
+        """
+        Parses tokens returned by tokenize into an AST.
+        """
+        return self.parser.parse(lexer=TokenStream(tokens))
+
+    def new_lexer(self, lineno=1, errors=None):
+        """
+        Returns a fresh lexer sharing the compiled rules of the built one, so
+        line numbers and errors start over on every parse.
+        """
+        lexer = self.lexer.lexer.clone()
+        lexer.lineno = lineno
+        lexer.errors = errors
+        return lexer
+
+    def clone(self):
+        """
+        Returns a parser sharing this one's tables but with its own parse
+        state, so that another thread can parse at the same time.
+        """
+        other = copy.copy(self)
+        other.parser = copy.copy(self.parser)
+        return other
 
     def build(self, **kwargs):
-        self.tokens = lexer.tokens
-        self.lexer = lexer.typthonLexer()
-        self.lexer.build()
-        self.parser = yacc.yacc(module=self, **kwargs)
+        """
+        Forces the lexer and tables to be rebuilt and replaces the shared copy.
+        """
+        key = (self.tabdir, tuple(sorted(kwargs.items())))
+        _built[key] = self.build_tables(self.tabdir, **kwargs)
+        self.lexer, self.parser = _built[key]
+
+    def build_tables(self, tabdir=None, **kwargs):
+        """
+        Builds the lexer and the LALR parser. If tabdir already holds tables
+        for this grammar they are loaded read-only; otherwise the tables are
+        generated and written there for the next process.
+        """
+        lex = lexer.typthonLexer()
+        lex.build()
+
+        if tabdir is None:
+            return lex, yacc.yacc(module=self, **kwargs)
+
+        # Pickled tables load without compiling a large Python module, and
+        # are only written when missing or out of date with the grammar.
+        os.makedirs(tabdir, exist_ok=True)
+        kwargs.setdefault("debug", False)
+        return lex, yacc.yacc(
+            module=self,
+            picklefile=os.path.join(tabdir, TABFILE),
+            outputdir=tabdir,
+            **kwargs,
+        )
 
     def test(self, data):
-        result = self.parser.parse(data)
+        result = self.parse(data)
         visitor = ast.NodeVisitor()
         visitor.visit(result)
 
@@ -249,26 +346,12 @@ class typthonParser:
                    | ID DIVIDEEQ expression
                    | ID MODEQ expression
         """
-        if p[2] == "+=":
-            p[0] = ast.VarAssign(
-                p[1], ast.BinOp("+", ast.ID(p[1], p.lineno(1)), p[3]), p.lineno(1)
-            )
-        elif p[2] == "-=":
-            p[0] = ast.VarAssign(
-                p[1], ast.BinOp("-", ast.ID(p[1], p.lineno(1)), p[3]), p.lineno(1)
-            )
-        elif p[2] == "*=":
-            p[0] = ast.VarAssign(
-                p[1], ast.BinOp("*", ast.ID(p[1], p.lineno(1)), p[3]), p.lineno(1)
-            )
-        elif p[2] == "/=":
-            p[0] = ast.VarAssign(
-                p[1], ast.BinOp("/", ast.ID(p[1], p.lineno(1)), p[3]), p.lineno(1)
-            )
-        elif p[2] == "%=":
-            p[0] = ast.VarAssign(
-                p[1], ast.BinOp("%", ast.ID(p[1], p.lineno(1)), p[3]), p.lineno(1)
-            )
+        # The operator is the token without its "=". The read of the variable
+        # is an ID node of its own, as BinOp operands are expression nodes
+        # that later passes may rewrite in place.
+        p[0] = ast.VarAssign(
+            p[1], ast.BinOp(p[2][:-1], ast.ID(p[1], p.lineno(1)), p[3]), p.lineno(1)
+        )
 
     # =======================#
     #     Expression        #
@@ -416,7 +499,7 @@ class typthonParser:
         """
         empty_dict : EMPTYDICT
         """
-        p[0] = ast.Constant(ast.Dict_Type(ast.Type("NullType"), ast.Type("NullType")), p[1], p.lineno(1))
+        p[0] = ast.Constant(ast.EMPTY_DICT_TYPE, p[1], p.lineno(1))
         # p[0] = ast.Dict(p.lineno(1))
     # =======================#
     #     Literals           #
@@ -426,24 +509,26 @@ class typthonParser:
         """
         literal : NUMBER
         """
-        p[0] = ast.Constant(ast.Type("int"), p[1], p.lineno(1))
+        p[0] = ast.Constant(ast.INT_TYPE, p[1], p.lineno(1))
 
     def p_literal_string(self, p):
         """
         literal : STRINGLITERAL
         """
-        p[0] = ast.Constant(ast.Type("str"), p[1], p.lineno(1))
+        p[0] = ast.Constant(ast.STR_TYPE, p[1], p.lineno(1))
 
     def p_literal_boolean(self, p):
         """
         literal : TRUE
                 | FALSE
         """
-        p[0] = ast.Constant(ast.Type("bool"), p[1], p.lineno(1))
+        p[0] = ast.Constant(ast.BOOL_TYPE, p[1], p.lineno(1))
 
     # =======================#
     #         Types          #
     # =======================#
+    # Types are the canonical objects of typthonAST, shared by every use,
+    # so they carry no line number.
     # =======================#
     # =======================#
     # =======================#
@@ -462,25 +547,25 @@ class typthonParser:
         """
         array_type : LBRACK array_type RBRACK
         """
-        p[0] = ast.Array_Type(p[2], p.lineno(2))
+        p[0] = ast.get_array_type(p[2])
 
     def p_array_type_primitive(self, p):
         """
         array_type : LBRACK primitive_type RBRACK
         """
-        p[0] = ast.Array_Type(p[2], p.lineno(2))
+        p[0] = ast.get_array_type(p[2])
 
     def p_array_type_dict(self, p):
         """
         array_type : LBRACK dict_type RBRACK
         """
-        p[0] = ast.Array_Type(p[2], p.lineno(2))
+        p[0] = ast.get_array_type(p[2])
 
     def p_dict_type(self, p):
         """
         dict_type : DICT LESS type COMMA type GREATER
         """
-        p[0] = ast.Dict_Type(p[3], p[5], p.lineno(2))
+        p[0] = ast.get_dict_type(p[3], p[5])
 
     def p_primitive_type(self, p):
         """
@@ -489,7 +574,7 @@ class typthonParser:
                         | BOOLEAN
                         | NULLTYPE
         """
-        p[0] = ast.Type(p[1], p.lineno(1))
+        p[0] = ast.get_type(p[1])
 
 
 
@@ -498,13 +583,23 @@ if __name__ == "__main__":
     argparser = argparse.ArgumentParser(
         description="Take in the miniJava source code and parses it"
     )
-    argparser.add_argument("FILE", help="Input file with miniJava source code")
+    argparser.add_argument("FILE", nargs="?", help="Input file with miniJava source code")
+    argparser.add_argument(
+        "--write-tables",
+        metavar="DIR",
+        help="Generate the LALR tables into DIR and exit",
+    )
     args = argparser.parse_args()
 
+    if args.write_tables:
+        typthonParser(tabdir=args.write_tables)
+        quit()
+    if args.FILE is None:
+        argparser.error("FILE is required unless --write-tables is given")
+
     f = open(args.FILE, "r")
     data = f.read()
     f.close()
 
     m = typthonParser()
-    m.build()
     m.test(data)
\ No newline at end of file
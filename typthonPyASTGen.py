@@ -0,0 +1,296 @@
+import ast as pyast
+import importlib.util
+import marshal
+import os
+import struct
+
+import typthonAST as ast
+from typthonHoist import MainHoist
+
+# Python operator nodes for each Typthon operator.
+BINARY_OPERATORS = {
+    "+": pyast.Add,
+    "-": pyast.Sub,
+    "*": pyast.Mult,
+    "/": pyast.Div,
+    "%": pyast.Mod,
+}
+BOOLEAN_OPERATORS = {"and": pyast.And, "or": pyast.Or}
+COMPARISON_OPERATORS = {
+    "==": pyast.Eq,
+    "!=": pyast.NotEq,
+    "<": pyast.Lt,
+    ">": pyast.Gt,
+    "<=": pyast.LtE,
+    ">=": pyast.GtE,
+}
+UNARY_OPERATORS = {"-": pyast.USub, "not": pyast.Not}
+
+# Flags word of a .pyc whose source hash is checked on every load (PEP 552).
+PYC_CHECKED_HASH = 0b11
+
+
+class PyASTGen(object):
+    """
+    Translates the given AST into a Python ast.Module, which compile() turns
+    into a code object without going through Python source text.
+
+    The translation follows TargetGen node for node; statements carry the
+    line numbers of the Typthon source so tracebacks point into it. Every
+    node is created with its position, which is much cheaper than filling
+    them in afterwards with ast.fix_missing_locations.
+
+    With hoist_main, top-level statements are compiled inside a generated
+    main function, see MainHoist.
+    """
+
+    def __init__(self, name, root, hoist_main=False):
+        self.name = name
+        self.root = root
+        self.hoist_main = hoist_main
+        self.loc = self.line(1)
+        self.handlers = ast.dispatch_table(self.__class__, "translate_")
+
+    def generate(self):
+        return self.translate(self.root)
+
+    def translate(self, node, statement=False):
+        return self.handlers[node.__class__](self, node, statement)
+
+    @staticmethod
+    def line(lineno):
+        return {"lineno": lineno, "col_offset": 0, "end_lineno": lineno, "end_col_offset": 0}
+
+    def position(self, node):
+        """
+        Position of node, or of the last statement before it when node has
+        no line of its own. Nodes created from now on get this position.
+        """
+        coord = getattr(node, "coord", None)
+        if isinstance(coord, int) and coord > 0 and coord != self.loc["lineno"]:
+            self.loc = self.line(coord)
+        return self.loc
+
+    @staticmethod
+    def place(pynode, loc):
+        pynode.lineno = pynode.end_lineno = loc["lineno"]
+        pynode.col_offset = pynode.end_col_offset = 0
+        return pynode
+
+    def body(self, node):
+        """
+        Statement list of node, which must not be empty in Python.
+        """
+        stmts = self.translate(node) if node is not None else []
+        return stmts or [pyast.Pass(**self.loc)]
+
+    def translate_File(self, node, statement=False):
+        if not self.hoist_main:
+            return pyast.Module(body=self.translate(node.statements), type_ignores=[])
+
+        hoist = MainHoist(node)
+        body = self.translate(ast.StmtList(hoist.functions))
+        if not hoist.statements:
+            return pyast.Module(body=body, type_ignores=[])
+
+        loc = self.position(hoist.statements[0])
+        main_body = []
+        if hoist.shared:
+            main_body.append(pyast.Global(hoist.shared, **loc))
+        main_body += self.translate(ast.StmtList(hoist.statements))
+        params = pyast.arguments(
+            posonlyargs=[],
+            args=[pyast.arg(arg=name, **loc) for name in hoist.called],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[pyast.Name(name, pyast.Load(), **loc) for name in hoist.called],
+        )
+        body.append(
+            pyast.FunctionDef(
+                name=hoist.name, args=params, body=main_body, decorator_list=[], **loc
+            )
+        )
+        main = pyast.Name(hoist.name, pyast.Load(), **self.loc)
+        body.append(pyast.Expr(pyast.Call(main, [], [], **self.loc), **self.loc))
+        return pyast.Module(body=body, type_ignores=[])
+
+    def translate_StmtList(self, node, statement=False):
+        stmts = []
+        for stmt in node.stmt_lst or []:
+            # Statements are placed once translated, as nested statements
+            # move the position on.
+            loc = self.position(stmt)
+            translation = self.translate(stmt, statement=True)
+            if isinstance(translation, pyast.expr):
+                translation = pyast.Expr(translation, **loc)
+            else:
+                self.place(translation, loc)
+            stmts.append(translation)
+        return stmts
+
+    def translate_FunctionDefn(self, node, statement=False):
+        return pyast.FunctionDef(
+            name=node.name,
+            args=self.translate(node.params),
+            body=self.body(node.body),
+            decorator_list=[],
+            returns=None,
+        )
+
+    def translate_ParamList(self, node, statement=False):
+        return pyast.arguments(
+            posonlyargs=[],
+            args=[self.translate(param) for param in node.params or []],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        )
+
+    def translate_Param(self, node, statement=False):
+        return pyast.arg(arg=node.name, **self.loc)
+
+    def translate_RetStmt(self, node, statement=False):
+        return pyast.Return(self.translate(node.expr))
+
+    def translate_Constant(self, node, statement=False):
+        if isinstance(node.type, ast.Dict_Type):
+            return pyast.Dict(keys=[], values=[], **self.loc)
+        if node.type.name == "str":
+            return pyast.Constant(pyast.literal_eval(node.value), **self.loc)
+        if node.type.name == "bool":
+            return pyast.Constant(node.value == "True", **self.loc)
+        return pyast.Constant(node.value, **self.loc)
+
+    def translate_VarDecl(self, node, statement=False):
+        return self.assign(node.name, self.translate(node.expr))
+
+    def translate_VarAssign(self, node, statement=False):
+        return self.assign(node.name, self.translate(node.expr))
+
+    def assign(self, name, value):
+        return pyast.Assign(targets=[pyast.Name(name, pyast.Store(), **self.loc)], value=value)
+
+    def translate_ID(self, node, statement=False):
+        return pyast.Name(node.name, pyast.Load(), **self.loc)
+
+    def translate_UnaryOp(self, node, statement=False):
+        expr = self.translate(node.expr)
+        return pyast.UnaryOp(UNARY_OPERATORS[node.op](), expr, **self.loc)
+
+    def translate_BinOp(self, node, statement=False):
+        left = self.translate(node.left)
+        right = self.translate(node.right)
+        if node.op in BOOLEAN_OPERATORS:
+            return pyast.BoolOp(BOOLEAN_OPERATORS[node.op](), [left, right], **self.loc)
+        if node.op in COMPARISON_OPERATORS:
+            return pyast.Compare(left, [COMPARISON_OPERATORS[node.op]()], [right], **self.loc)
+        return pyast.BinOp(left, BINARY_OPERATORS[node.op](), right, **self.loc)
+
+    def translate_ArrayExprList(self, node, statement=False):
+        exprs = [self.translate(expr) for expr in node.exprs or []]
+        return pyast.List(exprs, pyast.Load(), **self.loc)
+
+    def translate_ArrayIndex(self, node, statement=False):
+        return self.subscript(node.name, self.translate(node.expr), pyast.Load())
+
+    def translate_ArraySlice(self, node, statement=False):
+        lower = self.translate(node.expr1)
+        upper = self.translate(node.expr2)
+        return self.subscript(node.name, pyast.Slice(lower, upper, **self.loc), pyast.Load())
+
+    def subscript(self, name, index, ctx):
+        return pyast.Subscript(pyast.Name(name, pyast.Load(), **self.loc), index, ctx, **self.loc)
+
+    def translate_ArrayBuiltinCall(self, node, statement=False):
+        args = [self.translate(node.argumentExpression)]
+        return self.method_call(node.arrayID, node.builtinFunction[1:], args)
+
+    def method_call(self, name, method, args):
+        receiver = pyast.Name(name, pyast.Load(), **self.loc)
+        function = pyast.Attribute(receiver, method, pyast.Load(), **self.loc)
+        return pyast.Call(function, args, [], **self.loc)
+
+    def translate_FunctionCall(self, node, statement=False):
+        args = self.translate(node.arguments)
+        return pyast.Call(pyast.Name(node.name, pyast.Load(), **self.loc), args, [], **self.loc)
+
+    def translate_Arguments(self, node, statement=False):
+        return [self.translate(expr) for expr in node.exprs or []]
+
+    def translate_IfStmt(self, node, statement=False):
+        test = self.translate(node.cond)
+        body = self.body(node.true_body)
+        orelse = []
+        if node.false_body:
+            loc = self.position(node.false_body)
+            orelse = self.translate(node.false_body, statement=True)
+            if isinstance(orelse, pyast.stmt):
+                # An elif is an if nested in the else branch.
+                orelse = [self.place(orelse, loc)]
+        return pyast.If(test, body, orelse)
+
+    def translate_ElifStmt(self, node, statement=False):
+        return self.translate_IfStmt(node, statement)
+
+    def translate_WhileStmt(self, node, statement=False):
+        test = self.translate(node.cond)
+        return pyast.While(test, self.body(node.body), [])
+
+    def translate_BreakStmt(self, node, statement=False):
+        return pyast.Break()
+
+    def translate_ContinueStmt(self, node, statement=False):
+        return pyast.Continue()
+
+    def translate_DictBuiltinCall(self, node, statement=False):
+        args = self.translate(node.argumentExpression)
+        if node.builtinFunction == ".set":
+            if statement:
+                target = self.subscript(node.dictID, args[0], pyast.Store())
+                return pyast.Assign(targets=[target], value=args[1])
+            return self.method_call(node.dictID, "__setitem__", args)
+        return self.subscript(node.dictID, args[0], pyast.Load())
+
+
+def source_hash(source, flags=()):
+    """
+    Hash of the Typthon source and the flags it was compiled with, stored in
+    the .pyc to decide whether it is still up to date.
+    """
+    return importlib.util.source_hash(repr((source, flags)).encode())
+
+
+def write_pyc(code, path, source_hash):
+    """
+    Writes code to path as a hash-based .pyc (PEP 552).
+    """
+    data = bytearray(importlib.util.MAGIC_NUMBER)
+    data += struct.pack("<I", PYC_CHECKED_HASH)
+    data += source_hash
+    data += marshal.dumps(code)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def read_pyc(path, source_hash):
+    """
+    Returns the code object of the .pyc at path, or None when it is missing,
+    was written by another Python, or was compiled from other source.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if (
+        data[:4] != importlib.util.MAGIC_NUMBER
+        or struct.unpack("<I", data[4:8])[0] != PYC_CHECKED_HASH
+        or data[8:16] != source_hash
+    ):
+        return None
+    try:
+        return marshal.loads(data[16:])
+    except (EOFError, ValueError, TypeError):
+        return None
@@ -0,0 +1,243 @@
+import typthonIRGen as IR
+from typthonCFG import BasicBlock
+from typthonDataflow import Liveness
+
+# Separates a name from its version: x.3 is version 3 of x. Neither
+# variables nor temporaries contain dots.
+VERSION_SEPARATOR = "."
+
+
+def version(name, number):
+    return f"{name}{VERSION_SEPARATOR}{number}"
+
+
+def base_name(operand):
+    """
+    The variable an SSA name is a version of; constants and unversioned
+    names are returned as they are.
+    """
+    if isinstance(operand, str):
+        return operand.split(VERSION_SEPARATOR, 1)[0]
+    return operand
+
+
+def local_names(function):
+    """
+    The names a function binds, its parameters and every name it writes.
+    Only these are renamed; names it only reads belong to an enclosing
+    function or the module.
+    """
+    names = set(function.params)
+    for instruction in function.instructions:
+        if instruction.dest is not None:
+            names.add(instruction.dest)
+    return names
+
+
+def phis(block):
+    """
+    The phi instructions at the top of block, after its label.
+    """
+    start = 1 if block.label is not None else 0
+    end = start
+    while end < len(block.instructions) and isinstance(block.instructions[end], IR.Phi):
+        end += 1
+    return block.instructions[start:end]
+
+
+class SSAConstructor(object):
+    """
+    Puts the function of a CFG into SSA form, in place.
+
+    Phis go at the iterated dominance frontiers of the blocks writing a
+    name, where the name is live according to Liveness (pruned SSA). Every
+    write of a local name then gets a version of its own, visiting blocks
+    in dominator-tree order. Version 0 is the value a name has on entry:
+    the argument for a parameter and nothing yet for the others.
+    """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.function = cfg.function
+        self.names = local_names(self.function)
+        self.versions = {name: 0 for name in self.names}
+        self.phis = 0
+
+    def run(self):
+        self.cfg.compute_frontiers()
+        self.insert_phis()
+        self.rename()
+        return self.cfg
+
+    def insert_phis(self):
+        writers = {}
+        for block in self.cfg.order:
+            for instruction in block.instructions:
+                if instruction.dest is not None:
+                    writers.setdefault(instruction.dest, set()).add(block)
+
+        # A phi is only placed where its name is live, so no phi is dead.
+        self.liveness = Liveness(self.cfg).solve()
+        live_in = self.liveness.before
+        for name in sorted(self.names & self.liveness.index.keys()):
+            bit = 1 << self.liveness.index[name]
+            placed = set()
+            written = writers.get(name, set())
+            worklist = list(written)
+            while worklist:
+                block = worklist.pop()
+                for frontier in block.frontier:
+                    if frontier in placed or not live_in[frontier.index] & bit:
+                        continue
+                    placed.add(frontier)
+                    predecessors = [p for p in frontier.predecessors if p.order is not None]
+                    phi = IR.Phi(name, name, predecessors, [name] * len(predecessors))
+                    position = (1 if frontier.label is not None else 0) + len(phis(frontier))
+                    frontier.instructions.insert(position, phi)
+                    self.phis += 1
+                    if frontier not in written:
+                        worklist.append(frontier)
+
+    def new_version(self, name, stacks, pushed):
+        self.versions[name] += 1
+        renamed = version(name, self.versions[name])
+        stacks[name].append(renamed)
+        pushed.append(name)
+        return renamed
+
+    def rename(self):
+        stacks = {name: [version(name, 0)] for name in self.names}
+
+        def current(operand):
+            if isinstance(operand, str) and operand in stacks:
+                return stacks[operand][-1]
+            return operand
+
+        # Iterative walk of the dominator tree: a block is entered, then its
+        # children are walked, then the versions it pushed are popped.
+        stack = [(self.cfg.entry, None)]
+        while stack:
+            block, pushed = stack.pop()
+            if pushed is not None:
+                for name in pushed:
+                    stacks[name].pop()
+                continue
+
+            pushed = []
+            for instruction in block.instructions:
+                if not isinstance(instruction, IR.Phi):
+                    instruction.map_uses(current)
+                if instruction.dest is not None:
+                    instruction.dest = self.new_version(instruction.dest, stacks, pushed)
+            for successor in block.successors:
+                for phi in phis(successor):
+                    phi.args[phi.blocks.index(block)] = stacks[phi.variable][-1]
+
+            stack.append((block, pushed))
+            for child in reversed(block.dominated):
+                stack.append((child, None))
+
+
+class SSADestructor(object):
+    """
+    Takes the function of a CFG in SSA form back to ordinary IR and writes
+    it back to the function's instruction list, ready for TargetGen.
+
+    Each phi becomes copies at the end of its predecessors, in an edge
+    block of their own where the predecessor branches elsewhere too. The
+    copies of one block are ordered so none overwrites a name another still
+    reads, breaking cycles through a temporary. Versions then go back to the
+    names they came from. That assumes versions of one name are never live
+    at once, which holds for the SSA SSAConstructor builds and for passes
+    that only replace names with constants or drop instructions; such a
+    replaced phi argument is what leaves copies behind.
+    """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.function = cfg.function
+        self.blocks = [block for block in cfg.blocks if block.order is not None]
+        self.copies = 0
+
+    def run(self):
+        for block in list(self.blocks):
+            block_phis = phis(block)
+            if not block_phis:
+                continue
+            for index, predecessor in enumerate(block_phis[0].blocks):
+                moves = {}
+                for phi in block_phis:
+                    dest = base_name(phi.dest)
+                    source = base_name(phi.args[index])
+                    if source != dest:
+                        moves[dest] = source
+                if moves:
+                    self.place(self.sequentialize(moves), predecessor, block)
+            start = 1 if block.label is not None else 0
+            del block.instructions[start:start + len(block_phis)]
+
+        for block in self.blocks:
+            for instruction in block.instructions:
+                instruction.map_uses(base_name)
+                if instruction.dest is not None:
+                    instruction.dest = base_name(instruction.dest)
+
+        self.function.instructions = [
+            instruction for block in self.blocks for instruction in block.instructions
+        ]
+        return self.function
+
+    def sequentialize(self, moves):
+        """
+        Orders the parallel copies dest <- source in moves.
+        """
+        copies = []
+        while moves:
+            sources = set(source for source in moves.values() if isinstance(source, str))
+            ready = [dest for dest in moves if dest not in sources]
+            if ready:
+                for dest in ready:
+                    copies.append(IR.Copy(dest, moves.pop(dest)))
+                continue
+            # Every pending dest is still read: save one and read the copy.
+            dest = next(iter(moves))
+            saved = self.function.new_temp()
+            copies.append(IR.Copy(saved, dest))
+            moves = {
+                target: saved if source == dest else source for target, source in moves.items()
+            }
+        self.copies += len(copies)
+        return copies
+
+    def place(self, copies, predecessor, block):
+        last = predecessor.terminator
+        if len(predecessor.successors) == 1:
+            position = len(predecessor.instructions) - (1 if last is not None else 0)
+            predecessor.instructions[position:position] = copies
+            return
+
+        # A critical edge: the copies get a block of their own, added at the
+        # end of the function and jumping to block.
+        label = self.function.new_label()
+        if last.true_target == block.label:
+            last.true_target = label
+        if last.false_target == block.label:
+            last.false_target = label
+        edge = BasicBlock(len(self.cfg.blocks), [IR.Label(label)] + copies + [IR.Jump(block.label)])
+        self.cfg.blocks.append(edge)
+        self.blocks.append(edge)
+
+
+def format_ssa(cfg):
+    """
+    The function of cfg block by block, the way phis refer to them.
+    """
+    function = cfg.function
+    lines = [f"function {function.qualname}({', '.join(function.params)}):"]
+    for block in cfg.order:
+        lines.append(f"{block}:")
+        for instruction in block.instructions:
+            if not isinstance(instruction, IR.Label):
+                lines.append(f"    {instruction}")
+    lines.append("end")
+    return "\n".join(lines)
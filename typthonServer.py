@@ -0,0 +1,98 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+
+# Environment variable naming the server socket, and the default concurrency
+# limits of a server.
+SOCKET_ENV = "TYPTHON_SOCKET"
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_QUEUE_TIMEOUT = 30.0
+
+
+def default_socket_path():
+    return os.environ.get(SOCKET_ENV) or f"/tmp/typthon-{os.getuid()}.sock"
+
+
+def send_message(sock, message):
+    """
+    Messages are single lines of JSON.
+    """
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def recv_message(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError("connection closed before a message was received")
+    return json.loads(line)
+
+
+def request(source, name, flags, socket_path=None):
+    """
+    Sends one compile request and returns the server's response, a dict with
+    keys "ok", "target", "stdout" and "error".
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path or default_socket_path())
+        send_message(sock, {"source": source, "name": name, "flags": flags})
+        with sock.makefile("rb") as sock_file:
+            return recv_message(sock_file)
+
+
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            message = recv_message(self.rfile)
+        except (ConnectionError, ValueError) as e:
+            send_message(self.request, self.server.failure(f"bad request: {e}"))
+            return
+
+        if not self.server.slots.acquire(timeout=self.server.queue_timeout):
+            send_message(self.request, self.server.failure("server busy, try again"))
+            return
+        try:
+            response = self.server.compile_request(
+                message.get("source", ""), message.get("name", "<stdin>"), message.get("flags", {})
+            )
+        finally:
+            self.server.slots.release()
+        send_message(self.request, response)
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Long-lived compile server over a Unix domain socket.
+
+    Every connection carries one request, handled on its own thread.
+    compile_request(source, name, flags) does the work and returns the
+    response dict; at most max_concurrency requests run at once, and a
+    request waiting longer than queue_timeout seconds for a slot is refused.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path,
+        compile_request,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        queue_timeout=DEFAULT_QUEUE_TIMEOUT,
+    ):
+        self.socket_path = socket_path
+        self.compile_request = compile_request
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.queue_timeout = queue_timeout
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, CompileRequestHandler)
+
+    @staticmethod
+    def failure(error):
+        return {"ok": False, "target": None, "stdout": "", "error": error}
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
@@ -0,0 +1,125 @@
+import json
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+import typthonAST as ast
+
+
+class CompileStats(object):
+    """
+    Collects per-phase timings and compiler statistics for one compile.
+
+    time_passes: record wall and CPU time of each phase.
+    memory: also record, through tracemalloc, how far each phase pushed
+            traced memory above what was allocated when it started.
+    """
+
+    def __init__(self, name, time_passes=False, memory=False):
+        self.name = name
+        self.time_passes = time_passes
+        self.memory = memory
+        self.phases = []
+        self.counters = {}
+
+    @property
+    def enabled(self):
+        return self.time_passes or self.memory
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                "phase": name,
+                "wall_ms": (time.perf_counter() - start_wall) * 1000,
+                "cpu_ms": (time.process_time() - start_cpu) * 1000,
+            }
+            if self.memory:
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1] - start_memory
+            self.phases.append(record)
+
+    def count(self, name, value):
+        self.counters[name] = value
+
+    def as_dict(self):
+        return {"file": self.name, "phases": self.phases, **self.counters}
+
+    def report(self):
+        """
+        Human readable report of everything collected.
+        """
+        lines = [f"===== Compile statistics for {self.name} ====="]
+        if self.phases:
+            header = f"{'phase':<14}{'wall ms':>10}{'cpu ms':>10}"
+            if self.memory:
+                header += f"{'peak KiB':>12}"
+            lines.append(header)
+            for record in self.phases:
+                line = f"{record['phase']:<14}{record['wall_ms']:>10.3f}{record['cpu_ms']:>10.3f}"
+                if self.memory:
+                    line += f"{record['peak_bytes'] / 1024:>12.1f}"
+                lines.append(line)
+            total_wall = sum(r["wall_ms"] for r in self.phases)
+            total_cpu = sum(r["cpu_ms"] for r in self.phases)
+            lines.append(f"{'total':<14}{total_wall:>10.3f}{total_cpu:>10.3f}")
+
+        for name, value in self.counters.items():
+            if isinstance(value, dict):
+                lines.append(f"{name}:")
+                for key, count in value.items():
+                    lines.append(f"    {key:<20}{count:>8}")
+            else:
+                lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        """
+        Appends the statistics as one line of JSON, or prints it for "-".
+        """
+        line = json.dumps(self.as_dict())
+        if path == "-":
+            print(line)
+        else:
+            with open(path, "a") as f:
+                f.write(line + "\n")
+
+
+def count_nodes(root):
+    """
+    Number of AST nodes reachable from root, by class name.
+    """
+    counts = Counter()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        counts[node.__class__.__name__] += 1
+        for child_name, child in node.children() or ():
+            if isinstance(child, ast.Node):
+                stack.append(child)
+    return dict(sorted(counts.items()))
+
+
+def count_instructions(program):
+    """
+    Number of IR instructions in all functions of program, by class name.
+    """
+    counts = Counter(
+        instruction.__class__.__name__
+        for function in program.functions.values()
+        for instruction in function.instructions
+    )
+    return dict(sorted(counts.items()))
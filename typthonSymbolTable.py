@@ -22,6 +22,23 @@ class SymbolTable(object):
     def __str__(self):
         return f"scope_stack: {self.scope_stack}, fn_stack: {self.functions_scope_stack}, ret_stack: {self.return_stack}, while_counter: {self.while_scope_counter}"
 
+    def fingerprint(self):
+        """
+        Stable description of every visible declaration. Code checked
+        against two symbol tables with the same fingerprint typechecks the
+        same way.
+        """
+        variables = [sorted((n, t.name) for n, t in s.items()) for s in self.scope_stack]
+        functions = [
+            sorted((n, tuple(t.name for t in i), o.name) for n, (i, o) in s.items())
+            for s in self.functions_scope_stack
+        ]
+        dicts = [
+            sorted((n, k.name, v.name) for n, (k, v) in s.items()) for s in self.dict_stack
+        ]
+        returns = [t.name for t in self.return_stack]
+        return repr((variables, functions, dicts, returns, self.while_scope_counter))
+
     def push_scope(self):
         self.scope_stack.append(dict())
         self.functions_scope_stack.append(dict())
@@ -1,15 +1,54 @@
 import typthonAST as ast
 import typthonIRGen as IR
+from typthonCFG import CFG
+from typthonHoist import MainHoist
 
 TAB_LENGTH = 4
 
+# Python precedence of the operators, lowest binding first. Operands that
+# bind more loosely than their operator are parenthesized when emitted.
+PRECEDENCE = {
+    "or": 1,
+    "and": 2,
+    "==": 4,
+    "!=": 4,
+    "<": 4,
+    ">": 4,
+    "<=": 4,
+    ">=": 4,
+    "+": 5,
+    "-": 5,
+    "*": 6,
+    "/": 6,
+    "%": 6,
+}
+UNARY_PRECEDENCE = {"not": 3, "-": 7}
+COMPARISON_PRECEDENCE = 4
+ATOM_PRECEDENCE = 8
+
+
+def precedence(node):
+    """
+    Python precedence of the expression emitted for node.
+    """
+    if isinstance(node, ast.BinOp):
+        return PRECEDENCE[node.op]
+    if isinstance(node, ast.UnaryOp):
+        return UNARY_PRECEDENCE[node.op]
+    if isinstance(node, ast.Constant) and isinstance(node.value, int) and node.value < 0:
+        return UNARY_PRECEDENCE["-"]
+    return ATOM_PRECEDENCE
+
 
 class TargetGen(object):
     """
     Translates the given IR into Python.
+
+    With hoist_main, top-level statements are emitted inside a generated
+    main function, see MainHoist.
     """
 
-    def __init__(self, name, IR_lst, function_IR_lst):
+    def __init__(self, name, IR_lst, function_IR_lst, hoist_main=False):
 
         self.name = name[:-4]
         self.IR_lst = IR_lst
@@ -19,6 +58,8 @@ class TargetGen(object):
         self.target_lst = []
         self.scope = 0
         self.in_function = False
+        self.hoist_main = hoist_main
+        self.handlers = ast.dispatch_table(self.__class__, "translate_")
 
         self.function_counts = {}
 
@@ -26,9 +67,16 @@ class TargetGen(object):
         # for funkyfunctionKEY in self.function_IR_lst:
         #     self.translate(self.function_IR_lst[funkyfunctionKEY])
 
-        self.translate(self.IR_lst)
+        self.generate()
         self.write_lines()
 
+    def generate(self):
+        """
+        Translates the IR and returns the target lines without writing them.
+        """
+        self.translate(self.IR_lst)
+        return self.target_lst
+
     def write_lines(self):
 
         with open(f"{self.name}.py", "w") as f:
@@ -36,8 +84,7 @@ class TargetGen(object):
                 f.write(f"{line}\n")
 
     def translate(self, node, statement=False):
-        method = "translate_" + node.__class__.__name__
-        return getattr(self, method)(node, statement)
+        return self.handlers[node.__class__](self, node, statement)
 
     def add_line(self, line):
         self.target_lst.append(" " * TAB_LENGTH * self.scope + line)
@@ -67,7 +114,10 @@ class TargetGen(object):
         return f"{node.name}"
 
     def translate_StmtList(self, node, statement=False):
-        for stmt in node.stmt_lst:
+        if not node.stmt_lst and self.scope > 0:
+            # A block the optimizer emptied.
+            self.add_line("pass")
+        for stmt in node.stmt_lst or []:
             self.translate(stmt, statement=True)
 
     def translate_RetStmt(self, node, statement=False):
@@ -78,7 +128,25 @@ class TargetGen(object):
         return f"{node.value}"
 
     def translate_File(self, node, statement=False):
-        self.translate(node.statements)
+        if not self.hoist_main:
+            self.translate(node.statements)
+            return
+
+        hoist = MainHoist(node)
+        for function in hoist.functions:
+            self.translate(function, statement=True)
+        if not hoist.statements:
+            return
+
+        defaults = ",".join(f"{name}={name}" for name in hoist.called)
+        self.add_line(f"def {hoist.name}({defaults}):")
+        self.scope += 1
+        if hoist.shared:
+            self.add_line(f"global {', '.join(hoist.shared)}")
+        for stmt in hoist.statements:
+            self.translate(stmt, statement=True)
+        self.scope -= 1
+        self.add_line(f"{hoist.name}()")
 
     def translate_VarDecl(self, node, statement=False):
         expression = self.translate(node.expr)
@@ -86,6 +154,10 @@ class TargetGen(object):
 
     def translate_UnaryOp(self, node, statement=False):
         expression = self.translate(node.expr)
+        if precedence(node.expr) < UNARY_PRECEDENCE[node.op]:
+            expression = f"({expression})"
+        if node.op == "not":
+            return f"not {expression}"
         return f"{node.op}{expression}"
 
     def translate_ID(self, node, statement=False):
@@ -98,6 +170,17 @@ class TargetGen(object):
     def translate_BinOp(self, node, statement=False):
         left_expresion = self.translate(node.left)
         right_expresion = self.translate(node.right)
+
+        # Typthon's grouping is kept explicit wherever Python's precedence,
+        # left associativity or comparison chaining would regroup it.
+        op_precedence = PRECEDENCE[node.op]
+        left_precedence = precedence(node.left)
+        if left_precedence < op_precedence or (
+            left_precedence == op_precedence == COMPARISON_PRECEDENCE
+        ):
+            left_expresion = f"({left_expresion})"
+        if precedence(node.right) <= op_precedence:
+            right_expresion = f"({right_expresion})"
         return f"{left_expresion} {node.op} {right_expresion}"
 
     def translate_ArrayExprList(self, node, statement=False):
@@ -171,6 +254,9 @@ class TargetGen(object):
     def translate_BreakStmt(self, node, statement=False):
         self.add_line("break")
 
+    def translate_ContinueStmt(self, node, statement=False):
+        self.add_line("continue")
+
     def translate_DictBuiltinCall(self, node, statement=False):
         output = ""
         if node.builtinFunction == ".set":
@@ -180,3 +266,152 @@ class TargetGen(object):
         if(statement):
             self.add_line(output)
         return output
+
+    ################################
+    ## Three-address code
+    ################################
+
+    def translate_IRProgram(self, program, statement=False):
+        # Temporaries and the block counter get a prefix no Typthon name
+        # starts with.
+        names = set()
+        for function in program.functions.values():
+            names.add(function.name)
+            names.update(function.params)
+            for instruction in function.instructions:
+                names.update(
+                    operand for operand in instruction.uses() + [instruction.dest]
+                    if isinstance(operand, str)
+                )
+        self.temp_prefix = "_t"
+        while any(name.startswith(self.temp_prefix) for name in names):
+            self.temp_prefix = "_" + self.temp_prefix
+        self.pc = "_pc"
+        while self.pc in names:
+            self.pc = "_" + self.pc
+
+        self.program = program
+        self.translate(program.module)
+
+    def translate_IRFunction(self, function, statement=False):
+        """
+        Function bodies with jumps become a loop dispatching on the number of
+        the basic block to run next.
+        """
+        if function is not self.program.module:
+            self.add_line(f"def {function.name}({','.join(function.params)}):")
+            self.scope += 1
+        for child in self.program.children(function):
+            self.translate(child)
+
+        cfg = CFG(function)
+        if len(cfg.order) == 1:
+            for instruction in cfg.entry.instructions:
+                self.translate(instruction)
+        else:
+            # Blocks are numbered in reverse postorder and unreachable ones
+            # are left out.
+            self.block_numbers = {
+                block.label: block.order for block in cfg.order if block.label is not None
+            }
+            self.add_line(f"{self.pc} = 0")
+            self.add_line("while True:")
+            self.scope += 1
+            for block in cfg.order:
+                self.add_line(f"{'if' if block.order == 0 else 'elif'} {self.pc} == {block.order}:")
+                self.scope += 1
+                for instruction in block.instructions:
+                    self.translate(instruction)
+                if block.terminator is None:
+                    if block.successors:
+                        self.add_line(f"{self.pc} = {block.successors[0].order}")
+                    else:
+                        # Only the module falls off its last block.
+                        self.add_line("break")
+                self.scope -= 1
+            self.scope -= 1
+
+        if function is not self.program.module:
+            if not function.instructions:
+                self.add_line("pass")
+            self.scope -= 1
+
+    def operand(self, operand):
+        if isinstance(operand, IR.Const):
+            return repr(operand.value)
+        if IR.is_temp(operand):
+            return f"{self.temp_prefix}{operand[1:]}"
+        return operand
+
+    def operands(self, operands):
+        return ",".join(self.operand(operand) for operand in operands)
+
+    def assign(self, instruction, expression):
+        if instruction.dest is None:
+            self.add_line(expression)
+        else:
+            self.add_line(f"{self.operand(instruction.dest)} = {expression}")
+
+    def translate_Copy(self, instruction, statement=False):
+        self.assign(instruction, self.operand(instruction.src))
+
+    def translate_Binary(self, instruction, statement=False):
+        left = self.operand(instruction.left)
+        right = self.operand(instruction.right)
+        self.assign(instruction, f"{left} {instruction.op} {right}")
+
+    def translate_Unary(self, instruction, statement=False):
+        operand = self.operand(instruction.operand)
+        if instruction.op == "not":
+            self.assign(instruction, f"not {operand}")
+        else:
+            self.assign(instruction, f"{instruction.op}({operand})")
+
+    def translate_Call(self, instruction, statement=False):
+        name = self.program.functions[instruction.function].name
+        self.assign(instruction, f"{name}({self.operands(instruction.args)})")
+
+    def translate_Return(self, instruction, statement=False):
+        self.add_line(f"return {self.operand(instruction.value)}")
+
+    def translate_Label(self, instruction, statement=False):
+        pass
+
+    def translate_Jump(self, instruction, statement=False):
+        self.add_line(f"{self.pc} = {self.block_numbers[instruction.target]}")
+
+    def translate_Branch(self, instruction, statement=False):
+        true_number = self.block_numbers[instruction.true_target]
+        false_number = self.block_numbers[instruction.false_target]
+        cond = self.operand(instruction.cond)
+        self.add_line(f"{self.pc} = {true_number} if {cond} else {false_number}")
+
+    def translate_NewList(self, instruction, statement=False):
+        self.assign(instruction, f"[{self.operands(instruction.items)}]")
+
+    def translate_NewDict(self, instruction, statement=False):
+        self.assign(instruction, "{}")
+
+    def translate_Index(self, instruction, statement=False):
+        array = self.operand(instruction.array)
+        self.assign(instruction, f"{array}[{self.operand(instruction.index)}]")
+
+    def translate_Slice(self, instruction, statement=False):
+        array = self.operand(instruction.array)
+        start = self.operand(instruction.start)
+        stop = self.operand(instruction.stop)
+        self.assign(instruction, f"{array}[{start}:{stop}]")
+
+    def translate_ArrayCall(self, instruction, statement=False):
+        array = self.operand(instruction.array)
+        arg = self.operand(instruction.arg)
+        self.assign(instruction, f"{array}.{instruction.method}({arg})")
+
+    def translate_DictGet(self, instruction, statement=False):
+        dictionary = self.operand(instruction.dict)
+        self.assign(instruction, f"{dictionary}[{self.operand(instruction.key)}]")
+
+    def translate_DictSet(self, instruction, statement=False):
+        dictionary = self.operand(instruction.dict)
+        key = self.operand(instruction.key)
+        self.add_line(f"{dictionary}[{key}] = {self.operand(instruction.value)}")
@@ -4,11 +4,15 @@
 from typthonSymbolTable import SymbolTable, ParseError
 import typthonAST as ast
 
+TYPE_CLASSES = (ast.Type, ast.Array_Type, ast.Dict_Type)
+
 
 class TypeChecker(object):
+    def __init__(self):
+        self.handlers = ast.dispatch_table(self.__class__, "check_")
+
     def typecheck(self, node, st=None):
-        method = "check_" + node.__class__.__name__
-        return getattr(self, method)(node, st)
+        return self.handlers[node.__class__](self, node, st)
 
     def generic_typecheck(self, node, st=None):
         print(node)
@@ -21,27 +25,24 @@ class TypeChecker(object):
         """
         Helper function to check if two given type node is that of the
         same type. Precondition is that both t1 and t2 are that of class Type
-        """
-        t1_is_type = isinstance(t1, ast.Type) or isinstance(
-            t1, ast.Array_Type) or isinstance(t1, ast.Dict_Type)
-        t2_is_type = isinstance(t2, ast.Type) or isinstance(
-            t2, ast.Array_Type) or isinstance(t2, ast.Dict_Type)
 
-        if not (t1_is_type and t2_is_type):
+        Types are interned in typthonAST, so equal types are the same object.
+        The exception is the type of the empty dict {}, which matches every
+        dict type, also inside array types.
+        """
+        if t1 is t2:
+            return True
+        if not (isinstance(t1, TYPE_CLASSES) and isinstance(t2, TYPE_CLASSES)):
             raise ParseError(
                 f"eq_type invoked on non-type objects, {t1.__class__} and {t2.__class__}"
             )
 
         # {} <- type name dict
         # {} <- ast.dict_type(None, None)
-        if isinstance(t1, ast.Type) and isinstance(t2, ast.Type):
-            return t1.name == t2.name
-        elif isinstance(t1, ast.Array_Type) and isinstance(t2, ast.Array_Type):
+        if isinstance(t1, ast.Array_Type) and isinstance(t2, ast.Array_Type):
             return self.eq_type(t1.innerType, t2.innerType)
         elif isinstance(t1, ast.Dict_Type) and isinstance(t2, ast.Dict_Type):
-            t2_is_empty_dict = self.eq_type(t2.key_type, ast.Type(
-                "NullType")) and self.eq_type(t2.val_type, ast.Type("NullType"))
-            if t2_is_empty_dict:
+            if t2 is ast.EMPTY_DICT_TYPE:
                 return True
 
             return self.eq_type(t1.key_type, t2.key_type) and self.eq_type(t1.val_type, t2.val_type)
@@ -92,30 +93,30 @@ class TypeChecker(object):
         right_type = self.typecheck(node.right, st)
 
         if node.op in {"+", "-", "*", "/", "%", "<", ">", "<=", ">="}:
-            if (not self.eq_type(left_type, ast.Type("int"))) or (
-                not self.eq_type(right_type, ast.Type("int"))
+            if (not self.eq_type(left_type, ast.INT_TYPE)) or (
+                not self.eq_type(right_type, ast.INT_TYPE)
             ):
                 raise ParseError(
                     f"Tried to call integer binary operation on {left_type.name} and {right_type.name} types",
                     node.coord,
                 )
             return (
-                ast.Type("bool")
+                ast.BOOL_TYPE
                 if node.op in {"<", ">", "<=", ">="}
-                else ast.Type("int")
+                else ast.INT_TYPE
             )
 
         if node.op in {"and", "or"}:
-            if (not self.eq_type(left_type, ast.Type("bool"))) or (
-                not self.eq_type(right_type, ast.Type("bool"))
+            if (not self.eq_type(left_type, ast.BOOL_TYPE)) or (
+                not self.eq_type(right_type, ast.BOOL_TYPE)
             ):
                 raise ParseError(
                     f"Tried to call boolean binary operation on {left_type.name} and {right_type.name} types",
                     node.coord,
                 )
-            return ast.Type("bool")
+            return ast.BOOL_TYPE
 
-        return ast.Type("bool")
+        return ast.BOOL_TYPE
 
     def check_UnaryOp(self, node: ast.UnaryOp, st):
         """
@@ -124,12 +125,12 @@ class TypeChecker(object):
         """
         expression_type = self.typecheck(node.expr, st)
         if node.op == "not":
-            if not self.eq_type(expression_type, ast.Type("bool")):
+            if not self.eq_type(expression_type, ast.BOOL_TYPE):
                 raise ParseError(
                     f"Tried calling 'not' with non boolean variable of type {expression_type.name}"
                 )
         else:
-            if not self.eq_type(expression_type, ast.Type("int")):
+            if not self.eq_type(expression_type, ast.INT_TYPE):
                 raise ParseError(
                     f"Tried calling '-' with non integer variable of type {expression_type.name}"
                 )
@@ -155,7 +156,7 @@ class TypeChecker(object):
                             node.type.val_type, node.coord)
         st.declare_variable(node.name, node.type, node.coord)
 
-        return ast.Type("NullType")
+        return ast.NULL_TYPE
 
     def check_StmtList(self, node: ast.StmtList, st):
         """
@@ -163,7 +164,7 @@ class TypeChecker(object):
         Used for every scope be it if statements, while loops, etc...
         """
         retTypeFound = False
-        retType = ast.Type("NullType")
+        retType = ast.NULL_TYPE
         for stmt in node.stmt_lst:
             if retTypeFound:
                 raise ParseError(
@@ -174,7 +175,7 @@ class TypeChecker(object):
                 retType = self.typecheck(stmt, st)
             elif isinstance(stmt, ast.IfStmt):
                 ifStmtType = self.typecheck(stmt, st)
-                if not self.eq_type(ifStmtType, ast.Type("NullType")):
+                if not self.eq_type(ifStmtType, ast.NULL_TYPE):
                     retTypeFound = True
                     retType = ifStmtType
             else:
@@ -200,7 +201,7 @@ class TypeChecker(object):
                 f"Variable {node.name} was declared as type {declaredType.name} but was assigned value of {expressionType.name} type",
                 node.coord,
             )
-        return ast.Type("NullType")
+        return ast.NULL_TYPE
         # return declaredType
 
     def check_ArrayExprList(self, node: ast.ArrayExprList, st: SymbolTable):
@@ -216,7 +217,7 @@ class TypeChecker(object):
                         f"Array has mixed types {p_type.name}, {expression_type.name}. Array can only have one type",
                         node.coord,
                     )
-        return ast.Array_Type(p_type)
+        return ast.get_array_type(p_type)
 
     def check_ArrayIndex(self, node: ast.ArrayIndex, st: SymbolTable):
         """
@@ -232,7 +233,7 @@ class TypeChecker(object):
 
         # then check that expression is of type int
         expr_type = self.typecheck(node.expr, st)
-        if not self.eq_type(expr_type, ast.Type("int")):
+        if not self.eq_type(expr_type, ast.INT_TYPE):
             raise ParseError(
                 f"Tried to index an array with non integer index of type {expr_type.name}",
                 node.coord,
@@ -254,10 +255,10 @@ class TypeChecker(object):
             )
 
         # then check that expression is of type int
-        expr1_type = self.typecheck(node.expr1)
-        expr2_type = self.typecheck(node.expr2)
-        if not self.eq_type(expr1_type, ast.Type("int")) or not self.eq_type(
-            expr2_type, ast.Type("int")
+        expr1_type = self.typecheck(node.expr1, st)
+        expr2_type = self.typecheck(node.expr2, st)
+        if not self.eq_type(expr1_type, ast.INT_TYPE) or not self.eq_type(
+            expr2_type, ast.INT_TYPE
         ):
             raise ParseError(
                 f"Tried to slice array with non integer indices of types {expr1_type.name}, {expr2_type.name}",
@@ -282,10 +283,10 @@ class TypeChecker(object):
 
         # check if argumentExpression is of the right type.
         inner_type = array_type.innerType
-        argument_expr_type = self.typecheck(node.argumentExpression)
+        argument_expr_type = self.typecheck(node.argumentExpression, st)
 
         if node.builtinFunction == ".pop":
-            if not self.eq_type(argument_expr_type, ast.Type("int")):
+            if not self.eq_type(argument_expr_type, ast.INT_TYPE):
                 raise ParseError(
                     f"Tried to pop from array with non integer index of type {argument_expr_type.name}",
                     node.coord,
@@ -298,7 +299,7 @@ class TypeChecker(object):
                     f"Mismatch of types on call of {node.builtinFunction}, expected {inner_type.name}"
                 )
             else:
-                return ast.Type("NullType")
+                return ast.NULL_TYPE
 
     def check_FunctionDefn(self, node: ast.FunctionDefn, st: SymbolTable):
         """
@@ -309,19 +310,21 @@ class TypeChecker(object):
         # if type check passes, then remove params from symbol table
         # save functional type in symbol table
 
+        # declare the function before its body so that it may call itself
+        param_types = [param.type for param in node.params.params or []]
+        st.declare_function(node.name, param_types, node.ret_type, node.coord)
+
         st.push_scope()
         st.push_return_scope(node.ret_type)
         # pushes expected return type to symbol table
 
         # Go through the parameters
-        param_types = []
         if node.params.params:
             for param in node.params.params:
                 if isinstance(param.type, ast.Dict_Type):
                     st.declare_dict(param.name, param.type.key_type,
                                     param.type.val_type, param.coord)
                 st.declare_variable(param.name, param.type, param.coord)
-                param_types.append(param.type)
 
         body_return_type = self.typecheck(node.body, st)
 
@@ -334,9 +337,7 @@ class TypeChecker(object):
                 node.coord,
             )
 
-        st.declare_function(node.name, param_types, node.ret_type, node.coord)
-
-        return ast.Type("NullType")
+        return ast.NULL_TYPE
 
     def check_RetStmt(self, node: ast.RetStmt, st: SymbolTable):
         expected_return_type = st.get_current_return_scope()
@@ -379,7 +380,7 @@ class TypeChecker(object):
 
     def check_IfStmt(self, node: ast.IfStmt, st: SymbolTable):
         cond_type = self.typecheck(node.cond, st)
-        if not self.eq_type(cond_type, ast.Type("bool")):
+        if not self.eq_type(cond_type, ast.BOOL_TYPE):
             raise ParseError(
                 f"Condition of If statment was type {cond_type.name}, expected bool",
                 node.coord,
@@ -389,26 +390,26 @@ class TypeChecker(object):
         if node.false_body is not None:
             falseBodyType = self.typecheck(node.false_body, st)
 
-        if not node.false_body or self.eq_type(falseBodyType, ast.Type("NullType")):
-            return ast.Type("NullType")
+        if not node.false_body or self.eq_type(falseBodyType, ast.NULL_TYPE):
+            return ast.NULL_TYPE
         return trueBodyType
 
     def check_ElifStmt(self, node: ast.ElifStmt, st: SymbolTable):
         cond_type = self.typecheck(node.cond, st)
-        if not self.eq_type(cond_type, ast.Type("bool")):
+        if not self.eq_type(cond_type, ast.BOOL_TYPE):
             raise ParseError("Condition in Elif not of type bool.", node.coord)
 
         trueBodyType = self.typecheck(node.true_body, st)
         if node.false_body is not None:
             falseBodyType = self.typecheck(node.false_body, st)
 
-        if not node.false_body or self.eq_type(falseBodyType, ast.Type("NullType")):
-            return ast.Type("NullType")
+        if not node.false_body or self.eq_type(falseBodyType, ast.NULL_TYPE):
+            return ast.NULL_TYPE
         return trueBodyType
 
     def check_WhileStmt(self, node: ast.WhileStmt, st: SymbolTable):
         cond_type = self.typecheck(node.cond, st)
-        if not self.eq_type(cond_type, ast.Type("bool")):
+        if not self.eq_type(cond_type, ast.BOOL_TYPE):
             raise ParseError(
                 "Condition in While Statement not of type bool.", node.coord
             )
@@ -416,14 +417,14 @@ class TypeChecker(object):
         st.push_while_scope()
         self.typecheck(node.body, st)
         st.pop_while_scope()
-        return ast.Type("NullType")
+        return ast.NULL_TYPE
 
     def check_BreakStmt(self, node: ast.BreakStmt, st: SymbolTable):
         if not st.is_in_while_scope():
             raise ParseError(
                 "Attempted to break from outside while loop", node.coord)
 
-        return ast.Type("NullType")
+        return ast.NULL_TYPE
 
     # def check_Dict(self, node: ast.Dict, st: SymbolTable):
 
@@ -454,4 +455,4 @@ class TypeChecker(object):
                 raise ParseError(f"Expected Value Type: {val_type}, but recieved Type {real_val_type} for dict {node.dictID}",
                                  node.coord,
                                  )
-            return ast.Type("NullType")
+            return ast.NULL_TYPE
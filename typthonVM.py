@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+
+import argparse
+import operator
+
+import typthonIRGen as IR
+from typthonSSA import local_names
+
+# Opcodes of the VM. An instruction is a tuple (opcode, a, b, c) whose fields
+# are mostly register numbers, see VMCompiler for what each one takes. The
+# binary operators come first and index BINARY_FUNCTIONS, so VM.execute
+# runs all of them with one test. JUMP_UNLESS + operator is the operator
+# fused with the conditional jump on its result. The others are tested in
+# this order, the common ones first.
+ADD, SUB, MUL, DIV, MOD, LT, LE, GT, GE, EQ, NE, AND, OR = range(13)
+JUMP_UNLESS = 13
+(
+    MOVE, JUMP_IF_NOT, JUMP_IF, JUMP, CALL, RETURN, LOAD_OUTER, INDEX, DICT_GET, DICT_SET,
+    NOT, NEG, BRANCH, SLICE, NEW_LIST, NEW_DICT, APPEND, POP, REMOVE, HALT,
+) = range(26, 46)
+
+BINARY_OPCODES = {
+    "+": ADD, "-": SUB, "*": MUL, "/": DIV, "%": MOD,
+    "<": LT, "<=": LE, ">": GT, ">=": GE, "==": EQ, "!=": NE,
+    "and": AND, "or": OR,
+}
+BINARY_FUNCTIONS = [
+    operator.add, operator.sub, operator.mul, operator.truediv, operator.mod,
+    operator.lt, operator.le, operator.gt, operator.ge, operator.eq, operator.ne,
+    lambda left, right: left and right, lambda left, right: left or right,
+]
+UNARY_OPCODES = {"not": NOT, "-": NEG}
+ARRAY_OPCODES = {"append": APPEND, "pop": POP, "remove": REMOVE}
+
+BINARY_NAMES = ["ADD", "SUB", "MUL", "DIV", "MOD", "LT", "LE", "GT", "GE", "EQ", "NE", "AND", "OR"]
+OPCODE_NAMES = BINARY_NAMES + [f"JUMP_UNLESS_{name}" for name in BINARY_NAMES] + [
+    "MOVE", "JUMP_IF_NOT", "JUMP_IF", "JUMP", "CALL", "RETURN", "LOAD_OUTER", "INDEX",
+    "DICT_GET", "DICT_SET", "NOT", "NEG", "BRANCH", "SLICE", "NEW_LIST", "NEW_DICT", "APPEND",
+    "POP", "REMOVE", "HALT",
+]
+
+# Calls nested deeper than this raise RecursionError. The VM keeps its own
+# call stack, so this is not bound to the Python recursion limit.
+DEFAULT_MAX_DEPTH = 100000
+
+# Value of a local name no instruction has written yet.
+UNBOUND = object()
+
+
+class VMFunction(object):
+    """
+    An IRFunction compiled for the VM.
+
+    A call runs code over a fresh copy of registers: register 0 holds the
+    registers of the enclosing function's running call (None for the
+    module), the parameters follow, then the other local names (UNBOUND
+    until written), temporaries, constants and the registers that values
+    of enclosing functions are loaded into. Constants are filled in once, in
+    registers, so every operand of an instruction is a register number.
+    """
+
+    def __init__(self, qualname, depth):
+        self.qualname = qualname
+        self.depth = depth
+        self.code = []
+        self.registers = [None]
+        # Register of each local name, parameters first.
+        self.slots = {}
+
+    def register(self, value=None):
+        self.registers.append(value)
+        return len(self.registers) - 1
+
+    def __str__(self):
+        lines = [f"function {self.qualname} ({len(self.registers)} registers):"]
+        for pc, (op, a, b, c) in enumerate(self.code):
+            if op == CALL:
+                callee, hops, args = b
+                b = f"{callee.qualname}/{hops}"
+                c = args
+            fields = [str(field) for field in (a, b, c) if field is not None]
+            lines.append(f"    {pc:>4} {OPCODE_NAMES[op]:<16}{' '.join(fields)}")
+        return "\n".join(lines)
+
+
+class VMCompiler(object):
+    """
+    Compiles an IRProgram into VMFunctions.
+
+    Names are resolved once here: a local name becomes its register, and a
+    name of an enclosing function (a global, for the module) is loaded by a
+    LOAD_OUTER right before the instruction reading it, which walks up the
+    given number of enclosing calls. Labels become instruction indices;
+    jumps to jumps go straight to the final target and a branch falling
+    through to one of its targets becomes a conditional jump.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        self.functions = {}
+        for qualname, function in program.functions.items():
+            depth = 0
+            parent = function.parent
+            while parent is not None:
+                depth += 1
+                parent = parent.parent
+            self.functions[qualname] = VMFunction(qualname, depth)
+        for qualname, function in program.functions.items():
+            self.compile_function(function, self.functions[qualname])
+
+    def compile_function(self, function, compiled):
+        for name in function.params:
+            compiled.slots[name] = compiled.register()
+        for name in sorted(local_names(function) - set(function.params)):
+            compiled.slots[name] = compiled.register(UNBOUND)
+
+        constants = {}
+        outer = {}
+        discard = None
+
+        def operand(value):
+            if isinstance(value, IR.Const):
+                if value not in constants:
+                    constants[value] = compiled.register(value.value)
+                return constants[value]
+            if value in compiled.slots:
+                return compiled.slots[value]
+            # A name of an enclosing function, loaded into a register of its
+            # own before each instruction reading it.
+            if value not in outer:
+                outer[value] = compiled.register()
+            hops, slot = self.resolve(function, value)
+            compiled.code.append((LOAD_OUTER, outer[value], hops, slot))
+            return outer[value]
+
+        def dest(name):
+            nonlocal discard
+            if name is not None:
+                return compiled.slots[name]
+            if discard is None:
+                discard = compiled.register()
+            return discard
+
+        # How often each temporary is read: a condition only its branch reads
+        # need not be stored.
+        reads = {}
+        for instruction in function.instructions:
+            for value in instruction.uses():
+                if IR.is_temp(value):
+                    reads[value] = reads.get(value, 0) + 1
+
+        labels = {}
+        code = compiled.code
+        instructions = function.instructions
+        fused = None
+        for position, instruction in enumerate(instructions):
+            kind = instruction.__class__
+            if instruction is fused:
+                continue
+            if kind is IR.Label:
+                labels[instruction.name] = len(code)
+            elif kind is IR.Binary and self.fusable(instructions, position, reads):
+                fused = instructions[position + 1]
+                left = operand(instruction.left)
+                right = operand(instruction.right)
+                opcode = JUMP_UNLESS + BINARY_OPCODES[instruction.op]
+                code.append((opcode, left, right, fused.false_target))
+            elif kind is IR.Copy:
+                source = operand(instruction.src)
+                code.append((MOVE, dest(instruction.dest), source, None))
+            elif kind is IR.Binary:
+                left = operand(instruction.left)
+                right = operand(instruction.right)
+                code.append((BINARY_OPCODES[instruction.op], dest(instruction.dest), left, right))
+            elif kind is IR.Unary:
+                source = operand(instruction.operand)
+                code.append((UNARY_OPCODES[instruction.op], dest(instruction.dest), source, None))
+            elif kind is IR.Jump:
+                code.append((JUMP, instruction.target, None, None))
+            elif kind is IR.Branch:
+                cond = operand(instruction.cond)
+                code.append((BRANCH, cond, instruction.true_target, instruction.false_target))
+            elif kind is IR.Call:
+                args = tuple(operand(arg) for arg in instruction.args)
+                callee = self.program.functions[instruction.function]
+                # Register 0 of the callee is the running call of its parent,
+                # this many calls up from the caller's.
+                hops = compiled.depth - self.functions[callee.parent.qualname].depth
+                site = (self.functions[instruction.function], hops, args)
+                code.append((CALL, dest(instruction.dest), site, None))
+            elif kind is IR.Return:
+                code.append((RETURN, operand(instruction.value), None, None))
+            elif kind is IR.Index:
+                array = operand(instruction.array)
+                index = operand(instruction.index)
+                code.append((INDEX, dest(instruction.dest), array, index))
+            elif kind is IR.Slice:
+                array = operand(instruction.array)
+                bounds = (operand(instruction.start), operand(instruction.stop))
+                code.append((SLICE, dest(instruction.dest), array, bounds))
+            elif kind is IR.NewList:
+                items = tuple(operand(item) for item in instruction.items)
+                code.append((NEW_LIST, dest(instruction.dest), items, None))
+            elif kind is IR.NewDict:
+                code.append((NEW_DICT, dest(instruction.dest), None, None))
+            elif kind is IR.ArrayCall:
+                array = operand(instruction.array)
+                arg = operand(instruction.arg)
+                code.append((ARRAY_OPCODES[instruction.method], dest(instruction.dest), array, arg))
+            elif kind is IR.DictGet:
+                mapping = operand(instruction.dict)
+                key = operand(instruction.key)
+                code.append((DICT_GET, dest(instruction.dest), mapping, key))
+            elif kind is IR.DictSet:
+                mapping = operand(instruction.dict)
+                key = operand(instruction.key)
+                value = operand(instruction.value)
+                code.append((DICT_SET, mapping, key, value))
+            else:
+                raise ValueError(f"The VM cannot run {kind.__name__} instructions")
+        code.append((HALT, None, None, None))
+        self.resolve_jumps(code, labels)
+
+    def fusable(self, instructions, position, reads):
+        """
+        Whether the Binary at position is only read by a Branch right after
+        it that falls through to its true target.
+        """
+        binary = instructions[position]
+        if reads.get(binary.dest) != 1 or position + 1 == len(instructions):
+            return False
+        branch = instructions[position + 1]
+        if not isinstance(branch, IR.Branch) or branch.cond != binary.dest:
+            return False
+        for instruction in instructions[position + 2:]:
+            if not isinstance(instruction, IR.Label):
+                return False
+            if instruction.name == branch.true_target:
+                return True
+        return False
+
+    def resolve(self, function, name):
+        """
+        How many calls up from function's the function binding name runs,
+        and the register name has there.
+        """
+        hops = 0
+        while function.parent is not None:
+            function = function.parent
+            hops += 1
+            slots = self.functions[function.qualname].slots
+            if name in slots:
+                return hops, slots[name]
+        raise ValueError(f"Name {name} is not bound in any enclosing function")
+
+    def resolve_jumps(self, code, labels):
+        def target(label):
+            pc = labels[label]
+            # Follow jumps to jumps, at most once around each instruction.
+            for _ in range(len(code)):
+                op, a, b, c = code[pc]
+                if op != JUMP:
+                    break
+                pc = labels[a]
+            return pc
+
+        jumps = [
+            pc for pc, instruction in enumerate(code)
+            if instruction[0] in (JUMP, BRANCH) or JUMP_UNLESS <= instruction[0] < MOVE
+        ]
+        targets = {
+            pc: [target(label) for label in code[pc][1:] if isinstance(label, str)] for pc in jumps
+        }
+        for pc in jumps:
+            op, cond = code[pc][0], code[pc][1]
+            if op == JUMP:
+                code[pc] = (JUMP, targets[pc][0], None, None)
+                continue
+            if op != BRANCH:
+                code[pc] = code[pc][:3] + (targets[pc][0],)
+                continue
+            true_target, false_target = targets[pc]
+            if true_target == pc + 1:
+                code[pc] = (JUMP_IF_NOT, cond, false_target, None)
+            elif false_target == pc + 1:
+                code[pc] = (JUMP_IF, cond, true_target, None)
+            else:
+                code[pc] = (BRANCH, cond, true_target, false_target)
+
+    def get_functions(self):
+        return self.functions
+
+
+class VM(object):
+    """
+    Runs an IRProgram without going through Python source.
+
+    run() executes the module and returns the values of the variables it
+    assigned.
+    Calls push a frame on the VM's own stack instead of recursing in
+    Python, so the depth of Typthon recursion is bounded by max_depth.
+    Errors are the Python exceptions the generated code would raise: a
+    missing dict key is a KeyError and an index out of range an IndexError.
+    """
+
+    def __init__(self, program, max_depth=DEFAULT_MAX_DEPTH):
+        self.functions = VMCompiler(program).get_functions()
+        self.module = self.functions[IR.MODULE]
+        self.max_depth = max_depth
+
+    def run(self):
+        module = self.module
+        registers = self.execute(module)
+        return {
+            name: registers[slot]
+            for name, slot in module.slots.items()
+            if not IR.is_temp(name) and registers[slot] is not UNBOUND
+        }
+
+    def execute(self, function):
+        code = function.code
+        regs = list(function.registers)
+        stack = []
+        binary = BINARY_FUNCTIONS
+        max_depth = self.max_depth
+        pc = 0
+        while True:
+            op, a, b, c = code[pc]
+            pc += 1
+            if op <= OR:
+                regs[a] = binary[op](regs[b], regs[c])
+            elif op < MOVE:
+                if not binary[op - JUMP_UNLESS](regs[a], regs[b]):
+                    pc = c
+            elif op == MOVE:
+                regs[a] = regs[b]
+            elif op == JUMP_IF_NOT:
+                if not regs[a]:
+                    pc = b
+            elif op == JUMP_IF:
+                if regs[a]:
+                    pc = b
+            elif op == JUMP:
+                pc = a
+            elif op == CALL:
+                callee, hops, args = b
+                if len(stack) >= max_depth:
+                    raise RecursionError("maximum recursion depth exceeded")
+                frame = callee.registers[:]
+                if hops:
+                    link = regs
+                    for _ in range(hops):
+                        link = link[0]
+                    frame[0] = link
+                else:
+                    frame[0] = regs
+                slot = 1
+                for arg in args:
+                    frame[slot] = regs[arg]
+                    slot += 1
+                stack.append((code, pc, regs, a))
+                code = callee.code
+                regs = frame
+                pc = 0
+            elif op == RETURN:
+                value = regs[a]
+                code, pc, regs, dest = stack.pop()
+                regs[dest] = value
+            elif op == LOAD_OUTER:
+                frame = regs[0]
+                for _ in range(b - 1):
+                    frame = frame[0]
+                regs[a] = frame[c]
+            elif op == INDEX:
+                regs[a] = regs[b][regs[c]]
+            elif op == DICT_GET:
+                regs[a] = regs[b][regs[c]]
+            elif op == DICT_SET:
+                regs[a][regs[b]] = regs[c]
+            elif op == NOT:
+                regs[a] = not regs[b]
+            elif op == NEG:
+                regs[a] = -regs[b]
+            elif op == BRANCH:
+                pc = b if regs[a] else c
+            elif op == SLICE:
+                regs[a] = regs[b][regs[c[0]]:regs[c[1]]]
+            elif op == NEW_LIST:
+                regs[a] = [regs[item] for item in b]
+            elif op == NEW_DICT:
+                regs[a] = {}
+            elif op == APPEND:
+                regs[b].append(regs[c])
+            elif op == POP:
+                regs[a] = regs[b].pop(regs[c])
+            elif op == REMOVE:
+                regs[b].remove(regs[c])
+            elif op == HALT:
+                return regs
+
+
+if __name__ == "__main__":
+    from typthonIRFormat import is_ir_file, read_ir
+    from typthonIRGen import IRGen
+    from typthonOptimizer import Optimizer
+    from typthonParser import typthonParser
+    from typthonTypeChecker import TypeChecker
+
+    argparser = argparse.ArgumentParser(
+        description="Runs a Typthon program on the IR virtual machine and prints the "
+        "values of its variables"
+    )
+    argparser.add_argument(
+        "FILE", help="Input file with Typthon source code, or IR saved with --emit-ir"
+    )
+    argparser.add_argument("-o", "--optimize", action="store_true", help="Optimize the program first")
+    argparser.add_argument("-d", "--disassemble", action="store_true", help="Print the VM code and stop")
+    args = argparser.parse_args()
+
+    if is_ir_file(args.FILE):
+        program = read_ir(args.FILE)
+    else:
+        f = open(args.FILE, "r")
+        data = f.read()
+        f.close()
+
+        root = typthonParser().parse(data)
+        TypeChecker().typecheck(root)
+        if args.optimize:
+            optimizer = Optimizer(root)
+            optimizer.optimize()
+            root = optimizer.get_optimized_ir()
+        ir_generator = IRGen()
+        ir_generator.generate(root)
+        program = ir_generator.get_IR_list()
+    vm = VM(program)
+    if args.disassemble:
+        print("\n\n".join(str(function) for function in vm.functions.values()))
+    else:
+        for name, value in vm.run().items():
+            print(f"{name} = {value!r}")